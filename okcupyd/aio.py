@@ -0,0 +1,495 @@
+"""asyncio counterparts of :class:`~okcupyd.session.Session`,
+:class:`~okcupyd.util.fetchable.Fetchable` and the search, profile and
+question loading machinery. This module requires python 3.5 or later and
+`aiohttp`.
+
+A single event loop can drive many logged in :class:`~.AsyncSession`
+instances at once:
+
+.. code:: python
+
+    async def load(username, password):
+        session = await AsyncSession.login(username, password, rate_limit=.5)
+        profiles = await AsyncSearchFetchable(session, gentation='everybody')[:50]
+        await session.load_profiles(profiles)
+        questions = await AsyncQuestionFetchable(
+            session, profiles[0].username
+        )[:]
+        await session.close()
+        return profiles, questions
+
+The :class:`~okcupyd.profile.Profile` instances returned by this module are
+ordinary profiles whose page has already been downloaded, so their parsed
+attributes (`age`, `location`, `details` etc.) can be read without blocking.
+Anything that would make another request (`photo_infos`, `questions`,
+`message`...) must go through this module instead.
+"""
+import asyncio
+import logging
+
+from requests import exceptions
+import simplejson
+
+from . import settings
+from . import util
+from .errors import AuthenticationError
+from .json_search import ProfileBuilder, SearchJSONFetcher
+from .profile import Profile
+from .question import (Question, QuestionHTMLFetcher, QuestionProcessor,
+                       UserQuestion)
+from .rate_limiter import TokenBucketRateLimiter
+from .session import Session
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+log = logging.getLogger(__name__)
+
+
+class AsyncResponse(object):
+    """The fully read response to a request made by :class:`~.AsyncSession`.
+    Exposes the subset of the `requests.Response` interface that okcupyd
+    uses.
+    """
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode('utf8', 'replace')
+
+    def json(self):
+        return simplejson.loads(self.text)
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            raise exceptions.HTTPError(
+                u'{0} Error for url: {1}'.format(self.status_code, self.url),
+                response=self
+            )
+
+    def __repr__(self):
+        return '<{0} [{1}]>'.format(type(self).__name__, self.status_code)
+
+
+class AsyncRateLimiter(object):
+    """Make a rate limiter usable from a coroutine.
+
+    Token bucket rate limiters are polled with
+    :meth:`~okcupyd.rate_limiter.TokenBucket.try_acquire` and waited on with
+    `asyncio.sleep`, so that waiting never blocks the event loop. Any other
+    rate limiter has its blocking `wait` method run in the loop's default
+    executor.
+    """
+
+    def __init__(self, rate_limiter=None):
+        self.rate_limiter = rate_limiter
+
+    async def wait(self, path=None):
+        if self.rate_limiter is None:
+            return
+        buckets_for = getattr(self.rate_limiter, 'buckets_for', None)
+        if buckets_for is None:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self.rate_limiter.wait, path)
+            return
+        for bucket in buckets_for(path):
+            while True:
+                delay = bucket.try_acquire()
+                if not delay:
+                    break
+                await asyncio.sleep(delay)
+
+
+class AsyncSession(object):
+    """An asyncio counterpart of :class:`~okcupyd.session.Session` that is
+    backed by an `aiohttp.ClientSession`.
+    """
+
+    default_login_headers = Session.default_login_headers
+
+    @classmethod
+    async def login(cls, username=None, password=None, rate_limit=None,
+                    client_session=None, connection_limit=100):
+        """Get an :class:`~.AsyncSession` that has authenticated with
+        okcupid.com. If no username and password is supplied, the ones
+        stored in :class:`okcupyd.settings` will be used.
+
+        See :meth:`~.__init__` for a description of the other arguments.
+        """
+        session = cls(client_session, rate_limit=rate_limit,
+                      connection_limit=connection_limit)
+        username = username or settings.USERNAME
+        password = password or settings.PASSWORD
+        await session.do_login(username, password)
+        return session
+
+    def __init__(self, client_session=None, rate_limit=None,
+                 connection_limit=100):
+        """
+        :param client_session: The `aiohttp.ClientSession` to use. One will
+                               be created when it is first needed if none
+                               is provided.
+        :param rate_limit: Average time in seconds to wait between requests to
+                           OKC or a rate limiter such as
+                           :class:`~okcupyd.rate_limiter.TokenBucketRateLimiter`.
+                           `None` or 0 means that requests are not limited.
+        :param connection_limit: The maximum number of simultaneous
+                                 connections used by the `ClientSession` that
+                                 is created when `client_session` is not
+                                 provided.
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "aiohttp must be installed to use {0}".format(
+                    type(self).__name__
+                )
+            )
+        self._client_session = client_session
+        self._connection_limit = connection_limit
+        if isinstance(rate_limit, (int, float)):
+            # Like Session, a rate limit of 0 means no limit.
+            rate_limit = (TokenBucketRateLimiter(1.0 / rate_limit)
+                          if rate_limit else None)
+        self.rate_limiter = AsyncRateLimiter(rate_limit)
+        self.headers = {}
+        self.access_token = None
+        self.log_in_name = None
+
+    @property
+    def client_session(self):
+        if self._client_session is None:
+            self._client_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._connection_limit)
+            )
+        return self._client_session
+
+    async def do_login(self, username, password):
+        credentials = {
+            'username': username,
+            'password': password,
+            'okc_api': 1
+        }
+        login_response = await self.okc_post(
+            'login', data=credentials, headers=self.default_login_headers,
+            secure=True
+        )
+        login_json = login_response.json()
+        log_in_name = login_json['screenname']
+        if log_in_name is None:
+            raise AuthenticationError(u'Could not log in as {0}'.format(username))
+        if log_in_name.lower() != username.lower():
+            log.warning(u'Expected to log in as {0} but '
+                        u'got {1}'.format(username, log_in_name))
+        self.access_token = login_json.get("oauth_accesstoken")
+        self.log_in_name = log_in_name
+        self.headers.update(self.default_login_headers)
+
+    def build_path(self, path, secure=None):
+        if secure is None:
+            secure = any(cookie.key == 'secure_login' and
+                         int(cookie.value) != 0
+                         for cookie in self.client_session.cookie_jar)
+        return u'{0}://{1}/{2}'.format('https' if secure else 'http',
+                                       util.DOMAIN, path)
+
+    async def request(self, method, path, secure=None, headers=None,
+                      **kwargs):
+        await self.rate_limiter.wait(path)
+        request_headers = dict(self.headers)
+        request_headers.update(headers or {})
+        url = self.build_path(path, secure)
+        async with self.client_session.request(
+            method, url, headers=request_headers, **kwargs
+        ) as client_response:
+            content = await client_response.read()
+            response = AsyncResponse(url, client_response.status,
+                                     client_response.headers, content)
+        response.raise_for_status()
+        return response
+
+    async def get_profile(self, username):
+        """Get the :class:`~okcupyd.profile.Profile` associated with the
+        supplied username with its profile page already loaded.
+
+        :param username: The username of the profile to retrieve.
+        """
+        profile = Profile(self, username)
+        await self.load_profile(profile)
+        return profile
+
+    async def get_profiles(self, usernames):
+        """Concurrently get the profiles of all of the provided usernames.
+        See :meth:`~.get_profile`.
+        """
+        return await asyncio.gather(*[self.get_profile(username)
+                                      for username in usernames])
+
+    async def load_profile(self, profile):
+        """Download the profile page of `profile` so that its attributes can
+        be accessed without making a blocking request.
+        """
+        response = await self.okc_get(
+            u'profile/{0}'.format(profile.username)
+        )
+        profile.refresh()
+        profile._set_cached_properties(
+            {'_profile_response': response.content}
+        )
+        return profile
+
+    async def load_profiles(self, profiles):
+        """Concurrently call :meth:`~.load_profile` on all of `profiles`."""
+        return await asyncio.gather(*[self.load_profile(profile)
+                                      for profile in profiles])
+
+    async def close(self):
+        if self._client_session is not None:
+            await self._client_session.close()
+
+
+def build_async_okc_method(method_name):
+    async def okc_method(self, path, secure=None, **kwargs):
+        return await self.request(method_name.upper(), path, secure=secure,
+                                  **kwargs)
+    return okc_method
+
+
+for method_name in ('get', 'put', 'post', 'delete'):
+    setattr(AsyncSession, 'okc_{0}'.format(method_name),
+            build_async_okc_method(method_name))
+
+
+class AsyncFetchable(object):
+    """asyncio counterpart of :class:`~okcupyd.util.fetchable.Fetchable`.
+
+    Items are retrieved with `async for`, or by awaiting an index or a
+    slice:
+
+    .. code:: python
+
+        async for profile in fetchable:
+            print(profile.username)
+
+        first = await fetchable[0]
+        some = await fetchable[2:10]
+
+    The fetcher must have a `fetch_page` coroutine method that accepts a
+    cursor (`None` for the first page) and returns a tuple of the items on
+    that page and the cursor of the next page, or `None` when there are no
+    pages left.
+    """
+
+    def __init__(self, fetcher):
+        self._fetcher = fetcher
+        self.refresh()
+
+    def refresh(self):
+        """Discard all accumulated items so that they are requested again."""
+        self._accumulated = []
+        self._cursor = None
+        self._lock = None
+        self.exhausted = False
+        return self
+
+    async def _fetch_page(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Another consumer may have fetched the page while we were
+            # waiting for the lock.
+            if self.exhausted:
+                return
+            items, self._cursor = await self._fetcher.fetch_page(self._cursor)
+            self._accumulated.extend(items)
+            if self._cursor is None:
+                self.exhausted = True
+
+    async def _fill_to(self, count=None):
+        while not self.exhausted and (count is None or
+                                      len(self._accumulated) < count):
+            await self._fetch_page()
+
+    async def get(self, item):
+        """Coroutine that returns the item or list of items indicated by
+        `item`, which may be an int or a slice.
+        """
+        if isinstance(item, slice):
+            if ((item.start is not None and item.start < 0) or
+                item.stop is None or item.stop < 0):
+                await self._fill_to()
+            else:
+                await self._fill_to(item.stop)
+            return self._accumulated[item]
+        await self._fill_to(None if item < 0 else item + 1)
+        try:
+            return self._accumulated[item]
+        except IndexError:
+            raise IndexError("The AsyncFetchable does not have a value at "
+                             "the index that was provided.")
+
+    def __getitem__(self, item):
+        return self.get(item)
+
+    def __aiter__(self):
+        return _AsyncFetchableIterator(self)
+
+    def __repr__(self):
+        list_repr = repr(self._accumulated)
+        if not self.exhausted:
+            list_repr = ('[...]' if not self._accumulated
+                         else '{0}, ...]'.format(list_repr[:-1]))
+        return '<{0}[{1}]{2}>'.format(type(self).__name__,
+                                      repr(self._fetcher), list_repr)
+
+
+class _AsyncFetchableIterator(object):
+
+    def __init__(self, fetchable):
+        self._fetchable = fetchable
+        self._index = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await self._fetchable._fill_to(self._index + 1)
+        if self._index >= len(self._fetchable._accumulated):
+            raise StopAsyncIteration
+        self._index += 1
+        return self._fetchable._accumulated[self._index - 1]
+
+
+class AsyncFetchMarshall(object):
+    """asyncio counterpart of :class:`~okcupyd.util.fetchable.FetchMarshall`.
+    `fetcher` must have a `fetch` coroutine method; `processor` is an ordinary
+    (synchronous) processor such as
+    :class:`~okcupyd.util.fetchable.PaginationProcessor`.
+    """
+
+    def __init__(self, fetcher, processor, terminator=None, start_at=1):
+        self._fetcher = fetcher
+        self._processor = processor
+        self._terminator = terminator or util.FetchMarshall.simple_decider
+        self._start_at = start_at
+
+    async def fetch_page(self, cursor=None):
+        pos = cursor or self._start_at
+        text_response = await self._fetcher.fetch(start_at=pos)
+        if not text_response:
+            return [], None
+        items = []
+        for item in self._processor.process(text_response):
+            if item is StopIteration:
+                return items, None
+            items.append(item)
+        next_pos = pos + len(items)
+        if not self._terminator(next_pos, pos, text_response):
+            return items, None
+        return items, next_pos
+
+    def __repr__(self):
+        return '{0}({1}, {2})'.format(type(self).__name__,
+                                      repr(self._fetcher),
+                                      repr(self._processor))
+
+
+class AsyncQuestionHTMLFetcher(QuestionHTMLFetcher):
+
+    async def fetch(self, start_at):
+        response = await self._session.okc_get(
+            self._uri, params=self._query_params(start_at)
+        )
+        return response.content.decode('utf8', 'replace')
+
+
+def AsyncQuestionFetcher(session, username, question_class=Question,
+                         is_user=None, **kwargs):
+    if is_user is None:
+        is_user = session.log_in_name.lower() == username.lower()
+    if is_user:
+        question_class = UserQuestion
+    return AsyncFetchMarshall(
+        AsyncQuestionHTMLFetcher.from_username(session, username, **kwargs),
+        QuestionProcessor(question_class)
+    )
+
+
+def AsyncQuestionFetchable(session, username, **kwargs):
+    """
+    :returns: An :class:`~.AsyncFetchable` of the questions answered by the
+              user associated with `username`.
+    """
+    return AsyncFetchable(AsyncQuestionFetcher(session, username, **kwargs))
+
+
+class AsyncSearchJSONFetcher(SearchJSONFetcher):
+
+    async def fetch(self, after=None, count=18):
+        request_parameters = self._request_params(after=after, count=count)
+        log.info(simplejson.dumps(request_parameters))
+        response = await self._session.okc_post(**request_parameters)
+        try:
+            return response.json()
+        except:
+            log.warning(simplejson.dumps(
+                {'failure': response.content.decode('utf8', 'replace')}
+            ))
+            raise
+
+
+class AsyncProfileBuilder(ProfileBuilder):
+    """Build profiles from the results of a json search without going
+    through :meth:`.AsyncSession.get_profile`, which is a coroutine that
+    loads the profile page.
+    """
+
+    def _build_profile(self, username, properties):
+        return Profile(self._session, username, **properties)
+
+
+class AsyncSearchManager(object):
+
+    def __init__(self, search_fetcher, profile_builder, count=18):
+        self._search_fetcher = search_fetcher
+        self._profile_builder = profile_builder
+        self._count = count
+
+    async def fetch_page(self, cursor=None):
+        response = await self._search_fetcher.fetch(after=cursor,
+                                                    count=self._count)
+        try:
+            after = response['paging']['cursors']['after']
+        except KeyError:
+            log.warning(simplejson.dumps(
+                {
+                    'msg': "unable to get after cursor from response",
+                    'response': response
+                }
+            ))
+            after = None
+        profiles = list(self._profile_builder(response))
+        return profiles, None if after == cursor else after
+
+
+def AsyncSearchFetchable(session, **kwargs):
+    """asyncio counterpart of :func:`~okcupyd.json_search.SearchFetchable`.
+    Accepts the same search parameters.
+
+    :param session: A logged in :class:`~.AsyncSession`.
+    :returns: An :class:`~.AsyncFetchable` of
+              :class:`~okcupyd.profile.Profile` instances.
+    """
+    return AsyncFetchable(
+        AsyncSearchManager(
+            AsyncSearchJSONFetcher(session, **kwargs),
+            AsyncProfileBuilder(session)
+        )
+    )
@@ -1,9 +1,50 @@
+import collections
+import contextlib
+import sqlite3
+import time
+
 from .json_search import search
 from .session import Session
 from . import settings
 from . import util
 
 
+def _search_usernames(session, usernames, **kwargs):
+    results = search(session, count=9 * len(usernames),
+                     gentation='everybody', keywords=' '.join(usernames),
+                     **kwargs)
+    return set(profile.username.lower() for profile in results or ())
+
+
+def _found_usernames(session, usernames, usernames_per_search, **kwargs):
+    """Search for `usernames` with as few keyword searches as possible.
+
+    Combining usernames in the keywords of a single search relies on a
+    profile matching any one of them. When a combined search finds none of
+    its usernames, that can't be told apart from the keywords having to match
+    all at once, so each of its usernames is searched for on its own.
+
+    :param usernames_per_search: The number of usernames that are combined in
+                                 the keywords of a single search.
+    :param kwargs: Additional parameters of every search.
+    :returns: The set of the lowercased usernames that appeared in the results.
+    """
+    usernames = list(usernames)
+    found = set()
+    for start in range(0, len(usernames), usernames_per_search):
+        chunk = usernames[start:start + usernames_per_search]
+        chunk_found = _search_usernames(session, chunk, **kwargs)
+        if len(chunk) > 1 and not chunk_found.intersection(
+                username.lower() for username in chunk
+        ):
+            for username in chunk:
+                chunk_found.update(
+                    _search_usernames(session, [username], **kwargs)
+                )
+        found.update(chunk_found)
+    return found
+
+
 class _AttractivenessFinder(object):
     """Find the attractiveness of okcupid.com users.
 
@@ -11,6 +52,10 @@ class _AttractivenessFinder(object):
     finder decorators that allow for cacheing of results and rounding.
     """
 
+    #: The number of usernames that :meth:`.find_attractiveness_many` puts in
+    #: the keywords of a single search.
+    usernames_per_search = 10
+
     def __init__(self, session=None):
         self._session = session or Session.login(settings.AF_USERNAME,
                                                  settings.AF_PASSWORD)
@@ -49,6 +94,44 @@ class _AttractivenessFinder(object):
 
     __call__ = find_attractiveness
 
+    def find_attractiveness_many(self, usernames, accuracy=1000):
+        """Find the attractiveness of all of `usernames` at once.
+
+        The binary searches of all the users advance in lockstep. In each
+        round, the users whose search is at the same range are looked up
+        together, with one search whose keywords are all of their usernames,
+        so each round costs one search per distinct range rather than one
+        per user.
+
+        :param usernames: The usernames to lookup attractiveness for.
+        :param accuracy: The accuracy required to return a result.
+        :returns: A dictionary mapping each of `usernames` to its
+                  attractiveness.
+        """
+        attractiveness = {}
+        bounds = dict((username, (0, 10000)) for username in usernames)
+        while bounds:
+            buckets = collections.defaultdict(list)
+            for username, (lower, higher) in bounds.items():
+                average = (higher + lower)//2
+                if higher - lower <= accuracy:
+                    attractiveness[username] = average
+                else:
+                    buckets[(average, higher)].append((username, lower))
+            bounds = {}
+            for (average, higher), bucket in buckets.items():
+                found = _found_usernames(
+                    self._session, [username for username, _ in bucket],
+                    self.usernames_per_search,
+                    attractiveness_min=average, attractiveness_max=higher
+                )
+                for username, lower in bucket:
+                    if username.lower() in found:
+                        bounds[username] = (average, higher)
+                    else:
+                        bounds[username] = (lower, average)
+        return attractiveness
+
 
 class AttractivenessFinderDecorator(object):
 
@@ -61,6 +144,10 @@ class AttractivenessFinderDecorator(object):
     def __call__(self, *args, **kwargs):
         return self.find_attractiveness(*args, **kwargs)
 
+    def find_attractiveness_many(self, usernames, **kwargs):
+        return dict((username, self.find_attractiveness(username, **kwargs))
+                    for username in usernames)
+
 
 class CheckForExistenceAttractivenessFinder(AttractivenessFinderDecorator):
 
@@ -75,25 +162,209 @@ class CheckForExistenceAttractivenessFinder(AttractivenessFinderDecorator):
         if self._check_for_existence(username):
             return self._finder(username, *args, **kwargs)
 
+    def find_attractiveness_many(self, usernames, **kwargs):
+        usernames = list(usernames)
+        existing = _found_usernames(self._session, usernames,
+                                    self.usernames_per_search)
+        attractiveness = dict.fromkeys(usernames)
+        attractiveness.update(self._finder.find_attractiveness_many(
+            [username for username in usernames
+             if username.lower() in existing],
+            **kwargs
+        ))
+        return attractiveness
+
 
 class RoundedAttractivenessFinder(AttractivenessFinderDecorator):
 
-    def find_attractiveness(self, *args, **kwargs):
-        unrounded = self._finder.find_attractiveness(*args, **kwargs)
+    @staticmethod
+    def _round(unrounded):
         if unrounded is not None:
             return int(round(float(unrounded)/1000, 0)*1000)
 
+    def find_attractiveness(self, *args, **kwargs):
+        return self._round(self._finder.find_attractiveness(*args, **kwargs))
+
+    def find_attractiveness_many(self, usernames, **kwargs):
+        return dict(
+            (username, self._round(unrounded))
+            for username, unrounded in
+            self._finder.find_attractiveness_many(usernames, **kwargs).items()
+        )
+
+
+class SQLiteAttractivenessCache(object):
+    """Cache attractivenesses in an SQLite database file, so that they
+    outlive the process that found them and can be shared by several
+    processes.
+
+    Like :class:`~okcupyd.util.LRUCache`, entries older than `ttl` seconds
+    are treated as missing and the least recently used entries are evicted
+    when there are more than `max_size` of them.
+    """
+
+    def __init__(self, filename, ttl=None, max_size=None, timeout=30.0,
+                 clock=time.time):
+        """
+        :param filename: The path of the SQLite database file.
+        :param ttl: The number of seconds after which an entry expires.
+                    `None` means that entries never expire.
+        :param max_size: The maximum number of entries. `None` means
+                         unbounded.
+        :param timeout: Seconds to wait for another process to release its
+                        lock on the database.
+        """
+        self._filename = filename
+        self.ttl = ttl
+        self.max_size = max_size
+        self._timeout = timeout
+        self._clock = clock
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS attractiveness_cache ('
+                'username TEXT PRIMARY KEY, attractiveness INTEGER, '
+                'stored_at REAL NOT NULL, used_at REAL NOT NULL)'
+            )
+
+    def _connect(self):
+        return contextlib.closing(sqlite3.connect(
+            self._filename, timeout=self._timeout, isolation_level=None
+        ))
+
+    def _expired_before(self):
+        return float('-inf') if self.ttl is None else self._clock() - self.ttl
+
+    def get(self, username, default=None):
+        """Mark the entry of `username` as the most recently used one.
+
+        :returns: The attractiveness stored for `username` or `default` if
+                  there is no such attractiveness or it has expired.
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                'SELECT attractiveness FROM attractiveness_cache '
+                'WHERE username = ? AND stored_at > ?',
+                (username, self._expired_before())
+            ).fetchone()
+            if row is None:
+                return default
+            connection.execute(
+                'UPDATE attractiveness_cache SET used_at = ? '
+                'WHERE username = ?', (self._clock(), username)
+            )
+        return row[0]
+
+    def set(self, username, attractiveness):
+        now = self._clock()
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO attractiveness_cache (username, '
+                'attractiveness, stored_at, used_at) VALUES (?, ?, ?, ?)',
+                (username, attractiveness, now, now)
+            )
+            connection.execute(
+                'DELETE FROM attractiveness_cache WHERE stored_at <= ?',
+                (self._expired_before(),)
+            )
+            if self.max_size is not None:
+                connection.execute(
+                    'DELETE FROM attractiveness_cache WHERE username IN ('
+                    'SELECT username FROM attractiveness_cache '
+                    'ORDER BY used_at DESC LIMIT -1 OFFSET ?)',
+                    (self.max_size,)
+                )
+
+    def discard(self, username):
+        with self._connect() as connection:
+            connection.execute(
+                'DELETE FROM attractiveness_cache WHERE username = ?',
+                (username,)
+            )
+
+    def clear(self):
+        with self._connect() as connection:
+            connection.execute('DELETE FROM attractiveness_cache')
+
+    def __contains__(self, username):
+        with self._connect() as connection:
+            return connection.execute(
+                'SELECT 1 FROM attractiveness_cache '
+                'WHERE username = ? AND stored_at > ?',
+                (username, self._expired_before())
+            ).fetchone() is not None
+
+    def __len__(self):
+        with self._connect() as connection:
+            return connection.execute(
+                'SELECT COUNT(*) FROM attractiveness_cache'
+            ).fetchone()[0]
+
 
 class CachedAttractivenessFinder(AttractivenessFinderDecorator):
+    """Cache the attractivenesses found by another attractiveness finder.
 
-    def __init__(self, attractiveness_finder=None):
+    The cache is a :class:`~.SQLiteAttractivenessCache` at
+    :data:`okcupyd.settings.AF_CACHE_FILENAME` when that is set and an
+    unbounded in memory :class:`~okcupyd.util.LRUCache` otherwise.
+    """
+
+    _missing = object()
+
+    def __init__(self, attractiveness_finder=None, cache=None):
+        """
+        :param attractiveness_finder: The attractiveness finder whose results
+                                      are cached.
+        :param cache: An object with the `get` and `set` methods of
+                      :class:`~okcupyd.util.LRUCache` in which the results
+                      are stored.
+        """
         self._finder = attractiveness_finder or _AttractivenessFinder()
-        self._cache = {}
+        self._cache = self._default_cache() if cache is None else cache
+        #: The number of lookups that were answered by the cache.
+        self.hits = 0
+        #: The number of lookups that had to use the wrapped finder.
+        self.misses = 0
+
+    @staticmethod
+    def _default_cache():
+        if settings.AF_CACHE_FILENAME:
+            return SQLiteAttractivenessCache(
+                settings.AF_CACHE_FILENAME, ttl=settings.AF_CACHE_TTL,
+                max_size=settings.AF_CACHE_MAX_SIZE
+            )
+        return util.LRUCache(max_size=settings.AF_CACHE_MAX_SIZE,
+                             ttl=settings.AF_CACHE_TTL)
+
+    def _lookup(self, username):
+        attractiveness = self._cache.get(username, self._missing)
+        if attractiveness is self._missing:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return attractiveness
 
     def find_attractiveness(self, username, **kwargs):
-        if username not in self._cache:
-            self._cache[username] = self._finder(username, **kwargs)
-        return self._cache[username]
+        attractiveness = self._lookup(username)
+        if attractiveness is self._missing:
+            attractiveness = self._finder(username, **kwargs)
+            self._cache.set(username, attractiveness)
+        return attractiveness
+
+    def find_attractiveness_many(self, usernames, **kwargs):
+        attractiveness = {}
+        missing = []
+        for username in usernames:
+            if username in attractiveness:
+                continue
+            attractiveness[username] = self._lookup(username)
+            if attractiveness[username] is self._missing:
+                missing.append(username)
+        if missing:
+            found = self._finder.find_attractiveness_many(missing, **kwargs)
+            for username in missing:
+                self._cache.set(username, found[username])
+            attractiveness.update(found)
+        return attractiveness
 
 
 AttractivenessFinder = util.compose(CachedAttractivenessFinder,
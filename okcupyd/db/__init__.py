@@ -2,7 +2,7 @@ import logging
 import os
 
 from sqlalchemy import Column, DateTime, Integer
-from sqlalchemy import create_engine
+from sqlalchemy import bindparam, create_engine, text
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import ColumnProperty, Query, class_mapper, sessionmaker
@@ -70,6 +70,14 @@ class Base(object):
     id = Column(Integer, primary_key=True)
     created_at = Column(DateTime, nullable=False, default=func.now())
 
+    #: The names of the dialects that support
+    #: ``INSERT ... ON CONFLICT (...) DO UPDATE``.
+    native_upsert_dialects = ('sqlite', 'postgresql')
+
+    #: The number of rows that :meth:`.bulk_upsert_no_txn` sends to the
+    #: database in a single executemany batch.
+    bulk_upsert_chunk_size = 500
+
     def upsert_model(self, id_key='id'):
         return self.upsert([self], id_key=id_key)
 
@@ -100,6 +108,74 @@ class Base(object):
         log.info(id_to_model)
         return id_to_model
 
+    @classmethod
+    def bulk_upsert_no_txn(cls, session, rows, id_key='okc_id',
+                           chunk_size=None):
+        """Insert or update many rows at once.
+
+        On dialects that support it, this uses a single
+        ``INSERT ... ON CONFLICT (id_key) DO UPDATE`` statement executed in
+        chunked executemany batches. Other dialects fall back to
+        :meth:`.upsert_no_txn`.
+
+        :param rows: Dictionaries mapping column names to values. Every
+                     dictionary must have the same keys, including `id_key`.
+        :param id_key: The name of the unique column that identifies a row.
+        :returns: A dictionary mapping the `id_key` of every row to its
+                  primary key.
+        """
+        rows = list(rows)
+        if not rows:
+            return {}
+        chunk_size = chunk_size or cls.bulk_upsert_chunk_size
+        dialect = session.get_bind(class_mapper(cls)).dialect
+        if dialect.name not in cls.native_upsert_dialects:
+            models = [cls(**row) for row in rows]
+            id_to_model = cls.upsert_no_txn(session, models, id_key=id_key)
+            session.flush()
+            return {key: model.id for key, model in id_to_model.items()}
+
+        statement = cls._bulk_upsert_statement(dialect, sorted(rows[0]),
+                                               id_key)
+        id_column = getattr(cls, id_key)
+        id_to_primary_key = {}
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            session.execute(statement, chunk)
+            id_to_primary_key.update(
+                (key, primary_key) for primary_key, key in
+                session.query(cls.id, id_column).filter(
+                    id_column.in_([row[id_key] for row in chunk])
+                )
+            )
+        return id_to_primary_key
+
+    @classmethod
+    def _bulk_upsert_statement(cls, dialect, column_names, id_key):
+        table = cls.__table__
+        preparer = dialect.identifier_preparer
+        insert_columns = list(column_names)
+        values = [':{0}'.format(name) for name in column_names]
+        if 'created_at' not in column_names:
+            insert_columns.append('created_at')
+            values.append('CURRENT_TIMESTAMP')
+        updates = [
+            '{0} = excluded.{0}'.format(preparer.quote(name))
+            for name in column_names if name not in (id_key, 'id', 'created_at')
+        ]
+        sql = 'INSERT INTO {0} ({1}) VALUES ({2}) ON CONFLICT ({3}) '.format(
+            preparer.format_table(table),
+            ', '.join(preparer.quote(name) for name in insert_columns),
+            ', '.join(values), preparer.quote(id_key)
+        )
+        sql += 'DO UPDATE SET {0}'.format(', '.join(updates)) if updates \
+               else 'DO NOTHING'
+        return text(sql).bindparams(*[
+            bindparam(name, type_=table.c[name].type) for name in column_names
+        ])
+
+    bulk_upsert = with_txn(bulk_upsert_no_txn)
+
     @classmethod
     def upsert_one_no_txn(cls, session, model, **kwargs):
         return next(iter(cls.upsert_no_txn(session, [model], **kwargs).values()))
@@ -1,5 +1,7 @@
 import logging
 
+from sqlalchemy.orm import joinedload, subqueryload
+
 from okcupyd.db import model, txn, with_txn
 
 
@@ -77,3 +79,92 @@ class ThreadAdapter(object):
         with txn() as session:
             thread_model = self._get_thread(session)
             return thread_model, self._add_messages(thread_model)
+
+
+def _user_ids_no_txn(session, profiles):
+    usernames = set(profile.username for profile in profiles)
+    handle_to_id = dict(session.query(model.User.handle, model.User.id).filter(
+        model.User.handle.in_(usernames)
+    ))
+    # Like UserAdapter, users that already exist are not updated, which
+    # avoids loading their profiles.
+    new_profiles = {profile.username: profile for profile in profiles
+                    if profile.username not in handle_to_id}
+    okc_id_to_handle = {}
+    rows = []
+    for profile in new_profiles.values():
+        okc_id_to_handle[int(profile.id)] = profile.username
+        rows.append({'okc_id': profile.id, 'handle': profile.username,
+                     'age': profile.age, 'location': profile.location})
+    for okc_id, user_id in model.User.bulk_upsert_no_txn(session,
+                                                         rows).items():
+        handle_to_id[okc_id_to_handle[okc_id]] = user_id
+    return handle_to_id
+
+
+def sync_threads_no_txn(session, threads):
+    """Store `threads` and any of their messages that are not already in the
+    database, using one bulk upsert per table.
+
+    :param threads: :class:`~okcupyd.messaging.MessageThread` instances.
+    :returns: The thread models and the new message models.
+    """
+    threads = list(threads)
+    if not threads:
+        return [], []
+    handle_to_id = _user_ids_no_txn(
+        session, [profile for thread in threads
+                  for profile in (thread.initiator, thread.respondent)]
+    )
+    thread_ids = model.MessageThread.bulk_upsert_no_txn(session, [
+        {'okc_id': thread.id,
+         'initiator_id': handle_to_id[thread.initiator.username],
+         'respondent_id': handle_to_id[thread.respondent.username]}
+        for thread in threads
+    ])
+
+    existing_message_ids = {}
+    for thread_id, message_id in session.query(
+        model.Message.message_thread_id, model.Message.okc_id
+    ).filter(model.Message.message_thread_id.in_(thread_ids.values())):
+        existing_message_ids.setdefault(thread_id, set()).add(message_id)
+
+    message_rows = []
+    for thread in threads:
+        thread_id = thread_ids[int(thread.id)]
+        existing = existing_message_ids.get(thread_id, set())
+        initiator = thread.initiator.username.lower()
+        new_messages = [message for message in thread.messages
+                        if int(message.id) not in existing]
+        for thread_index, message in enumerate(new_messages, len(existing)):
+            from_initiator = message.sender.username.lower() == initiator
+            sender, recipient = (thread.initiator, thread.respondent) \
+                                if from_initiator else \
+                                (thread.respondent, thread.initiator)
+            message_rows.append({
+                'okc_id': message.id,
+                'text': message.content,
+                'time_sent': message.time_sent,
+                'sender_id': handle_to_id[sender.username],
+                'recipient_id': handle_to_id[recipient.username],
+                'message_thread_id': thread_id,
+                'thread_index': thread_index
+            })
+    message_ids = model.Message.bulk_upsert_no_txn(session, message_rows)
+
+    # The models are returned outside of this transaction, so everything
+    # that ThreadAdapter would have loaded is loaded eagerly.
+    thread_models = model.MessageThread.find_query(
+        session, list(thread_ids.values())
+    ).options(
+        joinedload('initiator'), joinedload('respondent'),
+        subqueryload('messages').joinedload('sender'),
+        subqueryload('messages').joinedload('recipient')
+    ).all()
+    message_models = model.Message.find_query(
+        session, list(message_ids.values())
+    ).options(joinedload('sender'), joinedload('recipient')).all()
+    return thread_models, message_models
+
+
+sync_threads = with_txn(sync_threads_no_txn)
@@ -1,6 +1,8 @@
+import collections
 import logging
 
 import simplejson
+from sqlalchemy.sql import func
 
 from okcupyd import helpers
 from okcupyd.db import adapters
@@ -11,11 +13,59 @@ from okcupyd.util import curry
 log = logging.getLogger(__name__)
 
 
+#: A summary of a single call to :meth:`.Sync.update_mailbox`.
+#: `threads_skipped` threads were found to be unchanged in the thread list,
+#: which saved an estimated `requests_saved` requests.
+SyncSummary = collections.namedtuple(
+    'SyncSummary',
+    ('threads_seen', 'threads_synced', 'threads_skipped', 'requests_saved')
+)
+
+
+def _truncate_like(a_datetime, displayed):
+    """Truncate `a_datetime` to the precision of `displayed`, a time parsed
+    by :func:`~okcupyd.helpers.parse_date_updated`. Dates are parsed as
+    midnight and times of day to the minute. Anything else (e.g. "yesterday")
+    has no known precision, so `None` is returned.
+    """
+    if displayed.second or displayed.microsecond:
+        return None
+    if displayed.hour == displayed.minute == 0:
+        return a_datetime.replace(hour=0, minute=0, second=0, microsecond=0)
+    return a_datetime.replace(second=0, microsecond=0)
+
+
 class Sync(object):
-    """Sync messages from a users inbox to the okc database."""
+    """Sync messages from a users inbox to the okc database.
 
-    def __init__(self, user):
+    Only threads that have changed since they were last synced are loaded.
+    The thread list only shows the time of a thread's last activity as a date
+    or as a time of day, so a thread is considered unchanged only when that
+    time is strictly earlier than the newest message that is stored for it,
+    truncated to the same precision. A thread whose time is in the same day
+    (or minute) as its newest stored message is always loaded.
+    """
+
+    #: The number of requests that loading an unchanged thread would have
+    #: made: one for its messages and one for the correspondent's profile.
+    requests_per_thread = 2
+
+    def __init__(self, user, max_unchanged=30, batch_size=30):
+        """
+        :param user: The :class:`~okcupyd.user.User` whose mailboxes should be
+                     synced.
+        :param max_unchanged: The number of consecutive unchanged threads
+                              (about a page of the thread list) after which
+                              a mailbox is assumed to be up to date.
+        :param batch_size: The number of changed threads that are written to
+                           the database together, in a single transaction.
+        """
         self._user = user
+        self.max_unchanged = max_unchanged
+        self.batch_size = batch_size
+        #: A dictionary mapping mailbox names to the :data:`.SyncSummary` of
+        #: the last time that they were synced.
+        self.summaries = {}
 
     def all(self):
         self.update_mailbox('outbox')
@@ -38,12 +88,17 @@ class Sync(object):
 
             res = self._sync_mailbox_until(
                 getattr(self._user, mailbox_name)(),
-                getattr(okcupyd_user, last_updated_name)
+                getattr(okcupyd_user, last_updated_name),
+                session
             )
             if not res:
                 return None, None
 
-            last_updated, threads, new_messages = res
+            last_updated, threads, new_messages, summary = res
+            self.summaries[mailbox_name] = summary
+            log.info(simplejson.dumps(
+                {'{0}_sync'.format(mailbox_name): summary._asdict()}
+            ))
             if last_updated:
                 setattr(okcupyd_user, last_updated_name, last_updated)
             return threads, new_messages
@@ -51,19 +106,55 @@ class Sync(object):
     inbox = update_mailbox(mailbox_name='inbox')
     outbox = update_mailbox(mailbox_name='outbox')
 
-    def _sync_mailbox_until(self, mailbox, sync_until):
+    @staticmethod
+    def _last_synced_message_time(session, thread):
+        return session.query(func.max(model.Message.time_sent)).join(
+            model.MessageThread
+        ).filter(model.MessageThread.okc_id == thread.id).scalar()
+
+    def _is_unchanged(self, session, thread):
+        last_synced = self._last_synced_message_time(session, thread)
+        if last_synced is None:
+            return False
+        last_synced = _truncate_like(last_synced, thread.datetime)
+        return last_synced is not None and thread.datetime < last_synced
+
+    def _sync_mailbox_until(self, mailbox, sync_until, session):
         threads = []
         messages = []
+        batch = []
+
+        def write_batch():
+            thread_models, new_messages = adapters.sync_threads(list(batch))
+            threads.extend(thread_models)
+            messages.extend(new_messages)
+            del batch[:]
+
+        seen = skipped = unchanged_in_a_row = 0
         for thread in mailbox:
             if sync_until and sync_until > thread.datetime:
                 break
+            seen += 1
+            # This check only uses the thread list, so it must come before
+            # anything that loads the thread's messages or profiles.
+            if self._is_unchanged(session, thread):
+                skipped += 1
+                unchanged_in_a_row += 1
+                if unchanged_in_a_row >= self.max_unchanged:
+                    break
+                continue
+            unchanged_in_a_row = 0
             if not thread.messages:
                 continue
             if not thread.with_deleted_user:
-                thread, new_messages = adapters.ThreadAdapter(thread).get_thread()
-                threads.append(threads)
-                messages.extend(new_messages)
+                batch.append(thread)
+                if len(batch) >= self.batch_size:
+                    write_batch()
+        if batch:
+            write_batch()
+        summary = SyncSummary(seen, len(threads), skipped,
+                              skipped * self.requests_per_thread)
         try:
-            return mailbox[0].datetime, threads, messages
+            return mailbox[0].datetime, threads, messages, summary
         except IndexError:
             pass
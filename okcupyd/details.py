@@ -9,7 +9,6 @@ from . import helpers
 from . import magicnumbers
 from . import util
 from .magicnumbers import maps
-from .xpath import xpb
 
 
 log = logging.getLogger(__name__)
@@ -95,24 +94,12 @@ class Details(object):
     def __init__(self, profile):
         self.profile = profile
 
-    _profile_details_xpb = xpb.div(id='profile_details').dl
-
     def refresh(self):
         util.cached_property.bust_caches(self)
 
     @util.cached_property
     def id_to_display_name_value(self):
-        output = {}
-        for element in self._profile_details_xpb.apply_(
-            self.profile.profile_tree
-        ):
-            value_element = xpb.dd.one_(element)
-            if not 'id' in value_element.attrib:
-                continue
-            id_name = value_element.attrib['id'].replace('ajax_', '')
-            value = value_element.text_content()
-            output[id_name] = value
-        return output
+        return dict(self.profile.extracted.details)
 
     @property
     def as_dict(self):
@@ -1,6 +1,5 @@
 from . import util
 from . import helpers
-from .xpath import xpb
 
 
 class Essays(object):
@@ -8,20 +7,21 @@ class Essays(object):
 
     @staticmethod
     def build_essay_property(essay_index, essay_name):
-        essay_xpb = xpb.div(id='essay_{0}'.format(essay_index))
-        essay_text_xpb = essay_xpb.div.with_class('text').div.with_class('essay')
         @property
         def essay(self):
-            try:
-                essay_text = essay_text_xpb.get_text_(self._essays).strip()
-            except IndexError:
+            extracted = self._profile.extracted
+            essay_text = extracted.essays.get(essay_index)
+            if essay_text is None:
                 return None
             if essay_name not in self._short_name_to_title:
-                self._short_name_to_title[essay_name] = helpers.replace_chars(
-                    essay_xpb.a.with_class('essay_title').get_text_(
-                        self._profile.profile_tree
+                try:
+                    title = extracted.essay_titles[essay_index]
+                except KeyError:
+                    raise IndexError(
+                        'No title was found for essay {0}'.format(essay_index)
                     )
-                )
+                self._short_name_to_title[essay_name] = \
+                    helpers.replace_chars(title)
             return essay_text
 
         @essay.setter
@@ -36,7 +36,6 @@ class Essays(object):
             setattr(cls, essay_name,
                     cls.build_essay_property(essay_index, essay_name))
 
-    _essays_xpb = xpb.div(id='main_column')
     #: A list of the attribute names that are used to store the text of
     #: of essays on instances of this class.
     essay_names = ['self_summary', 'my_life', 'good_at', 'people_first_notice',
@@ -53,10 +52,6 @@ class Essays(object):
         for i in self: pass # Make sure that all essays names have been retrieved
         return self._short_name_to_title
 
-    @util.cached_property
-    def _essays(self):
-        return self._essays_xpb.one_(self._profile.profile_tree)
-
     def _submit_essay(self, essay_id, essay_body):
         self._profile.authcode_post('profileedit2', data={
             "essay_id": essay_id,
@@ -7,7 +7,6 @@ from . import helpers
 from . import magicnumbers
 from . import util
 from . import filter
-from .profile import Profile
 from .session import Session
 from .xpath import xpb
 
@@ -149,19 +148,23 @@ class MatchCardExtractor(object):
     def id(self):
         return int(self._id_xpb.one_(self._div))
 
+    _username_xpb = xpb.div.with_class('username')
+
     @property
     def username(self):
-        return xpb.div.with_class('username').get_text_(self._div).strip()
+        return self._username_xpb.get_text_(self._div).strip()
+
+    _age_xpb = xpb.span.with_class('age')
 
     @property
     def age(self):
-        return int(xpb.span.with_class('age').get_text_(self._div))
+        return int(self._age_xpb.get_text_(self._div))
+
+    _location_xpb = xpb.span.with_class('location')
 
     @property
     def location(self):
-        return helpers.replace_chars(
-            xpb.span.with_class('location').get_text_(self._div)
-        )
+        return helpers.replace_chars(self._location_xpb.get_text_(self._div))
 
     _match_percentage_xpb = xpb.div.with_classes('percentage_wrapper', 'match').\
                             span.with_classes('percentage')
@@ -183,9 +186,11 @@ class MatchCardExtractor(object):
         except:
             return None
 
+    _contacted_xpb = xpb.div.with_class('fancydate')
+
     @property
     def contacted(self):
-        return bool(xpb.div.with_class('fancydate').apply_(self._div))
+        return bool(self._contacted_xpb.apply_(self._div))
 
     @property
     def as_dict(self):
@@ -226,8 +231,7 @@ def SearchFetchable(session=None, **kwargs):
         SearchHTMLFetcher(session, **kwargs),
         util.SimpleProcessor(
             session,
-            lambda match_card_div: Profile(
-                session=session,
+            lambda match_card_div: session.get_profile(
                 **MatchCardExtractor(match_card_div).as_dict
             ),
             _match_card_xpb
@@ -1,5 +1,9 @@
+import datetime
+import hashlib
 import logging
+import time
 
+from requests import exceptions
 import simplejson
 import six
 
@@ -7,7 +11,7 @@ from . import filter
 from . import helpers
 from . import magicnumbers
 from . import util
-from .profile import Profile
+from .search_checkpoint import SearchCheckpoint
 from .session import Session
 
 
@@ -20,7 +24,8 @@ search_filters = filter.Filters(strict=False)
 # The docstring below is extended automatically. Read it in its entirety at
 # http://okcupyd.readthedocs.org/en/latest/ or by generating the documentation
 # yourself.
-def SearchFetchable(session=None, **kwargs):
+def SearchFetchable(session=None, checkpoint_store=None, resume_from=None,
+                    **kwargs):
     """Search okcupid.com with the given parameters. Parameters are
     registered to this function through
     :meth:`~okcupyd.filter.Filters.register_filter_builder` of
@@ -31,34 +36,221 @@ def SearchFetchable(session=None, **kwargs):
 
     :param session: A logged in session.
     :type session: :class:`~okcupyd.session.Session`
+    :param checkpoint_store: A store from :mod:`okcupyd.search_checkpoint` in
+                             which a checkpoint is saved every time a page of
+                             results has been consumed.
+    :param resume_from: A :class:`~okcupyd.search_checkpoint.SearchCheckpoint`
+                        to continue the search from, or `True` to continue
+                        from the checkpoint in `checkpoint_store` for these
+                        search parameters. The first item of the returned
+                        fetchable is the first profile that was not
+                        delivered before the checkpoint.
     """
     session = session or Session.login()
     return util.Fetchable(
         SearchManager(
             SearchJSONFetcher(session, **kwargs),
-            ProfileBuilder(session)
+            ProfileBuilder(session),
+            checkpoint_store=checkpoint_store,
+            resume_from=resume_from
         )
     )
 
 
+class AdaptivePageSize(object):
+    """Choose the `limit` of each json search request.
+
+    Consumers that say how many profiles they want (see :meth:`.expect`)
+    get pages of that size, so that e.g. `search(count=1)` requests a single
+    profile. Otherwise pages start at `initial` profiles and double while
+    full pages come back in less than half of `target_latency`. Requests
+    that are slower than `target_latency` or that fail halve the largest
+    page size that will be requested. Only the HTTP exchange of a request
+    counts towards its latency, not the time spent waiting on the session's
+    rate limiter before it.
+    """
+
+    def __init__(self, initial=18, minimum=1, maximum=100,
+                 target_latency=3.0, clock=time.time):
+        self.current = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        #: The largest page size that will currently be requested.
+        self.ceiling = maximum
+        self.target_latency = target_latency
+        self.clock = clock
+        self._wanted = None
+        self._wants_all = False
+        #: An exponentially weighted average of the number of profiles
+        #: received per second of request time.
+        self.items_per_second = None
+
+    def expect(self, count):
+        """Record that the consumer wants at least `count` profiles in total,
+        or all of them if `count` is `None`.
+        """
+        if count is None:
+            self._wants_all = True
+        elif self._wanted is None or count > self._wanted:
+            self._wanted = count
+
+    def _clamp(self, size):
+        return max(self.minimum, min(size, self.ceiling))
+
+    def limit(self, delivered):
+        """
+        :param delivered: The number of profiles delivered so far.
+        :returns: The page size to request next.
+        """
+        if self._wants_all:
+            return self.ceiling
+        if self._wanted is not None and self._wanted > delivered:
+            remaining = self._wanted - delivered
+            if delivered:
+                remaining = max(remaining, self.current)
+            return self._clamp(remaining)
+        return self._clamp(self.current)
+
+    def record(self, limit, count, elapsed):
+        """Adapt to a request for `limit` profiles that returned `count` of
+        them in `elapsed` seconds.
+        """
+        if elapsed > 0:
+            items_per_second = count / float(elapsed)
+            self.items_per_second = (
+                items_per_second if self.items_per_second is None
+                else (self.items_per_second + items_per_second) / 2
+            )
+        if elapsed > self.target_latency:
+            self.failure(limit)
+        elif elapsed < self.target_latency / 2 and count >= limit:
+            self.ceiling = min(self.maximum, max(self.ceiling, limit * 2))
+            if limit >= self.current:
+                self.current = self._clamp(self.current * 2)
+
+    def failure(self, limit):
+        """Adapt to a request for `limit` profiles that failed or was too
+        slow.
+        """
+        self.ceiling = max(self.minimum, limit // 2)
+        self.current = self._clamp(self.current)
+
+
 class SearchManager(object):
 
-    def __init__(self, search_fetchable, profile_builder):
+    #: The number of usernames that are remembered to drop profiles that
+    #: show up again on a later page, as happens when results shift between
+    #: requests.
+    deduplication_size = 100000
+
+    def __init__(self, search_fetchable, profile_builder,
+                 checkpoint_store=None, resume_from=None,
+                 deduplication_size=None, page_size=None, retries=2):
         self._search_fetchable = search_fetchable
         self._profile_builder = profile_builder
+        #: The :class:`~.AdaptivePageSize` that chooses the size of the pages
+        #: that are requested when no explicit `count` is given.
+        self.page_size = page_size or AdaptivePageSize()
+        self._retries = retries
+        #: A :class:`~okcupyd.util.Deduplicator` whose counters record how
+        #: many profiles were delivered and how many were dropped as
+        #: duplicates.
+        self.deduplicator = util.Deduplicator(
+            max_size=deduplication_size or self.deduplication_size,
+            key=lambda profile: profile.username.lower()
+        )
+        self._checkpoint_store = checkpoint_store
         self._last_after = None
-
-    def fetch(self, count=18):
+        #: The number of profiles that have been delivered by this search,
+        #: including those delivered before the checkpoint it was resumed
+        #: from.
+        self.delivered = 0
+        #: The :class:`~okcupyd.search_checkpoint.SearchCheckpoint` of the
+        #: last page of results that was consumed completely.
+        self.checkpoint = None
+        if resume_from is not None:
+            self.resume(resume_from)
+        self._initially_delivered = self.delivered
+
+    @property
+    def parameters_hash(self):
+        return self._search_fetchable.parameters_hash
+
+    def resume(self, checkpoint):
+        """Continue the search from `checkpoint`, or from the checkpoint in
+        the checkpoint store if `checkpoint` is `True`.
+
+        :raises: ValueError if `checkpoint` is `True` and there is no
+                 checkpoint store, or if `checkpoint` was saved by a search
+                 with different parameters.
+        """
+        if checkpoint is True:
+            if self._checkpoint_store is None:
+                raise ValueError(
+                    "A checkpoint store is needed to resume from its "
+                    "checkpoint."
+                )
+            checkpoint = self._checkpoint_store.load(self.parameters_hash)
+            if checkpoint is None:
+                return
+        if checkpoint.parameters_hash != self.parameters_hash:
+            raise ValueError(
+                "The checkpoint was saved by a search with different "
+                "parameters."
+            )
+        self._last_after = checkpoint.after
+        self.delivered = checkpoint.delivered
+        self.checkpoint = checkpoint
+
+    def expect(self, count):
+        """Called by :class:`~okcupyd.util.fetchable.Fetchable` with the number
+        of profiles that its consumer needs, so that pages can be sized
+        accordingly.
+        """
+        self.page_size.expect(count)
+
+    def fetch(self, count=None):
+        """
+        :param count: The size of the pages to request. By default it is
+                      chosen by :attr:`.page_size`.
+        """
         last_last_after = object()
         while last_last_after != self._last_after:
             last_last_after = self._last_after
             for profile in self.fetch_once(count=count):
                 yield profile
 
-    def fetch_once(self, count=18):
-        response = self._search_fetchable.fetch(
-            after=self._last_after, count=count
-        )
+    def _request_page(self, count):
+        for attempt in range(self._retries + 1):
+            limit = count or self.page_size.limit(
+                self.delivered - self._initially_delivered
+            )
+            started_at = self.page_size.clock()
+            self._search_fetchable.last_elapsed = None
+            try:
+                response = self._search_fetchable.fetch(
+                    after=self._last_after, count=limit
+                )
+            except (exceptions.RequestException, ValueError) as exc:
+                self.page_size.failure(limit)
+                if attempt == self._retries:
+                    raise
+                log.warning(simplejson.dumps({
+                    'msg': 'search request failed, retrying',
+                    'limit': limit, 'error': repr(exc)
+                }))
+            else:
+                elapsed = self._search_fetchable.last_elapsed
+                if elapsed is None:
+                    # The fetcher doesn't know how long the HTTP exchange
+                    # took, so this includes any rate limiter wait.
+                    elapsed = self.page_size.clock() - started_at
+                self.page_size.record(limit, len(response.get('data', ())),
+                                      elapsed)
+                return response
+
+    def fetch_once(self, count=None):
+        response = self._request_page(count)
         try:
             self._last_after = response['paging']['cursors']['after']
         except KeyError:
@@ -68,8 +260,13 @@ class SearchManager(object):
                     'response': response
                 }
             ))
-        for profile in self._profile_builder(response):
+        for profile in self.deduplicator(self._profile_builder(response)):
+            self.delivered += 1
             yield profile
+        self.checkpoint = SearchCheckpoint(self.parameters_hash,
+                                           self._last_after, self.delivered)
+        if self._checkpoint_store is not None:
+            self._checkpoint_store.save(self.checkpoint)
 
 
 class SearchJSONFetcher(object):
@@ -79,11 +276,26 @@ class SearchJSONFetcher(object):
         'Content-Type': 'application/json'
     }
 
+    #: The number of seconds that the HTTP exchange of the last request took,
+    #: excluding the time spent waiting on the session's rate limiter, or
+    #: `None` if it is not known.
+    last_elapsed = None
+
     def __init__(self, session=None, **options):
         self._session = session or Session.login()
         self._options = options
         self._parameters = search_filters.build(session=self._session, **options)
 
+    @util.cached_property
+    def parameters_hash(self):
+        """A hash of the search parameters and the logged in user, which
+        identifies the checkpoints of this search.
+        """
+        serialized = simplejson.dumps(
+            [self._session.log_in_name, self._parameters], sort_keys=True
+        )
+        return hashlib.sha1(serialized.encode('utf-8')).hexdigest()
+
     def _get_headers(self):
         headers = helpers.make_auth_header_dictionary(self._session)
         headers.update(self.default_headers)
@@ -109,6 +321,9 @@ class SearchJSONFetcher(object):
         request_parameters = self._request_params(after=after, count=count)
         log.info(simplejson.dumps(request_parameters))
         response = self._session.okc_post(**request_parameters)
+        elapsed = getattr(response, 'elapsed', None)
+        if isinstance(elapsed, datetime.timedelta):
+            self.last_elapsed = elapsed.total_seconds()
         try:
             search_json = response.json()
         except:
@@ -118,10 +333,53 @@ class SearchJSONFetcher(object):
 
 
 class ProfileBuilder(object):
+    """Build :class:`~okcupyd.profile.Profile` instances from the results of
+    a json search.
+
+    The values that the search response already contains (age, location,
+    match and enemy percentages, likes and the user id) are used to populate
+    the corresponding cached properties of each profile so that reading them
+    does not require the profile page to be loaded.
+    """
 
     def __init__(self, session):
         self._session = session
 
+    @staticmethod
+    def _percentage(value):
+        # Percentages are provided in hundredths of a percent.
+        return int(value) // 100
+
+    @staticmethod
+    def _location(location):
+        region = location.get('state_code') or location.get('country_name')
+        return u', '.join(part for part in (location.get('city_name'), region)
+                          if part)
+
+    @classmethod
+    def profile_properties(cls, profile_info):
+        """Translate a single search result into a dictionary of values for
+        the cached properties of :class:`~okcupyd.profile.Profile`.
+        """
+        properties = {}
+        if 'userid' in profile_info:
+            properties['id'] = int(profile_info['userid'])
+        if 'age' in profile_info:
+            properties['age'] = int(profile_info['age'])
+        if 'match' in profile_info:
+            properties['match_percentage'] = cls._percentage(
+                profile_info['match']
+            )
+        if 'enemy' in profile_info:
+            properties['enemy_percentage'] = cls._percentage(
+                profile_info['enemy']
+            )
+        if 'liked' in profile_info:
+            properties['liked'] = bool(profile_info['liked'])
+        if profile_info.get('location'):
+            properties['location'] = cls._location(profile_info['location'])
+        return properties
+
     def __call__(self, response_dictionary):
         try:
             profile_infos = response_dictionary['data']
@@ -134,7 +392,13 @@ class ProfileBuilder(object):
             ))
         else:
             for profile_info in profile_infos:
-                yield Profile(self._session, profile_info["username"])
+                yield self._build_profile(
+                    profile_info["username"],
+                    self.profile_properties(profile_info)
+                )
+
+    def _build_profile(self, username, properties):
+        return self._session.get_profile(username, **properties)
 
 
 class GentationFilter(search_filters.filter_class):
@@ -8,7 +8,6 @@ import simplejson
 from . import magicnumbers
 from . import util
 from . import filter
-from .xpath import xpb
 
 
 log = logging.getLogger(__name__)
@@ -34,18 +33,12 @@ class LookingFor(object):
     _ages_re = re.compile(u'\s*Ages ([0-9]{1,3})\u2013([0-9]{1,3})\s*')
     _ages_re2 = re.compile(u'\s*Age ([0-9]{1,3})')
 
-    _looking_for_xpb = xpb.div.with_classes('text', 'what_i_want')
-
     def __init__(self, profile):
         self._profile = profile
 
     @util.cached_property
     def raw_fields(self):
-        li_elements = self._looking_for_xpb.li.apply_(
-            self._profile.profile_tree
-        )
-        return {li.attrib['id'].split('_')[1]: li.text_content()
-                for li in li_elements}
+        return dict(self._profile.extracted.looking_for)
 
     def update_property(function):
         @property
@@ -77,8 +70,8 @@ class LookingFor(object):
     def single(self):
         """Whether or not the user is only interested in people that are single.
         """
-        return 'display: none;' not in self._looking_for_xpb.li(id='ajax_single').\
-            one_(self._profile.profile_tree).attrib['style']
+        return 'display: none;' not in \
+            self._profile.extracted.one('single_style')
 
     @update_property
     def near_me(self):
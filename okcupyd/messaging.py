@@ -1,3 +1,4 @@
+import collections
 import logging
 
 from lxml import html
@@ -15,13 +16,32 @@ thread_element_xpath = XPathBuilder(relative=False).li.with_classes('thread',
                                                                     'message')
 
 
-def ThreadFetcher(session, mailbox_number):
+#: A compact snapshot of a :class:`~.Message`, built by
+#: :meth:`~.Message.to_record`. `sender` and `recipient` are usernames.
+MessageRecord = collections.namedtuple(
+    'MessageRecord',
+    ('id', 'from_me', 'sender', 'recipient', 'content', 'time_sent')
+)
+
+
+#: A compact snapshot of a :class:`~.MessageThread`, built by
+#: :meth:`~.MessageThread.to_record`. `messages` is a tuple of
+#: :class:`~.MessageRecord`, or `None` if the messages were not included.
+MessageThreadRecord = collections.namedtuple(
+    'MessageThreadRecord',
+    ('id', 'correspondent', 'correspondent_id', 'read', 'datetime',
+     'messages')
+)
+
+
+def ThreadFetcher(session, mailbox_number, read_ahead=0):
     return util.FetchMarshall(
         ThreadHTMLFetcher(session, mailbox_number),
-        util.SimpleProcessor(
-            session, lambda elem: MessageThread(session, elem),
-            thread_element_xpath
-        )
+        util.StreamingProcessor(
+            lambda elem: MessageThread(session, elem), 'li',
+            ('thread', 'message')
+        ),
+        read_ahead=read_ahead
     )
 
 
@@ -100,13 +120,37 @@ class Message(object):
         self._message_element = message_element
         self._message_thread = message_thread
 
-    @property
+    def detach(self):
+        """Evaluate this message's fields and release the element that they
+        were read from, so that the page that it belongs to can be freed.
+        """
+        return util.detach(self, ('id', 'from_me', 'content', 'time_sent'),
+                           ('_message_element',))
+
+    def to_record(self):
+        """
+        :returns: A :class:`~.MessageRecord` holding the fields of this
+                  message and no reference to its element or thread.
+        """
+        return MessageRecord(id=self.id, from_me=self.from_me,
+                             sender=self.sender.username,
+                             recipient=self.recipient.username,
+                             content=self.content, time_sent=self.time_sent)
+
+    @util.cached_property
     def id(self):
         """
         :returns: The id assigned to this message by okcupid.com.
         """
         return int(self._message_element.attrib['id'].split('_')[-1])
 
+    @util.cached_property
+    def from_me(self):
+        """
+        :returns: Whether or not this message was sent by the logged in user.
+        """
+        return 'from_me' in self._message_element.attrib['class']
+
     @util.cached_property
     def sender(self):
         """
@@ -114,7 +158,7 @@ class Message(object):
                   to the sender of this message.
         """
         return (self._message_thread.user_profile
-                if 'from_me' in self._message_element.attrib['class']
+                if self.from_me
                 else self._message_thread.correspondent_profile)
 
     @util.cached_property
@@ -124,7 +168,7 @@ class Message(object):
                   to the recipient of this message.
         """
         return (self._message_thread.correspondent_profile
-                if 'from_me' in self._message_element.attrib['class']
+                if self.from_me
                 else self._message_thread.user_profile)
 
     _content_xpb = xpb.div.with_class('message_body')
@@ -207,6 +251,45 @@ class MessageThread(object):
         #: objects.
         self.messages = util.Fetchable(self._message_fetcher)
 
+    def detach(self):
+        """Evaluate the fields of this thread that come from the thread list
+        and release its element, so that the thread list page can be freed.
+        If this thread's messages have been loaded, they are detached and the
+        messages page is released as well.
+        """
+        properties = ('id', 'correspondent', 'read', 'datetime', 'date')
+        if 'data-personid' in self._thread_element.attrib:
+            # Otherwise correspondent_id would load the correspondent's
+            # profile.
+            properties += ('correspondent_id',)
+        util.detach(self, properties, ('_thread_element',))
+        if 'messages_tree' in self._message_fetcher.__dict__:
+            for message in self.messages:
+                message.detach()
+            util.cached_property.bust_caches(self._message_fetcher)
+        return self
+
+    def to_record(self, include_messages=False):
+        """
+        :param include_messages: Whether or not to include records of the
+                                 messages of this thread, which requires them
+                                 to be loaded.
+        :returns: A :class:`~.MessageThreadRecord` holding the fields of this
+                  thread and no reference to its elements or session.
+        """
+        try:
+            correspondent = self.correspondent
+        except errors.NoCorrespondentError:
+            correspondent = None
+        messages = None
+        if include_messages:
+            messages = tuple(message.to_record() for message in self.messages)
+        return MessageThreadRecord(
+            id=self.id, correspondent=correspondent,
+            correspondent_id=self.correspondent_id, read=self.read,
+            datetime=self.datetime, messages=messages
+        )
+
     @util.cached_property
     def id(self):
         """
@@ -1,5 +1,6 @@
 import datetime
 import logging
+import zlib
 
 from lxml import html
 import simplejson
@@ -9,6 +10,7 @@ from . import essay
 from . import helpers
 from . import looking_for
 from . import util
+from .profile_extractor import ProfileExtractor
 from .question import QuestionFetcher
 from .xpath import xpb
 
@@ -41,6 +43,7 @@ class Profile(object):
         self._session = session
         #: The username of the user to whom this profile belongs.
         self.username = username
+        self._compressed_profile_response = None
         #: A :class:`~okcupyd.util.fetchable.Fetchable` of
         #: :class:`~okcupyd.question.Question` instances, each corresponding
         #: to a question that has been answered by the user to whom this
@@ -72,7 +75,13 @@ class Profile(object):
                        new profile_tree will be returned.
         """
         util.cached_property.bust_caches(self, excludes=('authcode'))
+        self._compressed_profile_response = None
         self.questions = self.question_fetchable()
+        profile_cache = getattr(self._session, 'profile_cache', None)
+        if profile_cache is not None:
+            # Restart the ttl of this profile, since its page will be
+            # downloaded again the next time one of its properties is read.
+            profile_cache.touch(self._session.profile_cache_key(self.username))
         if reload:
             return self.profile_tree
 
@@ -83,8 +92,40 @@ class Profile(object):
                    belong to the same user and False otherwise."""
         return self._session.log_in_name.lower() == self.username.lower()
 
+    #: The properties that :meth:`.detach` evaluates, in addition to
+    #: :attr:`.extracted`, before it releases the profile page.
+    _detached_properties = ('authcode', 'contacted', 'responds')
+
+    def detach(self, keep_compressed_response=False):
+        """Extract the fields of the profile page eagerly and release the
+        page's lxml tree and response body, which hold most of the memory of a
+        loaded :class:`.Profile`. Profiles whose page has not been loaded are
+        left as they are.
+
+        Fields that were not extracted will load the page again when they
+        are accessed.
+
+        :param keep_compressed_response: Keep a zlib compressed copy of the
+                                         response, so that the page can be
+                                         parsed again without a request.
+        """
+        if not ('profile_tree' in self.__dict__ or
+                '_profile_response' in self.__dict__):
+            return self
+        properties = ('extracted',) + self._detached_properties
+        if self.is_logged_in_user:
+            properties += ('_current_user_id',)
+        if keep_compressed_response:
+            self._compressed_profile_response = zlib.compress(
+                self._profile_response
+            )
+        return util.detach(self, properties,
+                           ('profile_tree', '_profile_response'))
+
     @util.cached_property
     def _profile_response(self):
+        if self._compressed_profile_response is not None:
+            return zlib.decompress(self._compressed_profile_response)
         return self._session.okc_get(
             u'profile/{0}'.format(self.username)
         ).content
@@ -98,6 +139,15 @@ class Profile(object):
         """
         return html.fromstring(self._profile_response)
 
+    @util.cached_property
+    def extracted(self):
+        """
+        :returns: A :class:`~okcupyd.profile_extractor.ProfileRecord` of the
+                  fields on the profile page, which is built with a single
+                  walk of :attr:`.profile_tree`.
+        """
+        return ProfileExtractor(self.profile_tree).extract()
+
     def message_request_parameters(self, content, thread_id):
         return {
             'ajax': 1,
@@ -140,8 +190,6 @@ class Profile(object):
         """
         return looking_for.LookingFor(self)
 
-    _liked_xpb = xpb.button.with_class('binary_rating_button')
-
     @property
     def rating(self):
         """
@@ -158,8 +206,7 @@ class Profile(object):
         :returns: Whether or not the logged in user liked this profile
         """
         if self.is_logged_in_user: return False
-        classes = self._liked_xpb.one_(self.profile_tree).attrib['class'].split()
-        return 'liked' in classes
+        return 'liked' in self.extracted.one('rating_button_classes')
 
     _contacted_xpb = xpb.div.with_class('actions2015').button.\
                      with_classes('actions2015-chat', 'flatbutton', 'blue').\
@@ -190,16 +237,13 @@ class Profile(object):
         if 'contacted' not in contacted_text:
             return contacted_text.strip().replace('replies ', '')
 
-    _id_xpb = xpb.button.with_class('binary_rating_button').\
-              select_attribute_("data-tuid")
-
     @util.cached_property
     def id(self):
         """
         :returns: The id that okcupid.com associates with this profile.
         """
         if self.is_logged_in_user: return self._current_user_id
-        return int(self._id_xpb.one_(self.profile_tree))
+        return int(self.extracted.one('tuid'))
 
     @util.cached_property
     def _current_user_id(self):
@@ -213,9 +257,6 @@ class Profile(object):
         """
         return essay.Essays(self)
 
-    _age_xpb = xpb.span.with_class('userinfo2015-basics-asl-age')
-    _user_age_xpb = xpb.span(id='ajax_age')
-
     @util.cached_property
     def age(self):
         """
@@ -223,12 +264,10 @@ class Profile(object):
         """
         if self.is_logged_in_user: 
             # Retrieve the logged-in user's profile age
-            return int(self._user_age_xpb.get_text_(self.profile_tree).strip())
+            return int(self.extracted.one('user_age').strip())
         else:
             # Retrieve a non logged-in user's profile age
-            return int(self._age_xpb.get_text_(self.profile_tree))
-
-    _percentages_and_ratings_xpb = xpb.div.with_class('matchanalysis2015-graphs')
+            return int(self.extracted.one('age'))
 
     @util.cached_property
     def match_percentage(self):
@@ -236,11 +275,7 @@ class Profile(object):
         :returns: The match percentage of the logged in user and the user
                   associated with this object.
         """
-        return int(self._percentages_and_ratings_xpb.
-                   div.with_class('matchgraph--match').
-                   div.with_class('matchgraph-graph').
-                   canvas.select_attribute_('data-pct').
-                   one_(self.profile_tree))
+        return int(self.extracted.one('match_percentage'))
 
     @util.cached_property
     def enemy_percentage(self):
@@ -248,14 +283,7 @@ class Profile(object):
         :returns: The enemy percentage of the logged in user and the user
                   associated with this object.
         """
-        return int(self._percentages_and_ratings_xpb.
-                   div.with_class('matchgraph--enemy').
-                   div.with_class('matchgraph-graph').
-                   canvas.select_attribute_('data-pct').
-                   one_(self.profile_tree))
-
-    _location_xpb = xpb.span.with_class('userinfo2015-basics-asl-location')
-    _user_location_xpb = xpb.span(id='ajax_location')
+        return int(self.extracted.one('enemy_percentage'))
 
     @util.cached_property
     def location(self):
@@ -264,21 +292,20 @@ class Profile(object):
         """
         if self.is_logged_in_user: 
             # Retrieve the logged-in user's profile location
-            return self._user_location_xpb.get_text_(self.profile_tree)
+            return self.extracted.one('user_location')
         else:
             # Retrieve a non logged-in user's profile location
-            return self._location_xpb.get_text_(self.profile_tree)
+            return self.extracted.one('location')
 
     @util.cached_property
     def gender(self):
         """The gender of the user associated with this profile."""
-        return xpb.span.with_class('ajax_gender').get_text_(self.profile_tree)
+        return self.extracted.one('gender')
 
     @util.cached_property
     def orientation(self):
         """The sexual orientation of the user associated with this profile."""
-        return xpb.dd(id='ajax_orientation').\
-            get_text_(self.profile_tree).strip()
+        return self.extracted.one('orientation').strip()
 
     @util.curry
     def message(self, message, thread_id=None):
@@ -0,0 +1,187 @@
+"""Extract every field that :class:`~okcupyd.profile.Profile` and its
+:class:`~okcupyd.details.Details`, :class:`~okcupyd.essay.Essays` and
+:class:`~okcupyd.looking_for.LookingFor` read from a profile page in a single
+walk of the page's tree.
+"""
+from lxml import etree
+import six
+
+
+class ProfileRecord(object):
+    """The fields of a profile page, as extracted by
+    :class:`~.ProfileExtractor`. Fields that were not found on the page are
+    `None`.
+    """
+
+    __slots__ = ('rating_button_classes', 'tuid', 'age', 'user_age',
+                 'location', 'user_location', 'match_percentage',
+                 'enemy_percentage', 'gender', 'orientation', 'details',
+                 'essays', 'essay_titles', 'looking_for', 'single_style')
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, None)
+        #: A dictionary mapping detail ids to their displayed values.
+        self.details = {}
+        #: A dictionary mapping essay indices to their text.
+        self.essays = {}
+        #: A dictionary mapping essay indices to their titles.
+        self.essay_titles = {}
+        #: A dictionary mapping looking for field names to their text.
+        self.looking_for = {}
+
+    def one(self, name):
+        """
+        :returns: The value of the field `name`.
+        :raises: IndexError if the field was not found on the page, which
+                 is what the equivalent xpath lookup would have raised.
+        """
+        value = getattr(self, name)
+        if value is None:
+            raise IndexError('{0} was not found on the profile page'.format(
+                name
+            ))
+        return value
+
+
+class ProfileExtractor(object):
+    """Walk a profile page's tree once, building a :class:`~.ProfileRecord`.
+
+    Each field corresponds to an xpath that used to be evaluated against the
+    whole tree separately. Where that xpath relied on an element's ancestors
+    (e.g. the canvas inside the match graph), the walk tracks the enclosing
+    elements that are open at each point.
+    """
+
+    _essay_id_prefix = 'essay_'
+
+    def __init__(self, tree):
+        self._tree = tree
+
+    @staticmethod
+    def _classes(attrib):
+        return attrib.get('class', '').split()
+
+    def extract(self):
+        record = ProfileRecord()
+        # The elements that are open at the current point of the walk and
+        # that influence what is extracted from their descendants, along with
+        # the [role, data] that they were assigned.
+        open_elements = []
+        roles = []
+        for event, element in etree.iterwalk(self._tree,
+                                             events=('start', 'end')):
+            if event == 'end':
+                if open_elements and open_elements[-1] is element:
+                    open_elements.pop()
+                    roles.pop()
+                continue
+            tag = element.tag
+            if not isinstance(tag, six.string_types):
+                continue
+            role = self._visit(record, element, tag, element.attrib, roles)
+            if role is not None:
+                open_elements.append(element)
+                roles.append(role)
+        return record
+
+    @staticmethod
+    def _find_role(roles, name):
+        for role in reversed(roles):
+            if role[0] == name:
+                return role
+
+    def _visit(self, record, element, tag, attrib, roles):
+        element_id = attrib.get('id')
+        innermost = roles[-1] if roles else [None, None]
+        if tag == 'div':
+            classes = self._classes(attrib)
+            if element_id == 'profile_details':
+                return ['details', None]
+            if element_id == 'main_column':
+                return ['main_column', None]
+            if element_id and element_id.startswith(self._essay_id_prefix):
+                try:
+                    return ['essay',
+                            int(element_id[len(self._essay_id_prefix):])]
+                except ValueError:
+                    pass
+            if 'matchanalysis2015-graphs' in classes:
+                return ['graphs', None]
+            if 'matchgraph--match' in classes and \
+               self._find_role(roles, 'graphs'):
+                return ['match', None]
+            if 'matchgraph--enemy' in classes and \
+               self._find_role(roles, 'graphs'):
+                return ['enemy', None]
+            if 'matchgraph-graph' in classes:
+                return ['graph', None]
+            if 'text' in classes and 'what_i_want' in classes:
+                return ['looking_for', None]
+            if 'text' in classes and innermost[0] == 'essay':
+                return ['essay_text', innermost[1]]
+            if 'essay' in classes and innermost[0] == 'essay_text':
+                index = innermost[1]
+                if (self._find_role(roles, 'main_column') and
+                    index not in record.essays):
+                    record.essays[index] = element.text_content().strip()
+        elif tag == 'button':
+            classes = self._classes(attrib)
+            if 'binary_rating_button' in classes:
+                if record.rating_button_classes is None:
+                    record.rating_button_classes = classes
+                if record.tuid is None and 'data-tuid' in attrib:
+                    record.tuid = attrib['data-tuid']
+        elif tag == 'span':
+            classes = self._classes(attrib)
+            if 'userinfo2015-basics-asl-age' in classes:
+                self._set_once(record, 'age', element.text_content())
+            if 'userinfo2015-basics-asl-location' in classes:
+                self._set_once(record, 'location', element.text_content())
+            if 'ajax_gender' in classes:
+                self._set_once(record, 'gender', element.text_content())
+            if element_id == 'ajax_age':
+                self._set_once(record, 'user_age', element.text_content())
+            if element_id == 'ajax_location':
+                self._set_once(record, 'user_location',
+                               element.text_content())
+        elif tag == 'canvas':
+            if 'data-pct' in attrib and self._find_role(roles, 'graph'):
+                if self._find_role(roles, 'match'):
+                    self._set_once(record, 'match_percentage',
+                                   attrib['data-pct'])
+                elif self._find_role(roles, 'enemy'):
+                    self._set_once(record, 'enemy_percentage',
+                                   attrib['data-pct'])
+        elif tag == 'dl':
+            if self._find_role(roles, 'details'):
+                # The data of a dl records whether its first dd was seen.
+                return ['detail', False]
+        elif tag == 'dd':
+            if element_id == 'ajax_orientation':
+                self._set_once(record, 'orientation', element.text_content())
+            detail = self._find_role(roles, 'detail')
+            if detail is not None and not detail[1]:
+                # Only the first dd of each dl holds the detail's value.
+                detail[1] = True
+                if element_id:
+                    record.details[element_id.replace('ajax_', '')] = \
+                        element.text_content()
+        elif tag == 'li':
+            if element_id and self._find_role(roles, 'looking_for'):
+                if element_id == 'ajax_single':
+                    self._set_once(record, 'single_style',
+                                   attrib.get('style'))
+                record.looking_for[element_id.split('_')[1]] = \
+                    element.text_content()
+        elif tag == 'a':
+            if 'essay_title' in self._classes(attrib):
+                essay = self._find_role(roles, 'essay')
+                if essay is not None:
+                    record.essay_titles.setdefault(essay[1],
+                                                   element.text_content())
+
+    @staticmethod
+    def _set_once(record, name, value):
+        if getattr(record, name) is None:
+            setattr(record, name, value)
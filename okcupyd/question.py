@@ -1,3 +1,4 @@
+import collections
 import functools
 import logging
 
@@ -8,6 +9,31 @@ from .xpath import xpb
 log = logging.getLogger(__name__)
 
 
+#: A compact snapshot of a :class:`~.Question`, built by
+#: :meth:`~.Question.to_record`.
+QuestionRecord = collections.namedtuple(
+    'QuestionRecord',
+    ('id', 'text', 'answered', 'their_answer', 'my_answer',
+     'their_answer_matches', 'my_answer_matches', 'their_note', 'my_note')
+)
+
+
+#: A compact snapshot of a :class:`~.UserQuestion`, built by
+#: :meth:`~.UserQuestion.to_record`. `answer_options` is a tuple of
+#: :class:`~.AnswerOptionRecord`.
+UserQuestionRecord = collections.namedtuple(
+    'UserQuestionRecord',
+    ('id', 'text', 'answered', 'answer_id', 'explanation', 'answer_options')
+)
+
+
+#: A compact snapshot of an :class:`~.AnswerOption`, built by
+#: :meth:`~.AnswerOption.to_record`.
+AnswerOptionRecord = collections.namedtuple(
+    'AnswerOptionRecord', ('id', 'text', 'is_users', 'is_match')
+)
+
+
 class BaseQuestion(object):
     """The abstract base class of :class:`~.Question` and
     :class:`~.UserQuestion`. Contains all the shared functionality of the
@@ -16,10 +42,22 @@ class BaseQuestion(object):
     details.
     """
 
+    #: The properties that :meth:`.detach` evaluates before it releases the
+    #: question's element.
+    _detached_properties = ('answered', 'id', 'text')
+    _element_attributes = ('_question_element',)
+
     def __init__(self, question_element):
         self._question_element = question_element
 
-    @property
+    def detach(self):
+        """Evaluate this question's fields and release the element that they
+        were read from, so that the page that it belongs to can be freed.
+        """
+        return util.detach(self, self._detached_properties,
+                           self._element_attributes)
+
+    @util.cached_property
     def answered(self):
         return 'not_answered' not in self._question_element.attrib['class']
 
@@ -62,17 +100,36 @@ class Question(BaseQuestion):
 
     _answers_xpb = xpb.div.with_class('answers').\
                    p.with_class('answer')
+    _answer_text_xpb = _answers_xpb.span.with_class('text')
+    _answer_note_xpb = _answers_xpb.span.with_class('note')
+
+    _detached_properties = BaseQuestion._detached_properties + (
+        'their_answer', 'my_answer', 'their_answer_matches',
+        'my_answer_matches', 'their_note', 'my_note'
+    )
+    _element_attributes = BaseQuestion._element_attributes + (
+        '_their_answer_span', '_my_answer_span', '_their_note_span',
+        '_my_note_span'
+    )
+
+    def to_record(self):
+        """
+        :returns: A :class:`~.QuestionRecord` holding the fields of this
+                  question and no reference to its element.
+        """
+        return QuestionRecord(**{field: getattr(self, field)
+                                 for field in QuestionRecord._fields})
 
     def __init__(self, question_element):
         super(Question, self).__init__(question_element)
         try:
             self._their_answer_span, self._my_answer_span = (
-                self._answers_xpb.span.with_class('text').apply_(
+                self._answer_text_xpb.apply_(
                     self._question_element
                 )
             )
             self._their_note_span, self._my_note_span = (
-                self._answers_xpb.span.with_class('note').apply_(
+                self._answer_note_xpb.apply_(
                     self._question_element
                 )
             )
@@ -145,6 +202,29 @@ class UserQuestion(BaseQuestion):
     _explanation_xpb = xpb.div.with_class('your_explanation').\
                        p.with_class('value')
 
+    _detached_properties = BaseQuestion._detached_properties + (
+        'answer_options', 'explanation', 'answer_id', 'answer',
+        'answer_text_to_option'
+    )
+
+    def detach(self):
+        super(UserQuestion, self).detach()
+        for answer_option in self.__dict__.get('answer_options', ()):
+            answer_option.detach()
+        return self
+
+    def to_record(self):
+        """
+        :returns: A :class:`~.UserQuestionRecord` holding the fields of this
+                  question and no reference to its element.
+        """
+        return UserQuestionRecord(
+            id=self.id, text=self.text, answered=self.answered,
+            answer_id=self.answer_id, explanation=self.explanation,
+            answer_options=tuple(answer_option.to_record()
+                                 for answer_option in self.answer_options)
+        )
+
     def get_answer_id_for_question(self, question):
         """Get the answer_id corresponding to the answer given for question
         by looking at this :class:`~.UserQuestion`'s answer_options.
@@ -209,6 +289,20 @@ class AnswerOption(object):
     def __init__(self, option_element):
         self._element = option_element
 
+    def detach(self):
+        """Evaluate this option's fields and release its element."""
+        return util.detach(self, ('is_users', 'is_match', 'text', 'id'),
+                           ('_element',))
+
+    def to_record(self):
+        """
+        :returns: An :class:`~.AnswerOptionRecord` holding the fields of this
+                  option.
+        """
+        return AnswerOptionRecord(id=self.id, text=self.text,
+                                  is_users=self.is_users,
+                                  is_match=self.is_match)
+
     @util.cached_property
     def is_users(self):
         """
@@ -278,12 +372,26 @@ class Questions(object):
 
     path = 'questions/ask'
 
-    def __init__(self, session, importances=importances, user_id=None):
+    def __init__(self, session, importances=importances, user_id=None,
+                 read_ahead=0, parallel=False):
+        """
+        :param session: A logged in :class:`~okcupyd.session.Session`.
+        :param importances: The importances for which fetchables of answered
+                            questions should be created.
+        :param user_id: The id of the logged in user.
+        :param read_ahead: The number of question pages to request ahead of
+                           the one that is being consumed.
+        :param parallel: Request the question pages of each importance
+                         concurrently once the first one has been read, up
+                         to the ones that hold the questions that were
+                         asked for (all of them when iterating).
+        """
         self.importance_name_to_fetchable = {}
         for importance in importances:
             fetchable = util.Fetchable.fetch_marshall(
                 QuestionHTMLFetcher(session, 'questions', **{importance: 1}),
-                QuestionProcessor(UserQuestion)
+                QuestionProcessor(UserQuestion), read_ahead=read_ahead,
+                pages_remaining=_question_pages_remaining if parallel else None
             )
             self.importance_name_to_fetchable[importance] = fetchable
             setattr(self, importance, fetchable)
@@ -382,12 +490,26 @@ _current_page_xpb = _page_data_xpb.input(id='questions_pages_page').\
                     select_attribute_('value')
 _total_page_xpb = _page_data_xpb.input(id='questions_pages_total').\
                   select_attribute_('value')
-_question_xpb = xpb.div.with_class('question')
+
+
+def _pages_after(tree):
+    return int(_total_page_xpb.one_(tree)) - int(_current_page_xpb.one_(tree))
+
+
+def _question_pages_left(tree):
+    return _pages_after(tree) > 0
+
+
+def _question_pages_remaining(tree):
+    try:
+        return _pages_after(tree)
+    except IndexError:
+        return 0
 
 
 def QuestionProcessor(question_class):
-    return util.PaginationProcessor(question_class, _question_xpb,
-                                    _current_page_xpb, _total_page_xpb)
+    return util.StreamingProcessor(question_class, 'div', ('question',),
+                                   pages_left=_question_pages_left)
 
 
 class QuestionHTMLFetcher(object):
@@ -413,10 +535,18 @@ class QuestionHTMLFetcher(object):
 
 
 def QuestionFetcher(session, username, question_class=Question,
-                    is_user=False, **kwargs):
+                    is_user=False, read_ahead=0, parallel=False, **kwargs):
+    """
+    :param parallel: Read the number of question pages from the first page
+                     and request the ones after it concurrently, up to the
+                     ones that hold the number of questions passed to
+                     :meth:`~okcupyd.util.fetchable.FetchMarshall.expect`
+                     (all of them if none was).
+    """
     if is_user:
         question_class = UserQuestion
     return util.FetchMarshall(
         QuestionHTMLFetcher.from_username(session, username, **kwargs),
-        QuestionProcessor(question_class)
+        QuestionProcessor(question_class), read_ahead=read_ahead,
+        pages_remaining=_question_pages_remaining if parallel else None
     )
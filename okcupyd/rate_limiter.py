@@ -0,0 +1,214 @@
+"""Token bucket rate limiters that can be passed as the `rate_limit` argument
+of :class:`~okcupyd.session.Session`.
+
+:class:`~.TokenBucketRateLimiter` keeps its state in memory and can be shared
+by every thread (and every :class:`~okcupyd.session.Session`) in a process.
+:class:`~.SQLiteRateLimiter` keeps its state in an SQLite database file, so
+that several worker processes logged in to the same account can share a
+single request budget:
+
+.. code:: python
+
+    rate_limiter = SQLiteRateLimiter('/tmp/okc_rate_limit.db', rate=.5,
+                                     burst=3,
+                                     endpoint_limits={'profile': (.2, 1)})
+    session = Session.login(rate_limit=rate_limiter)
+"""
+import contextlib
+import sqlite3
+import threading
+import time
+
+from . import util
+
+
+#: The key of the bucket that every request draws from.
+GLOBAL_KEY = '*'
+
+
+class TokenBucket(object):
+    """A lock protected token bucket.
+
+    Tokens are added at `rate` tokens per second up to a maximum of `burst`.
+    """
+
+    def __init__(self, rate, burst=1, clock=time.time, sleep=time.sleep):
+        """
+        :param rate: The number of tokens that are added every second.
+        :param burst: The maximum number of tokens that the bucket can hold.
+        """
+        self.rate = float(rate)
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated_at = clock()
+
+    def _check_tokens(self, tokens):
+        if tokens > self.burst:
+            raise ValueError(
+                "Cannot take {0} tokens from a bucket that holds at most "
+                "{1}.".format(tokens, self.burst)
+            )
+
+    def _take(self, available, updated_at, now, tokens):
+        available = min(self.burst,
+                        available + (now - updated_at) * self.rate)
+        if available >= tokens:
+            return available - tokens, 0
+        return available, (tokens - available) / self.rate
+
+    def try_acquire(self, tokens=1):
+        """Take `tokens` tokens from the bucket if they are available.
+
+        :returns: 0 if the tokens were taken, otherwise the number of seconds
+                  to wait before trying again.
+        :raises: ValueError if `tokens` is more than the bucket can hold.
+        """
+        self._check_tokens(tokens)
+        with self._lock:
+            now = self._clock()
+            self._tokens, delay = self._take(self._tokens, self._updated_at,
+                                             now, tokens)
+            self._updated_at = now
+            return delay
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` tokens have been taken from the bucket.
+
+        :raises: ValueError if `tokens` is more than the bucket can hold.
+        """
+        while True:
+            delay = self.try_acquire(tokens)
+            if not delay:
+                return
+            self._sleep(delay)
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """A :class:`~.TokenBucket` whose state is stored in an SQLite database so
+    that it can be shared across processes.
+    """
+
+    def __init__(self, filename, key, rate, burst=1, timeout=30.0, **kwargs):
+        """
+        :param filename: The path of the SQLite database file.
+        :param key: The name under which the bucket's state is stored.
+        :param timeout: Seconds to wait for another process to release its
+                        lock on the database.
+        """
+        super(SQLiteTokenBucket, self).__init__(rate, burst, **kwargs)
+        self._filename = filename
+        self._key = key
+        self._timeout = timeout
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS token_bucket ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+                'updated_at REAL NOT NULL)'
+            )
+
+    def _connect(self):
+        return contextlib.closing(sqlite3.connect(
+            self._filename, timeout=self._timeout, isolation_level=None
+        ))
+
+    def try_acquire(self, tokens=1):
+        self._check_tokens(tokens)
+        with self._connect() as connection:
+            # BEGIN IMMEDIATE takes the database write lock up front so that
+            # no other process can read the bucket until we have updated it.
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                now = self._clock()
+                row = connection.execute(
+                    'SELECT tokens, updated_at FROM token_bucket '
+                    'WHERE key = ?', (self._key,)
+                ).fetchone()
+                available, updated_at = row or (float(self.burst), now)
+                available, delay = self._take(available, updated_at,
+                                              now, tokens)
+                connection.execute(
+                    'INSERT OR REPLACE INTO token_bucket '
+                    '(key, tokens, updated_at) VALUES (?, ?, ?)',
+                    (self._key, available, now)
+                )
+            except:
+                connection.execute('ROLLBACK')
+                raise
+            else:
+                connection.execute('COMMIT')
+        return delay
+
+
+class TokenBucketRateLimiter(object):
+    """Rate limit requests with a global token bucket and optional per
+    endpoint buckets.
+    """
+
+    def __init__(self, rate, burst=1, endpoint_limits=None, **bucket_kwargs):
+        """
+        :param rate: The sustained number of requests per second that may be
+                     made across all endpoints.
+        :param burst: The number of requests that may be made back to back
+                      after a period of inactivity.
+        :param endpoint_limits: A dictionary mapping path prefixes (the path
+                                that is passed to `okc_get` and friends,
+                                e.g. `'profile'` or `'1/apitun/match/search'`)
+                                to `(rate, burst)` tuples. Requests to paths
+                                that match one of these prefixes must obtain a
+                                token from the bucket of the longest matching
+                                prefix in addition to the global bucket.
+        :param bucket_kwargs: Additional keyword arguments that are passed to
+                              every bucket.
+        """
+        self._bucket_kwargs = bucket_kwargs
+        self._bucket = self.build_bucket(GLOBAL_KEY, rate, burst)
+        self._endpoint_buckets = {
+            prefix: self.build_bucket(prefix, endpoint_rate, endpoint_burst)
+            for prefix, (endpoint_rate, endpoint_burst)
+            in (endpoint_limits or {}).items()
+        }
+
+    def build_bucket(self, key, rate, burst):
+        return TokenBucket(rate, burst, **self._bucket_kwargs)
+
+    def buckets_for(self, path=None):
+        """
+        :returns: The buckets from which a request to `path` must take a
+                  token, in the order in which they should be acquired.
+        """
+        buckets = [self._bucket]
+        if path is not None:
+            prefix = util.match_path_prefix(path, self._endpoint_buckets)
+            if prefix is not None:
+                # The endpoint bucket is acquired first so that we don't hold
+                # on to a global token while waiting on a slow endpoint.
+                buckets.insert(0, self._endpoint_buckets[prefix])
+        return buckets
+
+    def wait(self, path=None):
+        for bucket in self.buckets_for(path):
+            bucket.acquire()
+
+
+class SQLiteRateLimiter(TokenBucketRateLimiter):
+    """A :class:`~.TokenBucketRateLimiter` that stores the state of its
+    buckets in an SQLite database file, so that it is shared by every process
+    that uses the same file.
+    """
+
+    def __init__(self, filename, rate, burst=1, endpoint_limits=None,
+                 **bucket_kwargs):
+        """
+        :param filename: The path of the SQLite database file.
+        """
+        self._filename = filename
+        super(SQLiteRateLimiter, self).__init__(
+            rate, burst, endpoint_limits, **bucket_kwargs
+        )
+
+    def build_bucket(self, key, rate, burst):
+        return SQLiteTokenBucket(self._filename, key, rate, burst,
+                                 **self._bucket_kwargs)
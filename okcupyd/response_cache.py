@@ -0,0 +1,236 @@
+"""A persistent cache for the responses to the GET requests made by
+:class:`~okcupyd.session.Session`.
+
+The cache is opt in. It is enabled by passing a cache as the `response_cache`
+argument of :class:`~okcupyd.session.Session`:
+
+.. code:: python
+
+    response_cache = SQLiteResponseCache('/tmp/okc_responses.db',
+                                         ttl=60 * 60,
+                                         endpoint_ttls={'messages': 60},
+                                         max_size=256 * 1024 * 1024)
+    session = Session.login(response_cache=response_cache)
+
+Fresh entries are served without making a request at all. Once an entry is
+older than the time to live of its endpoint, it is revalidated with the
+`ETag` and `Last-Modified` headers that okcupid.com sent with it, so that
+unchanged pages are not downloaded again.
+"""
+import contextlib
+import hashlib
+import sqlite3
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+import simplejson
+
+from . import util
+
+
+class CachedResponse(object):
+    """A response that was read from a :class:`~.SQLiteResponseCache`."""
+
+    def __init__(self, key, url, status_code, headers, content, stored_at,
+                 ttl):
+        self.key = key
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.stored_at = stored_at
+        self.ttl = ttl
+
+    def is_fresh(self, now):
+        return now - self.stored_at < self.ttl
+
+    @property
+    def validators(self):
+        """The conditional request headers with which this response can be
+        revalidated.
+        """
+        validators = {}
+        if 'ETag' in self.headers:
+            validators['If-None-Match'] = self.headers['ETag']
+        if 'Last-Modified' in self.headers:
+            validators['If-Modified-Since'] = self.headers['Last-Modified']
+        return validators
+
+    def to_response(self):
+        """
+        :returns: A `requests.Response` with the cached status, headers and
+                  content.
+        """
+        response = requests.Response()
+        response.url = self.url
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = requests.utils.get_encoding_from_headers(
+            response.headers
+        )
+        response._content = self.content
+        return response
+
+
+class SQLiteResponseCache(object):
+    """A size bounded, least recently used response cache that is stored in an
+    SQLite database file, so that it survives restarts and can be shared by
+    several processes.
+    """
+
+    def __init__(self, filename, ttl=3600, endpoint_ttls=None, max_size=None,
+                 timeout=30.0, clock=time.time):
+        """
+        :param filename: The path of the SQLite database file.
+        :param ttl: The number of seconds for which a response is served
+                    without being revalidated.
+        :param endpoint_ttls: A dictionary mapping path prefixes (e.g.
+                              `'profile'` or `'messages'`) to the time to
+                              live of responses from the endpoints that match
+                              them. The longest matching prefix is used.
+        :param max_size: The maximum total size in bytes of the cached
+                         content. The least recently used responses are
+                         evicted when it is exceeded.
+        :param timeout: Seconds to wait for another process to release its
+                        lock on the database.
+        """
+        self._filename = filename
+        self.ttl = ttl
+        self.endpoint_ttls = endpoint_ttls or {}
+        self.max_size = max_size
+        self._timeout = timeout
+        self._clock = clock
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS response ('
+                'key TEXT PRIMARY KEY, url TEXT NOT NULL, '
+                'status_code INTEGER NOT NULL, headers TEXT NOT NULL, '
+                'content BLOB NOT NULL, size INTEGER NOT NULL, '
+                'ttl REAL NOT NULL, stored_at REAL NOT NULL, '
+                'accessed_at REAL NOT NULL)'
+            )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS response_accessed_at '
+                'ON response (accessed_at)'
+            )
+
+    def _connect(self):
+        return contextlib.closing(sqlite3.connect(
+            self._filename, timeout=self._timeout, isolation_level=None
+        ))
+
+    @staticmethod
+    def key(method, path, params=None, namespace=None):
+        """Build the key under which the response to a request is stored.
+
+        :param method: The http method of the request.
+        :param path: The okcupid.com path that was requested.
+        :param params: The query parameters of the request.
+        :param namespace: Distinguishes responses that depend on who is
+                          logged in, typically the username of the session.
+        """
+        if isinstance(params, dict):
+            params = sorted(params.items())
+        serialized = simplejson.dumps(
+            [namespace, method.upper(), path.lstrip('/'), params]
+        )
+        return hashlib.sha1(serialized.encode('utf-8')).hexdigest()
+
+    def ttl_for(self, path):
+        prefix = util.match_path_prefix(path, self.endpoint_ttls)
+        if prefix is None:
+            return self.ttl
+        return self.endpoint_ttls[prefix]
+
+    def is_fresh(self, cached):
+        """
+        :returns: Whether `cached` can be served without being revalidated.
+        """
+        return cached.is_fresh(self._clock())
+
+    def get(self, key):
+        """
+        :returns: The :class:`~.CachedResponse` stored under `key` or `None`.
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                'SELECT url, status_code, headers, content, stored_at, ttl '
+                'FROM response WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                'UPDATE response SET accessed_at = ? WHERE key = ?',
+                (self._clock(), key)
+            )
+        url, status_code, headers, content, stored_at, ttl = row
+        return CachedResponse(key, url, status_code, simplejson.loads(headers),
+                              bytes(content), stored_at, ttl)
+
+    def set(self, key, path, response):
+        """Store `response` under `key`."""
+        now = self._clock()
+        content = response.content
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO response (key, url, status_code, '
+                'headers, content, size, ttl, stored_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, response.url, response.status_code,
+                 simplejson.dumps(dict(response.headers)),
+                 sqlite3.Binary(content), len(content), self.ttl_for(path),
+                 now, now)
+            )
+            if self.max_size is not None:
+                self._evict(connection)
+
+    def refresh(self, key):
+        """Mark the response stored under `key` as fresh, e.g. after it was
+        revalidated.
+        """
+        now = self._clock()
+        with self._connect() as connection:
+            connection.execute(
+                'UPDATE response SET stored_at = ?, accessed_at = ? '
+                'WHERE key = ?', (now, now, key)
+            )
+
+    def delete(self, key):
+        with self._connect() as connection:
+            connection.execute('DELETE FROM response WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._connect() as connection:
+            connection.execute('DELETE FROM response')
+
+    @property
+    def size(self):
+        """The total size in bytes of the cached content."""
+        with self._connect() as connection:
+            return connection.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM response'
+            ).fetchone()[0]
+
+    def _evict(self, connection):
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            total, = connection.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM response'
+            ).fetchone()
+            evicted = []
+            if total > self.max_size:
+                for key, size in connection.execute(
+                    'SELECT key, size FROM response ORDER BY accessed_at'
+                ):
+                    evicted.append((key,))
+                    total -= size
+                    if total <= self.max_size:
+                        break
+            connection.executemany('DELETE FROM response WHERE key = ?',
+                                   evicted)
+        except:
+            connection.execute('ROLLBACK')
+            raise
+        else:
+            connection.execute('COMMIT')
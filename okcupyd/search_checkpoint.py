@@ -0,0 +1,137 @@
+"""Checkpoints that allow long :func:`~okcupyd.json_search.SearchFetchable`
+crawls to be resumed after the process that was running them stops.
+
+Checkpointing is opt in. It is enabled by passing a store as the
+`checkpoint_store` argument of :func:`~okcupyd.json_search.SearchFetchable`.
+A checkpoint is saved every time all the profiles of a page of results have
+been consumed. Passing `resume_from=True` continues from the checkpoint that
+was saved for the same search parameters, if there is one:
+
+.. code:: python
+
+    store = SQLiteCheckpointStore('/tmp/okc_search_checkpoints.db')
+    for profile in SearchFetchable(session, checkpoint_store=store,
+                                   resume_from=True, age_min=25):
+        crawl(profile)
+
+The profiles of a page that was only partly consumed when the crawl stopped
+are delivered again when it is resumed.
+"""
+import collections
+import contextlib
+import os
+import sqlite3
+import time
+
+import simplejson
+
+
+#: The position of a search: the hash of the search's parameters, the cursor
+#: of the next page of results and the number of profiles that have been
+#: delivered before it.
+SearchCheckpoint = collections.namedtuple(
+    'SearchCheckpoint', ('parameters_hash', 'after', 'delivered')
+)
+
+
+class FileCheckpointStore(object):
+    """Store checkpoints in a json file, keyed by the hash of their search
+    parameters.
+    """
+
+    def __init__(self, filename):
+        self._filename = filename
+
+    def _read(self):
+        try:
+            with open(self._filename) as checkpoint_file:
+                return simplejson.load(checkpoint_file)
+        except IOError:
+            return {}
+
+    def _write(self, checkpoints):
+        # Write to a temporary file first so that a crash while writing does
+        # not destroy the checkpoints that were already saved.
+        temporary_filename = '{0}.tmp'.format(self._filename)
+        with open(temporary_filename, 'w') as checkpoint_file:
+            simplejson.dump(checkpoints, checkpoint_file)
+        getattr(os, 'replace', os.rename)(temporary_filename, self._filename)
+
+    def load(self, parameters_hash):
+        """
+        :returns: The :class:`~.SearchCheckpoint` saved for `parameters_hash`
+                  or `None`.
+        """
+        try:
+            after, delivered = self._read()[parameters_hash]
+        except KeyError:
+            return None
+        return SearchCheckpoint(parameters_hash, after, delivered)
+
+    def save(self, checkpoint):
+        checkpoints = self._read()
+        checkpoints[checkpoint.parameters_hash] = [checkpoint.after,
+                                                   checkpoint.delivered]
+        self._write(checkpoints)
+
+    def delete(self, parameters_hash):
+        checkpoints = self._read()
+        if checkpoints.pop(parameters_hash, None) is not None:
+            self._write(checkpoints)
+
+
+class SQLiteCheckpointStore(object):
+    """Store checkpoints in an SQLite database file, so that several crawls
+    (possibly running in different processes) can share a store.
+    """
+
+    def __init__(self, filename, timeout=30.0, clock=time.time):
+        """
+        :param filename: The path of the SQLite database file.
+        :param timeout: Seconds to wait for another process to release its
+                        lock on the database.
+        """
+        self._filename = filename
+        self._timeout = timeout
+        self._clock = clock
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS search_checkpoint ('
+                'parameters_hash TEXT PRIMARY KEY, after TEXT, '
+                'delivered INTEGER NOT NULL, saved_at REAL NOT NULL)'
+            )
+
+    def _connect(self):
+        return contextlib.closing(sqlite3.connect(
+            self._filename, timeout=self._timeout, isolation_level=None
+        ))
+
+    def load(self, parameters_hash):
+        """
+        :returns: The :class:`~.SearchCheckpoint` saved for `parameters_hash`
+                  or `None`.
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                'SELECT after, delivered FROM search_checkpoint '
+                'WHERE parameters_hash = ?', (parameters_hash,)
+            ).fetchone()
+        if row is None:
+            return None
+        return SearchCheckpoint(parameters_hash, *row)
+
+    def save(self, checkpoint):
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO search_checkpoint (parameters_hash, '
+                'after, delivered, saved_at) VALUES (?, ?, ?, ?)',
+                (checkpoint.parameters_hash, checkpoint.after,
+                 checkpoint.delivered, self._clock())
+            )
+
+    def delete(self, parameters_hash):
+        with self._connect() as connection:
+            connection.execute(
+                'DELETE FROM search_checkpoint WHERE parameters_hash = ?',
+                (parameters_hash,)
+            )
@@ -0,0 +1,220 @@
+"""Crawl a json search concurrently by splitting it into disjoint partitions.
+
+The json search is a single chain of cursors, so the pages of one search can
+only be requested one after the other. :class:`~.SearchCrawler` runs a
+separate search for each partition of the search parameters (e.g. an age
+band) on its own worker and merges their results as they arrive:
+
+.. code:: python
+
+    crawler = SearchCrawler(session, age_bands(18, 60, 6),
+                            gentation='everybody', radius=25)
+    for profile in crawler:
+        store(profile)
+
+All the searches share the session and therefore its rate limiter, so the
+number of workers only helps up to the request rate the session allows.
+Workers stop searching while `max_buffered` profiles are waiting for the
+consumer, and the checkpoint of a page of results is only saved once the
+consumer has received all of its profiles.
+"""
+import itertools
+import logging
+import threading
+
+from concurrent import futures
+from six.moves import queue
+
+from . import util
+from .json_search import ProfileBuilder, SearchJSONFetcher, SearchManager
+from .search_checkpoint import SearchCheckpoint
+
+
+log = logging.getLogger(__name__)
+
+
+def age_bands(minimum_age=18, maximum_age=99, width=5):
+    """
+    :returns: A list of partitions that split the ages from `minimum_age` to
+              `maximum_age` (inclusive) into bands of `width` years.
+    """
+    return [{'minimum_age': band_start,
+             'maximum_age': min(band_start + width - 1, maximum_age)}
+            for band_start in range(minimum_age, maximum_age + 1, width)]
+
+
+def gentation_partitions(gentations):
+    """
+    :returns: A list of partitions with one of `gentations` each.
+    """
+    return [{'gentation': gentation} for gentation in gentations]
+
+
+def combine_partitions(*partition_lists):
+    """
+    :returns: A list of partitions with one partition from each of
+              `partition_lists`, for every combination of them.
+    """
+    return [dict(itertools.chain.from_iterable(
+                partition.items() for partition in partitions
+            ))
+            for partitions in itertools.product(*partition_lists)]
+
+
+class _ConsumedCheckpointStore(object):
+    """Send the checkpoints of a partition's search to the consumer along
+    with its profiles, so that each checkpoint is only saved once every
+    profile before it has been received.
+    """
+
+    def __init__(self, store, put):
+        self._store = store
+        self._put = put
+
+    def load(self, parameters_hash):
+        return self._store.load(parameters_hash)
+
+    def save(self, checkpoint):
+        self._put(checkpoint)
+
+    def delete(self, parameters_hash):
+        self._store.delete(parameters_hash)
+
+
+class SearchCrawler(object):
+    """Run a search for each of `partitions` concurrently and yield the
+    profiles that they find, each username only once.
+    """
+
+    _done = object()
+
+    #: The number of seconds a worker waits for room in the queue of profiles
+    #: before checking whether the crawl has stopped.
+    put_timeout = .5
+
+    def __init__(self, session, partitions, max_workers=None, count=None,
+                 checkpoint_store=None, resume=False,
+                 deduplication_size=None, max_buffered=100, **kwargs):
+        """
+        :param session: A logged in :class:`~okcupyd.session.Session`.
+        :param partitions: A list of dictionaries of search parameters, which
+                           should select disjoint sets of profiles, e.g. the
+                           result of :func:`~.age_bands`. Each one is combined
+                           with `kwargs` to build the search of a partition.
+        :param max_workers: The number of partitions that are searched at
+                            the same time. Defaults to the number of
+                            workers of the session.
+        :param count: The number of profiles requested per page. By default
+                      each partition adapts it (see
+                      :class:`~okcupyd.json_search.AdaptivePageSize`).
+        :param checkpoint_store: The store in which the checkpoint of each
+                                 partition's search is saved. See
+                                 :mod:`okcupyd.search_checkpoint`.
+        :param resume: Resume the search of each partition from its
+                       checkpoint in `checkpoint_store`.
+        :param deduplication_size: The number of usernames remembered to
+                                   drop profiles that were already yielded.
+                                   Defaults to
+                                   :attr:`SearchManager.deduplication_size`.
+        :param max_buffered: The number of profiles that the workers may
+                             find ahead of the consumer.
+        :param kwargs: The search parameters that all partitions share.
+        """
+        self._session = session
+        self._partitions = partitions
+        self._max_workers = max_workers or session.max_workers
+        self._count = count
+        self._checkpoint_store = checkpoint_store
+        self._resume = resume
+        self._max_buffered = max_buffered
+        self._kwargs = kwargs
+        #: A dictionary mapping the index of each partition whose search
+        #: failed to the exception it raised.
+        self.errors = {}
+        self._deduplication_size = (deduplication_size or
+                                    SearchManager.deduplication_size)
+        #: The :class:`~okcupyd.util.Deduplicator` of the current crawl,
+        #: whose `dropped` counter records the number of profiles that were
+        #: dropped because another partition had already found them.
+        self.deduplicator = None
+
+    @property
+    def duplicates(self):
+        return self.deduplicator.dropped if self.deduplicator else 0
+
+    def _search_manager(self, partition, put):
+        parameters = dict(self._kwargs)
+        parameters.update(partition)
+        checkpoint_store = None
+        if self._checkpoint_store is not None:
+            checkpoint_store = _ConsumedCheckpointStore(self._checkpoint_store,
+                                                        put)
+        return SearchManager(
+            SearchJSONFetcher(self._session, **parameters),
+            ProfileBuilder(self._session),
+            checkpoint_store=checkpoint_store,
+            resume_from=True if self._resume else None
+        )
+
+    def _put(self, results, stop, item):
+        """Put `item` in `results`, waiting for room in it unless the crawl
+        stops.
+
+        :returns: Whether or not the item was put.
+        """
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=self.put_timeout)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def _search_partition(self, index, partition, results, stop):
+        put = lambda item: self._put(results, stop, (index, item))
+        try:
+            if stop.is_set():
+                return
+            search_manager = self._search_manager(partition, put)
+            # A crawl wants every profile, so pages can be as large as the
+            # search allows.
+            search_manager.expect(None)
+            for profile in search_manager.fetch(count=self._count):
+                if not put(profile):
+                    return
+        except Exception as exc:
+            log.warning(u'The search of partition {0} ({1}) failed: '
+                        u'{2}'.format(index, partition, repr(exc)))
+            self.errors[index] = exc
+        finally:
+            put(self._done)
+
+    def crawl(self):
+        results = queue.Queue(self._max_buffered or 0)
+        stop = threading.Event()
+        self.deduplicator = util.Deduplicator(
+            max_size=self._deduplication_size,
+            key=lambda profile: profile.username.lower()
+        )
+        executor = futures.ThreadPoolExecutor(self._max_workers)
+        try:
+            for index, partition in enumerate(self._partitions):
+                executor.submit(self._search_partition, index, partition,
+                                results, stop)
+            remaining = len(self._partitions)
+            while remaining:
+                index, profile = results.get()
+                if profile is self._done:
+                    remaining -= 1
+                    continue
+                if isinstance(profile, SearchCheckpoint):
+                    # Every profile before the checkpoint has been received.
+                    self._checkpoint_store.save(profile)
+                    continue
+                if not self.deduplicator.is_duplicate(profile):
+                    yield profile
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
+
+    __iter__ = crawl
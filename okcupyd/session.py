@@ -1,8 +1,13 @@
+import collections
+from concurrent import futures
+import functools
 import logging
 import random
+import threading
 import time
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from . import profile
 from . import settings
@@ -13,6 +18,17 @@ from .errors import AuthenticationError
 log = logging.getLogger(__name__)
 
 
+#: The result of :meth:`.Session.get_profiles`. `profiles` is a list of the
+#: profiles that were loaded successfully, in the order in which their
+#: usernames were provided, and `errors` maps the username of every profile
+#: that could not be loaded to the exception that was raised. Profiles whose
+#: page was loaded are kept even if some of their fields could not be
+#: evaluated; `field_errors` maps their usernames to dictionaries mapping
+#: each of those fields to the exception that was raised.
+ProfileBatch = collections.namedtuple('ProfileBatch',
+                                      ('profiles', 'errors', 'field_errors'))
+
+
 class Session(object):
     """A `requests.Session` with convenience methods for interacting with
     okcupid.com
@@ -25,10 +41,20 @@ class Session(object):
                        'Safari/537.36')
     }
 
+    #: The number of worker threads used for concurrent requests when no
+    #: explicit `max_workers` is provided.
+    default_max_workers = 4
+
+    #: The :class:`~okcupyd.profile.Profile` attributes that
+    #: :meth:`.get_profiles` loads by default.
+    default_profile_fields = ('id', 'age', 'location', 'match_percentage',
+                              'enemy_percentage')
+
     @classmethod
     def login(
             cls, username=None, password=None, requests_session=None,
-            rate_limit=None
+            rate_limit=None, pool_size=None, max_workers=None,
+            response_cache=None, profile_cache=None
     ):
         """Get a session that has authenticated with okcupid.com.
         If no username and password is supplied, the ones stored in
@@ -40,9 +66,23 @@ class Session(object):
         :type password: str
         :param rate_limit: Average time in seconds to wait between requests to OKC.
         :type rate_limit: float
+        :param pool_size: The number of connections to keep alive per host.
+        :type pool_size: int
+        :param max_workers: The number of threads used to make concurrent
+                            requests.
+        :type max_workers: int
+        :param response_cache: A cache in which the responses to GET requests
+                               are stored, such as
+                               :class:`~okcupyd.response_cache.SQLiteResponseCache`.
+        :param profile_cache: A :class:`~okcupyd.util.LRUCache` that
+                              :meth:`.get_profile` uses to return the same
+                              :class:`~okcupyd.profile.Profile` for every
+                              request for a given username.
         """
         requests_session = requests_session or requests.Session()
-        session = cls(requests_session, rate_limit)
+        session = cls(requests_session, rate_limit, pool_size=pool_size,
+                      max_workers=max_workers, response_cache=response_cache,
+                      profile_cache=profile_cache)
         # settings.USERNAME and settings.PASSWORD should not be made
         # the defaults to their respective arguments because doing so
         # would prevent this function from picking up any changes made
@@ -52,17 +92,93 @@ class Session(object):
         session.do_login(username, password)
         return session
 
-    def __init__(self, requests_session, rate_limit=None):
+    def __init__(self, requests_session, rate_limit=None, pool_size=None,
+                 max_workers=None, response_cache=None, profile_cache=None):
+        """
+        :param requests_session: The `requests.Session` to wrap.
+        :param rate_limit: Average time in seconds to wait between requests to
+                           OKC or a rate limiter such as :class:`.RateLimiter`
+                           or
+                           :class:`~okcupyd.rate_limiter.TokenBucketRateLimiter`.
+                           The rate limiter is shared by every thread that
+                           makes requests with this session.
+        :param pool_size: The number of connections to keep alive per host.
+                          Defaults to `max_workers` when that is provided.
+        :param max_workers: The number of threads in the pool used by
+                            :meth:`.submit` and :meth:`.map_get`.
+        :param response_cache: A cache such as
+                               :class:`~okcupyd.response_cache.SQLiteResponseCache`
+                               in which the responses to :meth:`.okc_get`
+                               are stored. Responses are not cached by
+                               default.
+        :param profile_cache: A :class:`~okcupyd.util.LRUCache` in which
+                              :meth:`.get_profile` keeps the profiles it
+                              creates, so that every part of the library that
+                              asks for a username gets the same
+                              :class:`~okcupyd.profile.Profile` and its page
+                              is downloaded and parsed at most once per ttl.
+                              A single cache can be shared by several
+                              sessions.
+        """
         self._requests_session = requests_session
+        self.response_cache = response_cache
+        self.profile_cache = profile_cache
         self.log_in_name = None
-        if isinstance(rate_limit, RateLimiter):
+        if hasattr(rate_limit, 'wait'):
             self.rate_limiter = rate_limit
         else:
             self.rate_limiter = RateLimiter(rate_limit)
+        self.max_workers = max_workers or pool_size or self.default_max_workers
+        pool_size = pool_size or max_workers
+        if pool_size:
+            self.mount_connection_pool(pool_size)
 
     def __getattr__(self, name):
         return getattr(self._requests_session, name)
 
+    def mount_connection_pool(self, pool_size):
+        """Mount an `HTTPAdapter` that keeps up to `pool_size` connections
+        alive so that concurrent requests do not have to open new ones.
+        """
+        adapter = HTTPAdapter(pool_connections=pool_size,
+                              pool_maxsize=pool_size)
+        for prefix in ('http://', 'https://'):
+            self._requests_session.mount(prefix, adapter)
+        return adapter
+
+    @util.cached_property
+    def executor(self):
+        """The `ThreadPoolExecutor` used to make concurrent requests."""
+        return futures.ThreadPoolExecutor(self.max_workers)
+
+    def submit(self, function, *args, **kwargs):
+        """Run `function` on this session's worker pool.
+
+        :returns: A `concurrent.futures.Future`.
+        """
+        return self.executor.submit(function, *args, **kwargs)
+
+    def map_get(self, paths, **kwargs):
+        """Call :meth:`.okc_get` for every path in `paths` concurrently.
+        Every request still waits on this session's rate limiter.
+
+        :param paths: The paths to retrieve.
+        :param kwargs: Keyword arguments that are passed to every call to
+                       :meth:`.okc_get`.
+        :returns: An iterator of responses in the same order as `paths`.
+        """
+        return self.executor.map(functools.partial(self.okc_get, **kwargs),
+                                 paths)
+
+    def close(self):
+        """Shut down the worker pool and close the underlying
+        `requests.Session`.
+        """
+        if 'executor' in self.__dict__:
+            self.executor.shutdown(wait=True)
+            util.cached_property.bust_self(type(self).executor, self)
+        self._requests_session.close()
+
     def do_login(self, username, password):
         credentials = {
             'username': username,
@@ -94,10 +210,110 @@ class Session(object):
         return u'{0}://{1}/{2}'.format('https' if secure else 'http',
                                        util.DOMAIN, path)
 
-    def get_profile(self, username):
+    def _cached_okc_get(self, path, secure=None, headers=None, **kwargs):
+        cache = self.response_cache
+        key = cache.key('get', path, kwargs.get('params'),
+                        namespace=self.log_in_name)
+        cached = cache.get(key)
+        if cached is not None:
+            if cache.is_fresh(cached):
+                return cached.to_response()
+            headers = dict(headers or {}, **cached.validators)
+        if headers:
+            kwargs['headers'] = headers
+        self.rate_limiter.wait(path)
+        response = self.get(self.build_path(path, secure), **kwargs)
+        if cached is not None and response.status_code == 304:
+            cache.refresh(key)
+            return cached.to_response()
+        response.raise_for_status()
+        if response.status_code == 200:
+            cache.set(key, path, response)
+        return response
+
+    def get_profile(self, username, **properties):
         """Get the profile associated with the supplied username
-        :param username: The username of the profile to retrieve."""
-        return profile.Profile(self, username)
+
+        When this session has a `profile_cache`, the cached profile is returned
+        if there is one. Expired profiles are refreshed in place rather than
+        replaced.
+
+        :param username: The username of the profile to retrieve.
+        :param properties: Values for the cached properties of the profile,
+                           e.g. those obtained from a search result.
+        """
+        if self.profile_cache is None:
+            return profile.Profile(self, username, **properties)
+        key = self.profile_cache_key(username)
+        with self.profile_cache.lock:
+            try:
+                cached_profile, expired = self.profile_cache.lookup(key)
+            except KeyError:
+                cached_profile = profile.Profile(self, username, **properties)
+                self.profile_cache.set(key, cached_profile)
+                return cached_profile
+        if expired:
+            cached_profile.refresh()
+        if properties:
+            cached_profile._set_cached_properties(properties)
+        return cached_profile
+
+    def profile_cache_key(self, username):
+        """
+        :returns: The key under which the profile of `username` is stored in
+                  `profile_cache`. Profiles are specific to the logged in
+                  user, because they contain e.g. match percentages.
+        """
+        return (self.log_in_name and self.log_in_name.lower(),
+                username.lower())
+
+    def get_profiles(self, usernames, fields=default_profile_fields):
+        """Load the profiles associated with the supplied usernames
+        concurrently.
+
+        Each profile page is downloaded and parsed once on this session's
+        worker pool, and the attributes named in `fields` are evaluated
+        eagerly so that reading them later does not make any requests.
+
+        :param usernames: The usernames of the profiles to retrieve.
+        :param fields: The names of the :class:`~okcupyd.profile.Profile`
+                       attributes to load.
+        :returns: A :data:`.ProfileBatch`.
+        """
+        username_futures = [
+            (username, self.submit(self._load_profile, username, fields))
+            for username in usernames
+        ]
+        profiles = []
+        errors = {}
+        field_errors = {}
+        for username, future in username_futures:
+            try:
+                profile, profile_field_errors = future.result()
+            except Exception as exc:
+                log.warning(u'Could not load profile of {0}: {1}'.format(
+                    username, repr(exc)
+                ))
+                errors[username] = exc
+                continue
+            profiles.append(profile)
+            if profile_field_errors:
+                field_errors[username] = profile_field_errors
+        return ProfileBatch(profiles, errors, field_errors)
+
+    def _load_profile(self, username, fields):
+        profile = self.get_profile(username)
+        profile.profile_tree
+        field_errors = {}
+        for field in fields:
+            try:
+                getattr(profile, field)
+            except Exception as exc:
+                log.warning(u'Could not load {0} of {1}: {2}'.format(
+                    field, username, repr(exc)
+                ))
+                field_errors[field] = exc
+        return profile, field_errors
 
     def get_current_user_profile(self):
         """Get the `okcupyd.profile.Profile` associated with the supplied
@@ -115,26 +331,42 @@ class RateLimiter(object):
             wait_std_dev = float(rate_limit) / 5
         self.wait_std_dev = wait_std_dev
         self.last_request = None
+        self._lock = threading.Lock()
 
-    def wait(self):
+    def wait(self, path=None):
         if self.rate_limit is None: return
-        if self.last_request is not None:
-            wait_time = random.gauss(self.rate_limit, self.wait_std_dev)
-            elapsed = time.time() - self.last_request
-            if elapsed < wait_time:
-                time.sleep(wait_time - elapsed)
-        self.last_request = time.time()
+        # The lock is held while sleeping so that requests made from
+        # several threads are spaced out as if they were made serially.
+        with self._lock:
+            if self.last_request is not None:
+                wait_time = random.gauss(self.rate_limit, self.wait_std_dev)
+                elapsed = time.time() - self.last_request
+                if elapsed < wait_time:
+                    time.sleep(wait_time - elapsed)
+            self.last_request = time.time()
 
 
 def build_okc_method(method_name):
     def okc_method(self, path, secure=None, **kwargs):
+        if (method_name == 'get' and self.response_cache is not None and
+            not kwargs.get('stream')):
+            return self._cached_okc_get(path, secure, **kwargs)
         base_method = getattr(self, method_name)
-        self.rate_limiter.wait()
+        self.rate_limiter.wait(path)
         response = base_method(self.build_path(path, secure), **kwargs)
         response.raise_for_status()
         return response
     return okc_method
 
 
+def build_okc_future_method(method_name):
+    def okc_future_method(self, path, secure=None, **kwargs):
+        return self.submit(getattr(self, 'okc_{0}'.format(method_name)),
+                           path, secure=secure, **kwargs)
+    return okc_future_method
+
+
 for method_name in ('get', 'put', 'post', 'delete'):
     setattr(Session, 'okc_{0}'.format(method_name), build_okc_method(method_name))
+    setattr(Session, 'okc_{0}_future'.format(method_name),
+            build_okc_future_method(method_name))
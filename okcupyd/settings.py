@@ -12,6 +12,15 @@ PASSWORD = os.environ.get('OKC_PASSWORD')
 AF_USERNAME = os.environ.get('AF_USERNAME', USERNAME)
 AF_PASSWORD = os.environ.get('AF_PASSWORD', PASSWORD)
 
+#: The SQLite database file in which the results of the
+#: :class:`~okcupyd.attractiveness_finder.AttractivenessFinder` are cached.
+#: Results are only cached in memory when this is not set.
+AF_CACHE_FILENAME = os.environ.get('AF_CACHE_FILENAME')
+#: The number of seconds for which a cached attractiveness is used.
+AF_CACHE_TTL = float(os.environ.get('AF_CACHE_TTL', 7 * 24 * 60 * 60))
+#: The maximum number of attractivenesses kept in the cache file.
+AF_CACHE_MAX_SIZE = int(os.environ.get('AF_CACHE_MAX_SIZE', 100000))
+
 OKCUPYD_CONFIG_FILENAME = '.okcupyd.yml'
 
 
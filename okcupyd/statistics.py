@@ -42,10 +42,25 @@ class Statistics(object):
     def received(self):
         return self.with_filters(lambda mt: mt.initiator != self._user.profile)
 
+    def _find_attractiveness_many(self, attractiveness_finder=None):
+        attractiveness_finder = attractiveness_finder or self._attractiveness_finder
+        return attractiveness_finder.find_attractiveness_many(
+            set(thread.correspondent for thread in self.threads)
+        )
+
     @util.cached_property
     def has_attractiveness(self):
-        return self.with_filters(lambda mt: self._attractiveness_finder.find_attractiveness(
-            mt.correspondent) is not None)
+        attractiveness = self._find_attractiveness_many()
+        def _has_attractiveness(thread):
+            if thread.correspondent not in attractiveness:
+                # The filter can be applied to threads other than these ones
+                # when filters are not applied immediately.
+                attractiveness[thread.correspondent] = \
+                    self._attractiveness_finder.find_attractiveness(
+                        thread.correspondent
+                    )
+            return attractiveness[thread.correspondent] is not None
+        return self.with_filters(_has_attractiveness)
 
     def time_filter(self, min_date=None, max_date=None):
         def _time_filter(thread):
@@ -94,11 +109,12 @@ class Statistics(object):
         return self._average(lambda thread: thread.message_count)
 
     def _average_attractiveness(self, attractiveness_finder=None):
-        attractiveness_finder = attractiveness_finder or self._attractiveness_finder
-        return self.has_attractiveness._average(lambda thread: (
-            attractiveness_finder.find_attractiveness(
-                thread.correspondent
-            ))
+        has_attractiveness = self.has_attractiveness
+        attractiveness = has_attractiveness._find_attractiveness_many(
+            attractiveness_finder
+        )
+        return has_attractiveness._average(
+            lambda thread: attractiveness[thread.correspondent]
         )
 
     @property
@@ -10,7 +10,6 @@ from .json_search import SearchFetchable, search
 from .location import LocationQueryCache
 from .messaging import ThreadFetcher, MessageThread
 from .photo import PhotoUploader
-from .profile import Profile
 from .profile_copy import Copy
 from .question import Questions
 from .session import Session
@@ -42,7 +41,7 @@ class User(object):
     _visitors_total_page_xpb = xpb.div.with_class('pages').\
                                a.with_class('last').text_
 
-    def __init__(self, session=None):
+    def __init__(self, session=None, read_ahead=0):
         """
         :param session: The session which will be used for interacting
                         with okcupid.com
@@ -50,6 +49,10 @@ class User(object):
                         automatically with the credentials in
                         :mod:`~okcupyd.settings`
         :type session: :class:`~okcupyd.session.Session`
+        :param read_ahead: The number of pages that the mailbox, visitor and
+                           question fetchables of this user request ahead of
+                           the page that is being consumed.
+        :type read_ahead: int
         """
         self._session = session or Session.login()
         self._message_sender = helpers.Messager(self._session)
@@ -58,20 +61,26 @@ class User(object):
         )
         #: A :class:`~okcupyd.profile.Profile` object belonging to the logged
         #: in user.
-        self.profile = Profile(self._session, self._session.log_in_name)
+        self.profile = self._session.get_current_user_profile()
 
         #: A :class:`~okcupyd.util.fetchable.Fetchable` of
         #: :class:`~okcupyd.messaging.MessageThread` objects corresponding to
         #: messages that are currently in the user's inbox.
-        self.inbox = util.Fetchable(ThreadFetcher(self._session, 1))
+        self.inbox = util.Fetchable(
+            ThreadFetcher(self._session, 1, read_ahead=read_ahead)
+        )
         #: A :class:`~okcupyd.util.fetchable.Fetchable` of
         #: :class:`~okcupyd.messaging.MessageThread` objects corresponding to
         #: messages that are currently in the user's outbox.
-        self.outbox = util.Fetchable(ThreadFetcher(self._session, 2))
+        self.outbox = util.Fetchable(
+            ThreadFetcher(self._session, 2, read_ahead=read_ahead)
+        )
         #: A :class:`~okcupyd.util.fetchable.Fetchable` of
         #: :class:`~okcupyd.messaging.MessageThread` objects corresponding to
         #: messages that are currently in the user's drafts folder.
-        self.drafts = util.Fetchable(ThreadFetcher(self._session, 4))
+        self.drafts = util.Fetchable(
+            ThreadFetcher(self._session, 4, read_ahead=read_ahead)
+        )
 
         #: A :class:`~okcupyd.util.fetchable.Fetchable` of
         #: :class:`~okcupyd.profile.Profile` objects of okcupid.com users that
@@ -80,14 +89,15 @@ class User(object):
             util.GETFetcher(self._session, 'visitors',
                             lambda start_at: {'low': start_at}),
             util.PaginationProcessor(
-                lambda user: Profile(self._session, user), self._visitors_xpb,
+                self._session.get_profile, self._visitors_xpb,
                 self._visitors_current_page_xpb, self._visitors_total_page_xpb,
-            )
+            ),
+            read_ahead=read_ahead
         )
 
         #: A :class:`~okcupyd.question.Questions` object that is instantiated
         #: with the owning :class:`~.User` instance's session.
-        self.questions = Questions(self._session)
+        self.questions = Questions(self._session, read_ahead=read_ahead)
 
         #: An :class:`~okcupyd.attractiveness_finder._AttractivenessFinder`
         #: object that is instantiated with the owning :class:`~.User`
@@ -276,7 +286,7 @@ class User(object):
         quickmatch page.
         """
         response = self._session.okc_get('quickmatch', params={'okc_api': 1})
-        return Profile(self._session, response.json()['sn'])
+        return self._session.get_profile(response.json()['sn'])
 
     def copy(self, profile_or_user):
         """Create a :class:`~okcupyd.profile_copy.Copy` instance with the
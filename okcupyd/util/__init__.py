@@ -7,6 +7,7 @@ import types
 
 import six
 
+from .cache import Deduplicator, LRUCache
 from .fetchable import *
 from .compose import compose
 from .currying import curry
@@ -76,6 +77,26 @@ class cached_property(object):
         return inspect.getmembers(type(obj), lambda x: isinstance(x, cls))
 
 
+def detach(obj, property_names, attribute_names):
+    """Evaluate the :class:`.cached_property` objects named by
+    `property_names` on `obj` and then delete the attributes named by
+    `attribute_names`, which usually hold the lxml elements that the
+    properties were read from, so that the tree they belong to can be freed.
+
+    Properties that raise are left unevaluated; reading them after the
+    elements have been released raises AttributeError.
+    """
+    for name in property_names:
+        try:
+            getattr(obj, name)
+        except Exception as exc:
+            log.debug(u'Could not evaluate {0} of {1} before detaching: '
+                      u'{2}'.format(name, type(obj).__name__, repr(exc)))
+    for name in attribute_names:
+        obj.__dict__.pop(name, None)
+    return obj
+
+
 class CallableMap(object):
 
     def __init__(self, func_value_pairs=()):
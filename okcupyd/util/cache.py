@@ -0,0 +1,124 @@
+import collections
+import threading
+import time
+
+
+class LRUCache(object):
+    """A thread safe mapping that holds at most `max_size` entries, evicting
+    the least recently used one when it is full, and that considers entries
+    older than `ttl` seconds to be expired.
+
+    Expired entries are not removed automatically. :meth:`.get` treats them as
+    missing, but :meth:`.lookup` returns them along with a flag so that their
+    owner can decide whether to refresh them or replace them.
+    """
+
+    def __init__(self, max_size=None, ttl=None, clock=time.time):
+        """
+        :param max_size: The maximum number of entries. `None` means
+                         unbounded.
+        :param ttl: The number of seconds after which an entry expires.
+                    `None` means that entries never expire.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = collections.OrderedDict()
+        self.lock = threading.RLock()
+
+    def _is_expired(self, stored_at):
+        return self.ttl is not None and self._clock() - stored_at >= self.ttl
+
+    def lookup(self, key):
+        """Mark the entry stored under `key` as the most recently used one.
+
+        :returns: A `(value, expired)` tuple.
+        :raises: KeyError if there is no entry stored under `key`.
+        """
+        with self.lock:
+            value, stored_at = self._entries.pop(key)
+            self._entries[key] = (value, stored_at)
+            return value, self._is_expired(stored_at)
+
+    def get(self, key, default=None):
+        """
+        :returns: The value stored under `key` or `default` if there is no
+                  such value or it has expired.
+        """
+        try:
+            value, expired = self.lookup(key)
+        except KeyError:
+            return default
+        return default if expired else value
+
+    def set(self, key, value):
+        with self.lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, self._clock())
+            while (self.max_size is not None and
+                   len(self._entries) > self.max_size):
+                self._entries.popitem(last=False)
+
+    def touch(self, key):
+        """Reset the age of the entry stored under `key`, if there is one."""
+        with self.lock:
+            if key in self._entries:
+                self.set(key, self._entries[key][0])
+
+    def discard(self, key):
+        with self.lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self._entries.clear()
+
+    def __contains__(self, key):
+        with self.lock:
+            return (key in self._entries and
+                    not self._is_expired(self._entries[key][1]))
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Deduplicator(object):
+    """Drop items whose key has already been seen from a stream of items.
+
+    Only the `max_size` most recently seen keys are remembered, so memory
+    stays bounded on streams of any length, at the cost of letting through a
+    duplicate of an item that was seen long enough ago.
+    """
+
+    def __init__(self, max_size=None, key=lambda item: item):
+        """
+        :param max_size: The number of keys to remember. `None` means
+                         remember all of them.
+        :param key: A function that returns the key of an item.
+        """
+        self._seen = LRUCache(max_size=max_size)
+        self._key = key
+        #: The number of items that were let through.
+        self.passed = 0
+        #: The number of items that were dropped as duplicates.
+        self.dropped = 0
+
+    def is_duplicate(self, item):
+        """Record `item` as seen.
+
+        :returns: Whether or not an item with the same key was seen before.
+        """
+        key = self._key(item)
+        with self._seen.lock:
+            if key in self._seen:
+                self._seen.touch(key)
+                self.dropped += 1
+                return True
+            self._seen.set(key, True)
+            self.passed += 1
+            return False
+
+    def __call__(self, items):
+        for item in items:
+            if not self.is_duplicate(item):
+                yield item
@@ -106,17 +106,61 @@ the program is running.
 Without the call to  `user.profile.questions.refresh()`, this program
 would never update the user.profile.questions instance, and thus what
 would be printed to the screen with each iteration of the for loop.
+
+Passing `incremental=True` to
+:meth:`~okcupyd.util.fetchable.Fetchable.refresh` keeps the questions
+that were already fetched and only requests pages from the start until a
+question that was already fetched is reached, which usually takes a single
+request. :attr:`~okcupyd.util.fetchable.Fetchable.changes` then holds the
+ids of the questions that were added and removed.
 """
+import bisect
+import collections
 import itertools
-from lxml import html
+import threading
+
+from lxml import etree, html
+import six
+
+
+#: What an incremental :meth:`Fetchable.refresh` found: the keys of the items
+#: that were added in front of the items that had been fetched, and of the
+#: items that were dropped.
+RefreshChanges = collections.namedtuple('RefreshChanges', ('added', 'removed'))
+
+
+def _refresh_key(item):
+    # Reading the id of a profile loads its page, so profiles are recognized
+    # by their username instead.
+    username = getattr(item, 'username', None)
+    if isinstance(username, six.string_types):
+        return username.lower()
+    return item.id
 
 
 class Fetchable(object):
-    """List-like container object that lazily loads its contained items."""
+    """List-like container object that lazily loads its contained items.
+
+    Items are stored in a list as they are fetched, so indexing, slicing and
+    iterating over items that have already been fetched does not touch the
+    fetcher again. When the fetcher reports the page that each item came
+    from (see :meth:`.FetchMarshall.fetch_indexed`), :attr:`page_index`
+    records the index at which each page starts.
+
+    When the fetcher can request pages by offset (see
+    :meth:`.FetchMarshall.fetch_page_at`), indexing or slicing more than a
+    page beyond the items that have been fetched requests only the pages
+    that hold the requested items. The page size is learned from the first
+    page.
+    """
 
     @classmethod
-    def fetch_marshall(cls, fetcher, processor):
-        return cls(FetchMarshall(fetcher, processor))
+    def fetch_marshall(cls, fetcher, processor, **kwargs):
+        """
+        :param kwargs: Keyword arguments that are passed to
+                       :class:`~.FetchMarshall` (e.g. `read_ahead`).
+        """
+        return cls(FetchMarshall(fetcher, processor, **kwargs))
 
     def __init__(self, fetcher, **kwargs):
         """
@@ -132,107 +176,306 @@ class Fetchable(object):
         """
         self._fetcher = fetcher
         self._kwargs = kwargs
+        self._lock = threading.RLock()
         self.refresh()
 
-    def refresh(self, nice_repr=True, **kwargs):
+    def refresh(self, nice_repr=True, incremental=False, key=_refresh_key,
+                **kwargs):
         """
         :param nice_repr: Append the repr of a list containing the items that
                           have been fetched to this point by the fetcher.
         :type nice_repr: bool
+        :param incremental: Instead of discarding the items that have been
+                            fetched, fetch from the start only until an item
+                            that has already been fetched is reached, and
+                            put the items before it in front of the ones
+                            that were already fetched. Items that used to
+                            come before that item are dropped. What changed
+                            is recorded in :attr:`changes`. The page size
+                            that was learned for random access is kept.
+        :type incremental: bool
+        :param key: A function that returns an identifier for an item, used
+                    by incremental refreshes to recognize items that have
+                    already been fetched. Defaults to the lowercased
+                    `username` of items that have one (e.g. profiles, whose
+                    `id` can only be read by loading their page) and to the
+                    `id` of other items.
         :param kwargs: kwargs that should be passed to the fetcher when its
                        fetch method is called. These are merged with the values
                        provided to the constructor, with the ones provided here
                        taking precedence if there is a conflict.
         """
-        for key, value in self._kwargs.items():
-            kwargs.setdefault(key, value)
-        # No real good reason to hold on to this. DONT TOUCH.
-        self._original_iterable = self._fetcher.fetch(**kwargs)
-        self.exhausted = False
-        if nice_repr:
-            self._accumulated = []
-            self._original_iterable = self._make_nice_repr_iterator(
-                self._original_iterable, self._accumulated
-            )
-        else:
-            self._accumulated = None
-        self._clonable, = itertools.tee(self._original_iterable, 1)
+        for name, value in self._kwargs.items():
+            kwargs.setdefault(name, value)
+        with self._lock:
+            incremental = incremental and bool(self._accumulated)
+            page_size = self._known_page_size() if incremental else None
+            iterator = self._start(kwargs)
+            self._nice_repr = nice_repr
+            if incremental:
+                self._splice(iterator, key, kwargs)
+            else:
+                self._iterator = iterator
+                self._accumulated = []
+                self.exhausted = False
+                #: A :class:`~.RefreshChanges` describing what the last
+                #: incremental refresh found, or `None`.
+                self.changes = None
+            #: A list of `(index, page)` tuples, in order, recording the index
+            #: of the first item of each page that has been fetched and the
+            #: fetcher's identifier for that page (e.g. its `start_at`
+            #: offset).
+            self.page_index = []
+            self._page_starts = []
+            if incremental:
+                self._index_pages(page_size)
         return self
 
-    @staticmethod
-    def _make_nice_repr_iterator(original_iterable, accumulator):
-        for item in original_iterable:
-            accumulator.append(item)
-            yield item
+    def _known_page_size(self):
+        if self._page_size is None and len(self.page_index) > 1:
+            return self.page_index[1][0]
+        return self._page_size
+
+    def _index_pages(self, page_size):
+        """Index the items that were kept by an incremental refresh. They now
+        sit at the offsets that the fetcher serves them from, so the pages
+        that hold them are those of the page size that was learned before.
+        """
+        if not page_size or self._start_at is None:
+            return
+        self._page_size = page_size
+        for index in range(0, len(self._accumulated), page_size):
+            self.page_index.append((index, self._start_at + index))
+            self._page_starts.append(index)
+
+    def _start(self, kwargs):
+        self._random_access = (
+            hasattr(type(self._fetcher), 'fetch_page_at') and
+            self._fetcher.random_access
+        )
+        if self._random_access:
+            self._fetcher.clear_pages()
+        # Items of pages that were requested out of order, by index.
+        self._jumped = {}
+        # The first indices of those pages, so that none is requested twice.
+        self._jumped_pages = set()
+        # The index after the last item, once a page that is shorter than the
+        # page size has shown where the items end.
+        self._end = None
+        self._page_size = None
+        # Looked up on the type, so that only fetchers that really implement
+        # it (rather than e.g. mocks) are treated as indexed.
+        self._takes_expectations = hasattr(type(self._fetcher), 'expect')
+        if hasattr(type(self._fetcher), 'fetch_indexed'):
+            self._start_at = kwargs.get('start_at') or self._fetcher.start_at
+            return self._fetcher.fetch_indexed(**kwargs)
+        self._start_at = None
+        return ((None, item) for item in self._fetcher.fetch(**kwargs))
+
+    def _splice(self, iterator, key, kwargs):
+        fetched = self._accumulated
+        index_of = {}
+        for index, item in enumerate(fetched):
+            index_of.setdefault(key(item), index)
+        added = []
+        match = None
+        for _, item in iterator:
+            match = index_of.get(key(item))
+            if match is not None:
+                break
+            added.append(item)
+        if match is None:
+            # None of the items that were fetched before are left.
+            removed = fetched
+            self._accumulated = added
+            self.exhausted = True
+        else:
+            removed = fetched[:match]
+            self._accumulated = added + fetched[match:]
+            if not self.exhausted:
+                self._iterator = self._continue(iterator, kwargs,
+                                                len(fetched) - match - 1)
+        self.changes = RefreshChanges(added=[key(item) for item in added],
+                                      removed=[key(item) for item in removed])
+
+    def _continue(self, iterator, kwargs, skip):
+        """Continue fetching after the items that were kept by an incremental
+        refresh, where `iterator` has just yielded the first of them and
+        `skip` more of them follow.
+        """
+        if self._start_at is not None:
+            kwargs = dict(kwargs,
+                          start_at=self._start_at + len(self._accumulated))
+            return self._fetcher.fetch_indexed(**kwargs)
+        return itertools.islice(iterator, skip, None)
 
     __call__ = refresh
 
+    def _expect(self, count):
+        """Tell fetchers that size their requests by demand (see
+        :meth:`okcupyd.json_search.SearchManager.expect`) that `count` items
+        (or all of them, if it is `None`) are wanted.
+        """
+        if self._takes_expectations:
+            self._fetcher.expect(count)
+
+    def _fill_to(self, count=None):
+        """Fetch items until at least `count` of them have been accumulated or
+        the fetcher runs out. `None` means fetch everything.
+        """
+        with self._lock:
+            while not self.exhausted and (count is None or
+                                          len(self._accumulated) < count):
+                try:
+                    page, item = next(self._iterator)
+                except StopIteration:
+                    self.exhausted = True
+                    break
+                if page is not None and (not self.page_index or
+                                         self.page_index[-1][1] != page):
+                    self.page_index.append((len(self._accumulated), page))
+                    self._page_starts.append(len(self._accumulated))
+                # Keep the item that was already handed out for this index.
+                item = self._jumped.pop(len(self._accumulated), item)
+                self._accumulated.append(item)
+
+    def _learn_page_size(self):
+        if self._page_size is None:
+            if not self._accumulated and not self.exhausted:
+                self._jump_to_page(0)
+                return self._page_size
+            # The first page has already been fetched, so reading the rest of
+            # it until the fetcher has parsed it doesn't make a request.
+            while (self._fetcher.page_size is None and
+                   len(self.page_index) < 2 and not self.exhausted):
+                self._fill_to(len(self._accumulated) + 1)
+            if self._fetcher.page_size is not None:
+                self._page_size = self._fetcher.page_size
+            elif len(self.page_index) > 1:
+                self._page_size = self.page_index[1][0]
+        return self._page_size
+
+    def _jump_to_page(self, first_index):
+        items = self._fetcher.fetch_page_at(self._start_at + first_index)
+        self._jumped_pages.add(first_index)
+        if self._page_size is None:
+            self._page_size = len(items)
+        elif len(items) < self._page_size:
+            self._end = first_index + len(items)
+        for offset, item in enumerate(items):
+            self._jumped.setdefault(first_index + offset, item)
+
+    def _get_random_access(self, index):
+        """Get the item at `index` by requesting only the page that holds it,
+        if that is worth it.
+
+        :raises: IndexError if that page does not hold the item.
+        :returns: `_Missing` if the item should be fetched in order instead.
+        """
+        with self._lock:
+            if index < len(self._accumulated):
+                return self._accumulated[index]
+            if index in self._jumped:
+                return self._jumped[index]
+            if not self._random_access or self.exhausted:
+                return _Missing
+            page_size = self._learn_page_size()
+            if index in self._jumped:
+                return self._jumped[index]
+            if self._end is not None and index >= self._end:
+                raise IndexError("The Fetchable does not have a value at the "
+                                 "index that was provided.")
+            if not page_size or index - len(self._accumulated) < page_size:
+                # The item is on the page that would be fetched next anyway.
+                return _Missing
+            first_index = index - index % page_size
+            if first_index not in self._jumped_pages:
+                self._jump_to_page(first_index)
+            try:
+                return self._jumped[index]
+            except KeyError:
+                raise IndexError("The Fetchable does not have a value at the "
+                                 "index that was provided.")
+
+    def page_of(self, index):
+        """
+        :returns: The `(index, page)` entry of :attr:`page_index` for the page
+                  that the item at `index` came from, or `None` if that is not
+                  known.
+        """
+        position = bisect.bisect_right(self._page_starts, index) - 1
+        if position < 0 or index >= len(self._accumulated):
+            return None
+        return self.page_index[position]
+
     def __iter__(self):
-        # This is hard to think about, but you can't ever use an iterator
-        # if you plan on cloning it. Furthermore, you can only clone it once
-        # (directly). For this reason, we throw away the iterator once it has
-        # been cloned.
-        new_iterable, self._clonable = itertools.tee(self._clonable, 2)
-        return new_iterable
+        index = 0
+        while True:
+            if index >= len(self._accumulated):
+                self._fill_to(index + 1)
+                if index >= len(self._accumulated):
+                    return
+            yield self._accumulated[index]
+            index += 1
 
     def __getitem__(self, item):
         if not isinstance(item, slice):
-            iterator = iter(self)
             assert isinstance(item, int)
-            if item < 0:
-                return list(iterator)[item]
+            if item >= 0:
+                value = self._get_random_access(item)
+                if value is not _Missing:
+                    return value
+            self._expect(None if item < 0 else item + 1)
+            self._fill_to(None if item < 0 else item + 1)
             try:
-                for i in range(item):
-                    next(iterator)
-                return next(iterator)
-            except StopIteration:
-                self.exhausted = True
+                return self._accumulated[item]
+            except IndexError:
                 raise IndexError("The Fetchable does not have a value at the "
                                  "index that was provided.")
         return self._handle_slice(item)
 
     def _handle_slice(self, item):
-        iterator = iter(self)
-        # No point in being lazy if they want it all.
-        if ((item.start is None and item.stop is None) or
-            # If we have any negative numbers we have to expand the whole
-            # thing anyway. This is also the case if there is no bound
-            # on the slice, hence the `not item.stop` trigger.
-            ((item.start and item.start < 0) or
-             (not item.stop or item.stop < 0))):
-            self.exausted = True
-            return list(iterator)[item]
-        accumulator = []
-        # No need to do this for stop since we are sure it is not None.
+        # If the slice is unbounded or has any negative numbers, the whole
+        # thing has to be expanded anyway.
+        if ((item.start is not None and item.start < 0) or
+            item.stop is None or item.stop < 0):
+            self._expect(None)
+            self._fill_to()
+            return self._accumulated[item]
+        self._expect(item.stop)
         start = item.start or 0
-        for _ in range(0, start, item.step or 1):
+        if self._random_access and start > len(self._accumulated):
+            return self._random_access_slice(start, item.stop, item.step or 1)
+        self._fill_to(item.stop)
+        return self._accumulated[item]
+
+    def _random_access_slice(self, start, stop, step):
+        values = []
+        for index in range(start, stop, step):
             try:
-                next(iterator)
-            except StopIteration: # This is strange but its what list do.
-                self.exhausted = True
+                value = self._get_random_access(index)
+            except IndexError:
                 break
-        for i in range(item.stop - start):
-            try:
-                value = next(iterator)
-            except StopIteration:
-                self.exhausted = True
+            if value is _Missing:
+                self._fill_to(stop)
+                values.extend(self._accumulated[index:stop:step])
                 break
-            else:
-                if item.step == None or i % item.step == 0:
-                    accumulator.append(value)
-        return accumulator
+            values.append(value)
+        return values
 
     def __repr__(self):
         fetched_type = repr(self._fetcher)
-        if self._accumulated == None:
+        if not self._nice_repr:
             list_repr = ''
         else:
             try:
-                self[0]
+                first = self[0]
             except:
                 pass
             else:
-                fetched_type = type(self._accumulated[0]).__name__
+                # The first item may come from a page that was requested out
+                # of order, so it isn't necessarily accumulated.
+                fetched_type = type(first).__name__
             list_repr = repr(self._accumulated)
             if not self.exhausted:
                 if len(self._accumulated) == 0:
@@ -244,7 +487,9 @@ class Fetchable(object):
                                     fetched_type, list_repr)
 
     def __len__(self):
-        return len(self[:])
+        self._expect(None)
+        self._fill_to()
+        return len(self._accumulated)
 
     def __add__(self, other):
         return self[:] + other[:]
@@ -253,39 +498,229 @@ class Fetchable(object):
         return self[:] == other[:]
 
     def __nonzero__(self):
-        try:
-            self[0]
-        except IndexError:
-            return False
-        else:
-            return True
+        self._fill_to(1)
+        return bool(self._accumulated)
+
+    __bool__ = __nonzero__
+
+
+#: Returned by :meth:`Fetchable._get_random_access` when an item should be
+#: fetched in order.
+_Missing = object()
 
 
 class FetchMarshall(object):
+    """Drive a page fetcher and a processor that turns each page into items.
+
+    When `read_ahead` is greater than 0, the pages following the one that is
+    currently being consumed are requested in the background. The offsets of
+    those pages are predicted from the number of items on the first page, so
+    read ahead starts with the second page. Background requests are made
+    with the session that the fetcher was built with (and therefore wait on
+    its rate limiter) unless another executor is provided. Nothing is read
+    ahead past a page that has come back empty, or past the last page when
+    `pages_remaining` tells where it is.
+
+    When `pages_remaining` is provided, it is used to find out how many
+    pages follow the first one, and they are requested concurrently as soon
+    as the processor has parsed the first page (see the `page_parsed`
+    argument of :meth:`.StreamingProcessor.process`), before the consumer
+    reaches the end of it. Items are still yielded in order. Only the pages
+    that hold the number of items passed to :meth:`.expect` (as
+    :class:`~.Fetchable` does when it is indexed or sliced) are requested
+    this way; if nothing was expected, or all items were, that is all of
+    them.
+
+    Because pages are requested by offset, any page can be requested out of
+    order with :meth:`.fetch_page_at`. :class:`~.Fetchable` uses this to jump
+    straight to the page that holds an item, unless `random_access` is
+    False. The text of such pages is kept, so that reaching them while
+    fetching in order does not request them again.
+    """
 
-    def __init__(self, fetcher, processor, terminator=None, start_at=1):
+    def __init__(self, fetcher, processor, terminator=None, start_at=1,
+                 read_ahead=0, executor=None, random_access=True,
+                 pages_remaining=None):
+        """
+        :param fetcher: An object with a `fetch` method that accepts a
+                        `start_at` offset and returns the text of the page
+                        that starts at that offset.
+        :param processor: An object with a `process` method that yields the
+                          items found in a page of text.
+        :param read_ahead: The number of pages to request ahead of the page
+                           that is being consumed.
+        :param executor: The `concurrent.futures.Executor` used to make read
+                         ahead requests. Defaults to the executor of the
+                         fetcher's session.
+        :param random_access: Whether or not pages may be requested out of
+                              order with :meth:`.fetch_page_at`.
+        :param pages_remaining: A function that accepts a page as parsed by
+                                the processor and returns the number of
+                                pages after it.
+        """
         self._fetcher = fetcher
         self._start_at = start_at
+        self.random_access = random_access
+        self._page_texts = {}
         self._processor = processor
         self._terminator = terminator or self.simple_decider
+        self._read_ahead = read_ahead
+        self._executor = executor
+        self._pages_remaining = pages_remaining
+        # The offset of the last page, once `pages_remaining` has told.
+        self._last_page_at = None
+        self._wanted = None
+        self._wants_all = False
+        #: The number of items on the first page that was parsed, or `None`
+        #: if no page has been parsed yet.
+        self.page_size = None
 
     @staticmethod
     def simple_decider(pos, last, text_response):
         return pos > last
 
+    @property
+    def start_at(self):
+        return self._start_at
+
+    @property
+    def executor(self):
+        return self._executor or self._fetcher._session.executor
+
+    def _is_known_empty(self, page_pos, pending):
+        if page_pos in self._page_texts:
+            return not self._page_texts[page_pos]
+        future = pending.get(page_pos)
+        return (future is not None and future.done() and
+                not future.cancelled() and future.exception() is None and
+                not future.result())
+
+    def _request_from(self, pos, page_size, page_count, pending):
+        """Request up to `page_count` pages starting at `pos` in the
+        background, stopping at the last page if it is known and after a
+        page that has already come back empty.
+        """
+        for page_number in range(page_count):
+            page_pos = pos + page_number * page_size
+            if (self._last_page_at is not None and
+                page_pos > self._last_page_at):
+                break
+            if page_pos not in pending and page_pos not in self._page_texts:
+                pending[page_pos] = self.executor.submit(
+                    self._fetcher.fetch, start_at=page_pos
+                )
+            if self._is_known_empty(page_pos, pending):
+                break
+
+    def expect(self, count):
+        """Record that the consumer wants at least `count` items in total,
+        or all of them if `count` is `None`.
+        """
+        if count is None:
+            self._wants_all = True
+        elif self._wanted is None or count > self._wanted:
+            self._wanted = count
+
+    def _pages_wanted_from(self, pos, page_size):
+        """The number of the pages from `pos` on that hold the items that
+        the consumer expects, once the last page is known.
+        """
+        if self._wanted is None or self._wants_all:
+            return (self._last_page_at - pos) // page_size + 1
+        return -(-(self._start_at + self._wanted - pos) // page_size)
+
+    def _read_ahead_from(self, pos, page_size, pending):
+        for stale_pos in [key for key in pending if key < pos]:
+            pending.pop(stale_pos).cancel()
+        page_count = self._read_ahead + 1 if self._read_ahead else 0
+        if self._last_page_at is not None:
+            page_count = max(page_count,
+                             self._pages_wanted_from(pos, page_size))
+        self._request_from(pos, page_size, page_count, pending)
+
+    def _first_page_parsed(self, pos, pending):
+        def page_parsed(parsed_page, item_count):
+            if self.page_size is None:
+                self.page_size = item_count
+            if item_count and self._pages_remaining is not None:
+                self._last_page_at = (pos + item_count *
+                                      self._pages_remaining(parsed_page))
+                self._read_ahead_from(pos + item_count, item_count, pending)
+        return page_parsed
+
+    def _fetch_page(self, pos, pending):
+        if pos in self._page_texts:
+            return self._page_texts.pop(pos)
+        if pos in pending:
+            return pending.pop(pos).result()
+        return self._fetcher.fetch(start_at=pos)
+
+    def fetch_page_at(self, start_at):
+        """Request the page that starts at the offset `start_at`.
+
+        :returns: A list of the items on that page.
+        """
+        text_response = self._fetcher.fetch(start_at=start_at)
+        self._page_texts[start_at] = text_response
+        if not text_response:
+            return []
+        items = []
+        for item in self._processor.process(text_response):
+            if item is StopIteration:
+                break
+            items.append(item)
+        if self.page_size is None:
+            self.page_size = len(items)
+        return items
+
+    def clear_pages(self):
+        """Forget the pages that were requested by :meth:`.fetch_page_at` and
+        the page size.
+        """
+        self._page_texts.clear()
+        self.page_size = None
+
     def fetch(self, start_at=None):
+        for _, item in self.fetch_indexed(start_at=start_at):
+            yield item
+
+    def fetch_indexed(self, start_at=None):
+        """Like :meth:`.fetch`, but yield `(page_start_at, item)` tuples, where
+        `page_start_at` is the offset of the page that item was found on.
+        """
         pos = start_at or self._start_at
-        while True:
-            last = pos
-            text_response = self._fetcher.fetch(start_at=pos)
-            if not text_response: break
-            for item in self._processor.process(text_response):
-                if item is StopIteration:
-                    raise StopIteration()
-                yield item
-                pos += 1
-            if not self._terminator(pos, last, text_response):
-                break
+        page_size = None
+        pending = {}
+        self._last_page_at = None
+        try:
+            while self._last_page_at is None or pos <= self._last_page_at:
+                last = pos
+                text_response = self._fetch_page(pos, pending)
+                if not text_response: break
+                if page_size is None:
+                    items = self._processor.process(
+                        text_response,
+                        page_parsed=self._first_page_parsed(pos, pending)
+                    )
+                else:
+                    items = self._processor.process(text_response)
+                for item in items:
+                    if item is StopIteration:
+                        return
+                    yield last, item
+                    pos += 1
+                if not self._terminator(pos, last, text_response):
+                    break
+                page_size = page_size or pos - last
+                # A page that is shorter than the first one is most likely
+                # the last, so there is nothing worth reading ahead. Pages
+                # after the last one, when it is known, are never requested.
+                if ((self._read_ahead or self._last_page_at is not None) and
+                    pos - last >= page_size):
+                    self._read_ahead_from(pos, page_size, pending)
+        finally:
+            for future in pending.values():
+                future.cancel()
 
     def __repr__(self):
         return '{0}({1}, {2})'.format(type(self).__name__,
@@ -303,13 +738,15 @@ class SimpleProcessor(object):
         self._object_factory = object_factory
         self._element_xpath = element_xpath
 
-    def process(self, text_response):
+    def process(self, text_response, page_parsed=None):
         if not text_response.strip():
             yield StopIteration
-            raise StopIteration()
-        for element in self._element_xpath.apply_(
-            html.fromstring(text_response)
-        ):
+            return
+        tree = html.fromstring(text_response)
+        elements = self._element_xpath.apply_(tree)
+        if page_parsed is not None:
+            page_parsed(tree, len(elements))
+        for element in elements:
             yield self._object_factory(element)
 
     def __repr__(self):
@@ -336,9 +773,12 @@ class PaginationProcessor(object):
     def _are_pages_left(self, tree):
         return self._current_page(tree) < self._page_count(tree)
 
-    def process(self, text_response):
+    def process(self, text_response, page_parsed=None):
         tree = html.fromstring(text_response)
-        for element in self._element_xpb.apply_(tree):
+        elements = self._element_xpb.apply_(tree)
+        if page_parsed is not None:
+            page_parsed(tree, len(elements))
+        for element in elements:
             yield self._object_factory(element)
         if not self._are_pages_left(tree):
             # This is pretty gross: Part of the processor protocol
@@ -348,6 +788,119 @@ class PaginationProcessor(object):
             yield StopIteration
 
 
+class StreamingProcessor(object):
+    """Incrementally parse a page with an :class:`lxml.etree.HTMLPullParser`,
+    applying object_factory to each `tag` element that has all of `classes`
+    as soon as its closing tag has been parsed, instead of waiting for the
+    whole page to be parsed as :class:`~.SimpleProcessor` and
+    :class:`~.PaginationProcessor` do.
+
+    Each matching element is removed from the page's tree once it has been
+    handed to object_factory, so the tree only ever holds the parts of the
+    page that have not been turned into items.
+
+    This does not stream pages from the network: the fetchers in this package
+    (e.g. :class:`~.GETFetcher`) download the whole page before it is
+    processed, and :class:`~.FetchMarshall` keeps page texts for read ahead
+    and random access. What is incremental is the parsing of that text,
+    which is fed to the parser `chunk_size` characters at a time so that
+    the first items are available before the rest of the page is parsed.
+    """
+
+    def __init__(self, object_factory, tag, classes=(), pages_left=None,
+                 chunk_size=16 * 1024):
+        """
+        :param pages_left: A function that is called with the remainder of
+                           the page's tree once it has been parsed and
+                           returns whether or not there are pages after it.
+                           If it is not provided, pages that contain no items
+                           end the iteration, as with
+                           :class:`~.SimpleProcessor`.
+        :param chunk_size: The number of characters fed to the parser at a
+                           time when the page is provided as a single string.
+        """
+        self._object_factory = object_factory
+        self._tag = tag
+        self._classes = frozenset(classes)
+        self._pages_left = pages_left
+        self._chunk_size = chunk_size
+
+    def _chunks(self, text_response):
+        """Yield `(chunk, is_last)` tuples. The last chunk is only recognized
+        when the page is provided as a single string.
+        """
+        if isinstance(text_response, (six.binary_type, six.text_type)):
+            for start in range(0, len(text_response), self._chunk_size):
+                stop = start + self._chunk_size
+                yield text_response[start:stop], stop >= len(text_response)
+        else:
+            # An iterable of chunks that was provided directly by the caller.
+            for chunk in text_response:
+                yield chunk, False
+
+    def _matches(self, element):
+        return self._classes.issubset(element.get('class', '').split())
+
+    def _build_parser(self):
+        parser = etree.HTMLPullParser(events=('end',), tag=self._tag)
+        parser.set_element_class_lookup(html.HtmlElementClassLookup())
+        return parser
+
+    def process(self, text_response, page_parsed=None):
+        """
+        :param page_parsed: A function that is called with the remainder of
+                            the page's tree and the number of items on the
+                            page as soon as the whole page has been parsed,
+                            before the items of its last chunk are yielded.
+        """
+        parser = self._build_parser()
+        is_blank = True
+        item_count = 0
+        root = None
+        for chunk, is_last in self._chunks(text_response):
+            if is_blank and chunk.strip():
+                is_blank = False
+            parser.feed(chunk)
+            if is_last and not is_blank:
+                root = parser.close()
+            elements = self._parsed_elements(parser, root, item_count,
+                                             page_parsed)
+            item_count += len(elements)
+            for element in elements:
+                yield self._object_factory(element)
+        if is_blank:
+            yield StopIteration
+            return
+        if root is None:
+            root = parser.close()
+            for element in self._parsed_elements(parser, root, item_count,
+                                                 page_parsed):
+                yield self._object_factory(element)
+        if self._pages_left is not None and not self._pages_left(root):
+            yield StopIteration
+
+    def _parsed_elements(self, parser, root, item_count, page_parsed):
+        elements = list(self._read_elements(parser))
+        if root is not None and page_parsed is not None:
+            page_parsed(root, item_count + len(elements))
+        return elements
+
+    def _read_elements(self, parser):
+        for _, element in parser.read_events():
+            if not self._matches(element):
+                continue
+            parent = element.getparent()
+            if parent is not None:
+                parent.remove(element)
+            yield element
+
+    def __repr__(self):
+        return '<{0}({1}, {2}.{3})>'.format(type(self).__name__,
+                                           repr(self._object_factory),
+                                           self._tag,
+                                           '.'.join(sorted(self._classes)))
+
+
 class GETFetcher(object):
 
     def __init__(self, session, path, query_param_builder=lambda: {}):
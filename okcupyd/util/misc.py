@@ -102,3 +102,27 @@ def replace_all_case_insensitive(a_str, sub, replacement):
         last_stop = start + len(sub)
     segments.append(a_str[last_stop:])
     return ''.join(segments)
+
+
+def _path_has_prefix(path, prefix):
+    if not path.startswith(prefix):
+        return False
+    # The prefix must end at a path segment or at the query string, so that
+    # e.g. 'profile' does not match 'profile_foo'.
+    return (len(path) == len(prefix) or prefix.endswith('/') or
+            path[len(prefix)] in '/?')
+
+
+def match_path_prefix(path, prefixes):
+    """Return the longest member of `prefixes` that `path` starts with, or
+    `None` if there is no such prefix. A prefix only matches whole path
+    segments, and leading slashes are ignored.
+    """
+    path = path.lstrip('/')
+    matched = None
+    for prefix in prefixes:
+        if _path_has_prefix(path, prefix.lstrip('/')) and (
+            matched is None or len(prefix) > len(matched)
+        ):
+            matched = prefix
+    return matched
@@ -1,18 +1,49 @@
+import threading
+
+from lxml import etree
+
 from .util import cached_property
 
 
+_compiled_xpaths = threading.local()
+
+
+def compile_xpath(expression):
+    """Compile `expression` to an :class:`lxml.etree.XPath`.
+
+    Compiled expressions are cached by their expression string. lxml does not
+    guarantee that an XPath object can be evaluated from several threads at
+    once, so every thread keeps its own cache.
+    """
+    try:
+        cache = _compiled_xpaths.cache
+    except AttributeError:
+        cache = _compiled_xpaths.cache = {}
+    try:
+        return cache[expression]
+    except KeyError:
+        compiled = cache[expression] = etree.XPath(expression)
+        return compiled
+
+
 class XPathBuilder(object):
 
     def __init__(self, nodes=(), relative=True, direct_child=False):
         self.nodes = tuple(nodes)
         self.relative = relative
         self.direct_child = direct_child
+        self._children = {}
 
     @cached_property
     def xpath(self):
         return ('.' if self.relative else '') + ''.join(node.xpath
                                                         for node in self.nodes)
 
+    @property
+    def compiled(self):
+        """The :class:`lxml.etree.XPath` for this builder's expression."""
+        return compile_xpath(self.xpath)
+
     @property
     def or_(self):
         return self.update_final_node(self.nodes[-1].make_or)
@@ -30,7 +61,15 @@ class XPathBuilder(object):
                           relative=self.relative)
 
     def __getattr__(self, attr):
-        return self.add_node(element=attr)
+        # Children are interned so that chains like xpb.div.span that are
+        # built repeatedly share their (cached) xpath strings.
+        children = self.__dict__.get('_children')
+        if children is None:
+            return self.add_node(element=attr)
+        try:
+            return children[attr]
+        except KeyError:
+            return children.setdefault(attr, self.add_node(element=attr))
 
     def update_final_node(self, updated_final_node):
         return type(self)(self.nodes[:-1] + (updated_final_node,),
@@ -69,7 +108,7 @@ class XPathBuilder(object):
     with_class = with_classes
 
     def apply_(self, tree):
-        return tree.xpath(self.xpath)
+        return self.compiled(tree)
 
     def one_(self, tree):
         return self.apply_(tree)[0]
@@ -17,7 +17,9 @@ setup(
     install_requires=['lxml', 'requests ~= 2.7', 'simplejson ~= 3.8',
                       'sqlalchemy ~= 1.0', 'ipython ~= 5.0.0',
                       'wrapt ~= 1.10', 'coloredlogs == 5.0', 'invoke ~= 0.13',
-                      'six ~= 1.10', 'setuptools ~= 25.1.0', 'PyYAML >= 1.1'],
+                      'six ~= 1.10', 'setuptools ~= 25.1.0', 'PyYAML >= 1.1',
+                      'futures ~= 3.0; python_version < "3.2"'],
+    extras_require={'aio': ['aiohttp >= 2.0; python_version >= "3.5"']},
     tests_require=['tox', 'pytest', 'mock', 'contextlib2', 'vcrpy >= 1.7.0'],
     package_data={'': ['*.md', '*.rst']},
     author="Ivan Malison",
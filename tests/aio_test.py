@@ -0,0 +1,182 @@
+import asyncio
+
+import mock
+import pytest
+import simplejson
+
+from okcupyd import aio
+from okcupyd.question import QuestionProcessor, UserQuestion
+from okcupyd.rate_limiter import TokenBucketRateLimiter
+from .util import question_page, search_response
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class PageFetcher(object):
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    async def fetch_page(self, cursor=None):
+        cursor = cursor or 0
+        self.calls.append(cursor)
+        next_cursor = cursor + 1 if cursor + 1 < len(self.pages) else None
+        return self.pages[cursor], next_cursor
+
+
+def test_async_fetchable_indexing_and_slicing():
+    fetcher = PageFetcher([[0, 1, 2], [3, 4, 5], [6]])
+    fetchable = aio.AsyncFetchable(fetcher)
+
+    async def check():
+        assert await fetchable[1] == 1
+        assert fetcher.calls == [0]
+        assert await fetchable[2:5] == [2, 3, 4]
+        assert fetcher.calls == [0, 1]
+        assert await fetchable[-1] == 6
+        assert await fetchable[:] == list(range(7))
+        with pytest.raises(IndexError):
+            await fetchable[10]
+    run(check())
+    assert fetcher.calls == [0, 1, 2]
+
+
+def test_async_fetchable_iteration_is_shared():
+    fetcher = PageFetcher([[0, 1], [2, 3], [4]])
+    fetchable = aio.AsyncFetchable(fetcher)
+
+    async def consume():
+        items = []
+        async for item in fetchable:
+            items.append(item)
+        return items
+
+    async def check():
+        return await asyncio.gather(consume(), consume())
+    assert run(check()) == [list(range(5))] * 2
+    assert fetcher.calls == [0, 1, 2]
+
+
+def test_async_fetch_marshall_follows_pagination():
+    pages = {1: question_page(1, 2, [10, 11]), 3: question_page(2, 2, [12])}
+    requested = []
+
+    class Fetcher(object):
+        async def fetch(self, start_at):
+            requested.append(start_at)
+            return pages[start_at]
+
+    fetchable = aio.AsyncFetchable(
+        aio.AsyncFetchMarshall(Fetcher(), QuestionProcessor(UserQuestion))
+    )
+    questions = run(fetchable[:])
+    assert [question.id for question in questions] == [10, 11, 12]
+    assert requested == [1, 3]
+
+
+def test_async_rate_limiter_uses_token_buckets():
+    rate_limiter = aio.AsyncRateLimiter(TokenBucketRateLimiter(1000, burst=1))
+    loop = asyncio.new_event_loop()
+    with mock.patch.object(asyncio, 'sleep',
+                           side_effect=asyncio.sleep) as sleep:
+        loop.run_until_complete(rate_limiter.wait('profile'))
+        loop.run_until_complete(rate_limiter.wait('profile'))
+    loop.close()
+    assert sleep.call_count >= 1
+
+
+class FakeClientResponse(object):
+
+    def __init__(self, content, status=200):
+        self.content = content
+        self.status = status
+        self.headers = {}
+
+    async def read(self):
+        return self.content
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+def test_async_session_get_profile():
+    pytest.importorskip('aiohttp')
+    client_session = mock.Mock(cookie_jar=[])
+    client_session.request.return_value = FakeClientResponse(
+        b'<html><body><span class="userinfo2015-basics-asl-age">27</span>'
+        b'</body></html>'
+    )
+    session = aio.AsyncSession(client_session)
+    session.log_in_name = 'me'
+    profile = run(session.get_profile('someone'))
+    client_session.request.assert_called_once_with(
+        'GET', 'http://www.okcupid.com/profile/someone', headers={}
+    )
+    assert profile.age == 27
+
+    client_session.request.return_value = FakeClientResponse(b'', status=404)
+    with pytest.raises(aio.exceptions.HTTPError):
+        run(session.get_profile('deleted'))
+
+
+def test_async_search_fetchable():
+    pytest.importorskip('aiohttp')
+    client_session = mock.Mock(cookie_jar=[])
+    client_session.request.side_effect = [
+        FakeClientResponse(simplejson.dumps(response).encode('utf8'))
+        for response in (search_response(['a', 'b'], 'second'),
+                         search_response(['c'], 'second'))
+    ]
+    session = aio.AsyncSession(client_session)
+    session.log_in_name = 'me'
+    fetchable = aio.AsyncSearchFetchable(session, gentation='everybody')
+
+    async def consume():
+        return [profile async for profile in fetchable]
+    profiles = run(consume())
+    assert [profile.username for profile in profiles] == ['a', 'b', 'c']
+    assert client_session.request.call_count == 2
+
+
+def test_async_session_without_rate_limit():
+    pytest.importorskip('aiohttp')
+    for rate_limit in (None, 0):
+        session = aio.AsyncSession(mock.Mock(), rate_limit=rate_limit)
+        assert session.rate_limiter.rate_limiter is None
+    session = aio.AsyncSession(mock.Mock(), rate_limit=.5)
+    assert isinstance(session.rate_limiter.rate_limiter,
+                      TokenBucketRateLimiter)
+
+
+def test_async_search_manager_pages_until_the_cursor_repeats():
+    responses = {None: search_response(['a', 'b'], 'second'),
+                 'second': search_response(['c'], 'second')}
+    requested = []
+
+    class SearchFetcher(object):
+        async def fetch(self, after=None, count=18):
+            requested.append((after, count))
+            return responses[after]
+
+    session = mock.Mock()
+    manager = aio.AsyncSearchManager(SearchFetcher(),
+                                     aio.AsyncProfileBuilder(session),
+                                     count=2)
+    profiles, cursor = run(manager.fetch_page())
+    assert [profile.username for profile in profiles] == ['a', 'b']
+    assert cursor == 'second'
+    profiles, cursor = run(manager.fetch_page(cursor))
+    assert [profile.username for profile in profiles] == ['c']
+    assert cursor is None
+    assert requested == [(None, 2), ('second', 2)]
+    assert not session.get_profile.called
@@ -3,7 +3,8 @@ import pytest
 
 from . import util
 from okcupyd.attractiveness_finder import _AttractivenessFinder, \
-    AttractivenessFinder
+    AttractivenessFinder, CachedAttractivenessFinder, \
+    SQLiteAttractivenessCache
 
 
 @pytest.fixture
@@ -54,6 +55,121 @@ def test_attractiveness_finder(mock_search, attractiveness_finder):
     assert attractiveness_finder(user_two) == 9000
 
 
+@mock.patch('okcupyd.attractiveness_finder.search')
+def test_find_attractiveness_many(mock_search, attractiveness_finder):
+    user_to_attractiveness = {
+        'user_one': 4875,
+        'user_two': 9212,
+        'user_three': 4990,
+        'User_Four': 1200
+    }
+    def mock_search_function(session, attractiveness_min=0,
+                             attractiveness_max=10000, keywords='', **kwargs):
+        return [mock.Mock(username=username)
+                for username in keywords.split()
+                if username in user_to_attractiveness and
+                attractiveness_min <= user_to_attractiveness[username] <=
+                attractiveness_max]
+    mock_search.side_effect = mock_search_function
+
+    assert attractiveness_finder.find_attractiveness_many(
+        user_to_attractiveness, accuracy=1
+    ) == user_to_attractiveness
+    # The users share their searches until their ranges diverge.
+    assert mock_search.call_count < 14 * len(user_to_attractiveness)
+    assert mock_search.call_args_list[0][1]['keywords'].split() == \
+        list(user_to_attractiveness)
+
+    mock_search.reset_mock()
+    attractiveness_finder = AttractivenessFinder(mock.Mock())
+    assert attractiveness_finder.find_attractiveness_many(
+        ['user_one', 'User_Four', 'missing']
+    ) == {'user_one': 5000, 'User_Four': 1000, 'missing': None}
+    call_count = mock_search.call_count
+    # The results are cached.
+    assert attractiveness_finder('user_one') == 5000
+    assert attractiveness_finder.find_attractiveness_many(['missing']) == \
+        {'missing': None}
+    assert mock_search.call_count == call_count
+
+
+@mock.patch('okcupyd.attractiveness_finder.search')
+def test_find_attractiveness_many_when_keywords_must_all_match(
+        mock_search, attractiveness_finder
+):
+    user_to_attractiveness = {'user_one': 4875, 'user_two': 9212}
+    def mock_search_function(session, attractiveness_min=0,
+                             attractiveness_max=10000, keywords='', **kwargs):
+        if keywords not in user_to_attractiveness:
+            return []
+        if (attractiveness_min <= user_to_attractiveness[keywords] <=
+            attractiveness_max):
+            return [mock.Mock(username=keywords)]
+    mock_search.side_effect = mock_search_function
+
+    assert attractiveness_finder.find_attractiveness_many(
+        user_to_attractiveness, accuracy=1
+    ) == user_to_attractiveness
+
+
+def test_sqlite_attractiveness_cache(tmpdir):
+    now = [0]
+    filename = str(tmpdir.join('attractiveness.db'))
+    cache = SQLiteAttractivenessCache(filename, ttl=10, max_size=2,
+                                      clock=lambda: now[0])
+    cache.set('user_one', 5000)
+    cache.set('missing', None)
+    assert cache.get('user_one') == 5000
+    assert 'missing' in cache
+    assert cache.get('missing', 'default') is None
+
+    # Entries are shared with other processes using the same file.
+    other_cache = SQLiteAttractivenessCache(filename, max_size=2)
+    assert other_cache.get('user_one') == 5000
+
+    # The least recently used entry is evicted.
+    now[0] = 1
+    cache.get('user_one')
+    cache.set('user_two', 9000)
+    assert 'missing' not in cache
+    assert len(cache) == 2
+
+    now[0] = 10.5
+    assert cache.get('user_one') is None
+    assert cache.get('user_two') == 9000
+
+
+def test_cached_attractiveness_finder_counts_hits(tmpdir):
+    finder = mock.Mock()
+    finder.return_value = 4000
+    finder.find_attractiveness_many.return_value = {'user_two': 6000}
+    cache = SQLiteAttractivenessCache(str(tmpdir.join('attractiveness.db')))
+    cached_finder = CachedAttractivenessFinder(finder, cache=cache)
+
+    assert cached_finder('user_one') == 4000
+    assert cached_finder('user_one') == 4000
+    assert finder.call_count == 1
+    assert cached_finder.find_attractiveness_many(
+        ['user_one', 'user_two']
+    ) == {'user_one': 4000, 'user_two': 6000}
+    finder.find_attractiveness_many.assert_called_once_with(['user_two'])
+    assert (cached_finder.hits, cached_finder.misses) == (2, 2)
+
+    cached_finder = CachedAttractivenessFinder(finder, cache=cache)
+    assert cached_finder('user_two') == 6000
+    assert (cached_finder.hits, cached_finder.misses) == (1, 0)
+
+
+def test_cached_attractiveness_finder_bounds_its_default_cache():
+    with mock.patch('okcupyd.attractiveness_finder.settings') as settings:
+        settings.AF_CACHE_FILENAME = None
+        settings.AF_CACHE_MAX_SIZE = 2
+        settings.AF_CACHE_TTL = 60
+        cached_finder = CachedAttractivenessFinder(mock.Mock())
+    assert cached_finder._cache.max_size == 2
+    assert cached_finder._cache.ttl == 60
+
+
 @pytest.yield_fixture
 def cached_attractiveness_finder():
     with util.use_cassette(path='attractiveness_finder'):
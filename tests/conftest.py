@@ -1 +1,7 @@
+import sys
+
 from okcupyd_testing.conftest import *
+
+
+if sys.version_info < (3, 5):
+    collect_ignore = ['aio_test.py']
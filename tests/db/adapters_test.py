@@ -1,5 +1,5 @@
 from okcupyd.db import txn, model
-from okcupyd.db.adapters import ThreadAdapter
+from okcupyd.db.adapters import ThreadAdapter, sync_threads
 
 
 def test_thread_adapter_create_and_update(T):
@@ -50,3 +50,29 @@ def test_thread_adapter_create_and_update(T):
 
     T.ensure.thread_model_resembles_okcupyd_thread(second_thread_model,
                                                    second_thread)
+
+
+def test_sync_threads(T):
+    first = T.build_mock.thread(initiator='initiator', respondent='first')
+    second = T.build_mock.thread(initiator='initiator', respondent='second')
+    thread_models, message_models = sync_threads([first, second])
+    assert len(thread_models) == 2
+    assert len(message_models) == 4
+    for thread_model in thread_models:
+        T.ensure.thread_model_resembles_okcupyd_thread(
+            thread_model, {first.id: first, second.id: second}[thread_model.okc_id]
+        )
+
+    first.messages.append(
+        T.build_mock.message(sender='first', recipient='initiator',
+                             content='other')
+    )
+    thread_models, message_models = sync_threads([first, second])
+    assert [message.text for message in message_models] == ['other']
+    with txn() as session:
+        thread_model = model.MessageThread.find_no_txn(session, first.id,
+                                                       id_key='okc_id')
+        T.ensure.thread_model_resembles_okcupyd_thread(thread_model, first)
+        assert [message.thread_index for message in thread_model.messages] \
+            == [0, 1, 2]
+    assert len(model.User.query()) == 3
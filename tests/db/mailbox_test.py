@@ -5,7 +5,7 @@ import pytest
 
 from .. import util
 from okcupyd import User
-from okcupyd.db import model, txn
+from okcupyd.db import adapters, model, txn
 from okcupyd.db.mailbox import Sync
 from okcupyd.util import Fetchable
 
@@ -130,3 +130,66 @@ def test_mailbox_sync_integration(T):
     assert len(messages) == len(model.Message.query(
         model.Message.sender_id == user_model.id
     ))
+
+
+def test_mailbox_sync_skips_unchanged_threads(T, mailbox_sync, mock_user):
+    T.factory.okcupyd_user(mock_user)
+    # The thread list shows a day before the newest message of these threads.
+    first = T.build_mock.thread(initiator='first', respondent='second',
+                                with_deleted_user=False,
+                                datetime=datetime.datetime(2014, 4, 1))
+    second = T.build_mock.thread(initiator='third', respondent='second',
+                                 with_deleted_user=False,
+                                 datetime=datetime.datetime(2014, 4, 1))
+    set_mailbox(mock_user.inbox, [first, second])
+
+    threads, messages = mailbox_sync.inbox()
+    assert len(threads) == 2
+    assert len(messages) == 4
+    assert mailbox_sync.summaries['inbox'].threads_skipped == 0
+
+    first.datetime = datetime.datetime(year=2014, day=3, month=4)
+    first.messages.append(T.build_mock.message(
+        sender='second', recipient='first', content='new',
+        time_sent=first.datetime
+    ))
+    with mock.patch.object(adapters, 'sync_threads',
+                           side_effect=adapters.sync_threads) as sync_threads:
+        threads, messages = mailbox_sync.inbox()
+    sync_threads.assert_called_once_with([first])
+    assert [message.text for message in messages] == ['new']
+    assert mailbox_sync.summaries['inbox'] == (2, 1, 1, 2)
+
+
+def test_mailbox_sync_stops_after_unchanged_threads(T, mock_user):
+    T.factory.okcupyd_user(mock_user)
+    threads = [T.build_mock.thread(initiator='first', respondent=str(i),
+                                   with_deleted_user=False,
+                                   datetime=datetime.datetime(2014, 4, 1))
+               for i in range(4)]
+    set_mailbox(mock_user.inbox, threads)
+    mailbox_sync = Sync(mock_user, max_unchanged=2)
+    mailbox_sync.inbox()
+
+    mailbox_sync.inbox()
+    assert mailbox_sync.summaries['inbox'].threads_seen == 2
+
+
+def test_mailbox_sync_loads_threads_with_new_messages_on_the_same_day(
+        T, mailbox_sync, mock_user
+):
+    T.factory.okcupyd_user(mock_user)
+    thread = T.build_mock.thread(initiator='first', respondent='second',
+                                 with_deleted_user=False, message_count=1)
+    thread.messages[0].time_sent = datetime.datetime(2014, 4, 2, 10, 30)
+    set_mailbox(mock_user.inbox, [thread])
+    mailbox_sync.inbox()
+
+    # The thread list only shows the day for both of these messages.
+    thread.messages.append(T.build_mock.message(
+        sender='second', recipient='first', content='new',
+        time_sent=datetime.datetime(2014, 4, 2, 15, 45)
+    ))
+    threads, messages = mailbox_sync.inbox()
+    assert [message.text for message in messages] == ['new']
+    assert mailbox_sync.summaries['inbox'].threads_skipped == 0
@@ -52,4 +52,25 @@ def test_upsert():
     assert loaded_from_v1.handle == v2.handle
     assert v2.handle == new_user_2.handle
     assert v2.handle == 'other'
-    assert len(model.User.query()) == 1
\ No newline at end of file
+    assert len(model.User.query()) == 1
+
+@pytest.mark.parametrize('native', [True, False])
+def test_bulk_upsert(native):
+    dialects = model.User.native_upsert_dialects if native else ()
+    with mock.patch.object(model.User, 'native_upsert_dialects', dialects):
+        ids = model.User.bulk_upsert([
+            {'okc_id': okc_id, 'handle': str(okc_id), 'age': 30,
+             'location': 'here'} for okc_id in range(1, 6)
+        ], chunk_size=2)
+        assert sorted(ids) == [1, 2, 3, 4, 5]
+
+        updated_ids = model.User.bulk_upsert([
+            {'okc_id': 5, 'handle': 'five', 'age': 31, 'location': 'there'},
+            {'okc_id': 6, 'handle': 'six', 'age': 31, 'location': 'there'}
+        ])
+    assert updated_ids[5] == ids[5]
+    users = {user.okc_id: user for user in model.User.query()}
+    assert len(users) == 6
+    assert users[5].handle == 'five'
+    assert users[5].id == ids[5]
+    assert users[1].handle == '1'
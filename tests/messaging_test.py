@@ -1,8 +1,12 @@
 import datetime
+import pickle
 
+from lxml import html
+import mock
 import pytest
 
 from . import util
+from okcupyd import messaging
 from okcupyd import User
 
 
@@ -116,3 +120,26 @@ def test_date_parsing_smoke():
             message.time_sent
     for thread in user.outbox:
         thread.datetime
+
+
+THREAD_HTML = u"""
+<li class="thread message unreadMessage" data-threadid="123"
+    data-personid="456">
+  <div class="inner">
+    <a class="open"><span class="subject"> them </span></a>
+    <span class="timestamp"><span class="fancydate">1/2/15</span></span>
+  </div>
+</li>
+"""
+
+
+def test_message_thread_to_record():
+    session = mock.Mock(log_in_name='me')
+    thread = messaging.MessageThread(session,
+                                     html.fragment_fromstring(THREAD_HTML))
+    record = thread.to_record()
+    assert record == messaging.MessageThreadRecord(
+        id='123', correspondent='them', correspondent_id=456, read=False,
+        datetime=datetime.datetime(2015, 1, 2), messages=None
+    )
+    assert pickle.loads(pickle.dumps(record)) == record
@@ -0,0 +1,100 @@
+from lxml import html
+import mock
+import pytest
+
+from okcupyd.profile import Profile
+from okcupyd.profile_extractor import ProfileExtractor
+
+
+PROFILE_HTML = u"""
+<html><body>
+<span class="userinfo2015-basics-asl-age">27</span>
+<span class="userinfo2015-basics-asl-location">Oakland, CA</span>
+<button class="binary_rating_button liked" data-tuid="1234"></button>
+<div class="matchanalysis2015-graphs">
+  <div class="matchgraph matchgraph--match">
+    <div class="matchgraph-graph"><canvas data-pct="87"></canvas></div>
+  </div>
+  <div class="matchgraph matchgraph--enemy">
+    <div class="matchgraph-graph"><canvas data-pct="4"></canvas></div>
+  </div>
+</div>
+<div id="main_column">
+  <div id="essay_0">
+    <a class="essay_title">My self-summary</a>
+    <div class="text"><div class="essay"> Hello </div></div>
+  </div>
+</div>
+<div id="profile_details">
+  <dl><dt>Orientation</dt><dd id="ajax_orientation"> Straight </dd>
+      <dd id="ajax_ignored">ignored</dd></dl>
+  <dl><dt>Ethnicity</dt><dd id="ajax_ethnicities">Asian</dd></dl>
+</div>
+<div class="text what_i_want">
+  <ul>
+    <li id="ajax_gentation">Women who like men</li>
+    <li id="ajax_single" style="display: none;">Single</li>
+  </ul>
+</div>
+</body></html>
+"""
+
+
+def test_profile_extractor():
+    record = ProfileExtractor(html.fromstring(PROFILE_HTML)).extract()
+    assert record.age == '27'
+    assert record.location == 'Oakland, CA'
+    assert record.rating_button_classes == ['binary_rating_button', 'liked']
+    assert record.tuid == '1234'
+    assert record.match_percentage == '87'
+    assert record.enemy_percentage == '4'
+    assert record.orientation == ' Straight '
+    assert record.details == {'orientation': ' Straight ',
+                              'ethnicities': 'Asian'}
+    assert record.essays == {0: 'Hello'}
+    assert record.essay_titles == {0: 'My self-summary'}
+    assert record.looking_for == {'gentation': 'Women who like men',
+                                  'single': 'Single'}
+    assert record.single_style == 'display: none;'
+    with pytest.raises(IndexError):
+        record.one('gender')
+
+
+def test_profile_reads_from_extracted_record():
+    session = mock.Mock(log_in_name='me')
+    profile = Profile(session, 'them')
+    profile._set_cached_properties({'_profile_response': PROFILE_HTML})
+    with mock.patch('okcupyd.xpath.XPathBuilder.apply_') as apply_:
+        assert profile.age == 27
+        assert profile.id == 1234
+        assert profile.liked
+        assert profile.match_percentage == 87
+        assert profile.enemy_percentage == 4
+        assert profile.orientation == 'Straight'
+        assert profile.essays.self_summary == 'Hello'
+        assert profile.essays.short_name_to_title['self_summary'] == \
+            'My self-summary'
+        assert profile.details.ethnicities == ['Asian']
+        assert profile.looking_for.gentation == 'women who like men'
+        assert not profile.looking_for.single
+    assert not apply_.called
+
+
+def test_detach_releases_the_profile_page():
+    session = mock.Mock(log_in_name='me')
+    session.okc_get.return_value.content = PROFILE_HTML.encode('utf-8')
+    profile = Profile(session, 'them')
+    profile.detach(keep_compressed_response=True)
+    assert not session.okc_get.called
+
+    assert profile.age == 27
+    profile.detach(keep_compressed_response=True)
+    assert 'profile_tree' not in profile.__dict__
+    assert '_profile_response' not in profile.__dict__
+    assert profile.match_percentage == 87
+    assert profile.essays.self_summary == 'Hello'
+    assert session.okc_get.call_count == 1
+
+    # The page is parsed again from the compressed response.
+    assert profile.profile_tree is not None
+    assert session.okc_get.call_count == 1
@@ -1,6 +1,13 @@
+import pickle
+
+from lxml import html
+import mock
+
+from okcupyd import question
 from okcupyd import User
 
 from . import util
+from .util import SynchronousExecutor, question_page
 
 
 @util.use_cassette
@@ -15,3 +22,47 @@ def test_question_answer_id_for_user_question():
 def test_question_answer_id_for_profile_question():
     user = User()
     assert isinstance(user.get_question_answer_id(user.quickmatch().questions[0]), int)
+
+
+USER_QUESTION_HTML = u"""
+<div class="question" data-qid="42">
+  <div class="qtext"><p> Do you like cats? </p></div>
+  <ul class="self_answers">
+    <li id="answer_42_1" class="mine match">Yes</li>
+    <li id="answer_42_2" class="">No</li>
+  </ul>
+</div>
+"""
+
+
+def test_user_question_to_record():
+    user_question = question.UserQuestion(html.fragment_fromstring(
+        USER_QUESTION_HTML
+    ))
+    record = user_question.to_record()
+    assert record == question.UserQuestionRecord(
+        id=42, text='Do you like cats?', answered=True, answer_id=1,
+        explanation=None, answer_options=(
+            question.AnswerOptionRecord(id=1, text='Yes', is_users=True,
+                                        is_match=True),
+            question.AnswerOptionRecord(id=2, text='No', is_users=False,
+                                        is_match=False),
+        )
+    )
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+def test_parallel_question_fetcher_fans_out_after_the_first_parse():
+    pages = {1: question_page(1, 3, [1, 2, 3]),
+             4: question_page(2, 3, [4, 5, 6]),
+             7: question_page(3, 3, [7])}
+    session = mock.Mock(executor=SynchronousExecutor())
+    session.okc_get.side_effect = lambda uri, params: mock.Mock(
+        content=pages[params['low']].encode('utf8')
+    )
+    iterator = question.QuestionFetcher(session, 'someone',
+                                        parallel=True).fetch()
+    assert next(iterator).id == 1
+    assert session.executor.submitted == [4, 7]
+    assert [question.id for question in iterator] == list(range(2, 8))
+    assert session.okc_get.call_count == 3
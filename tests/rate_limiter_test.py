@@ -0,0 +1,80 @@
+import os
+
+import mock
+import pytest
+
+from okcupyd.rate_limiter import (SQLiteRateLimiter, SQLiteTokenBucket,
+                                  TokenBucket, TokenBucketRateLimiter)
+from okcupyd.session import Session
+from .util import FakeClock
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_token_bucket_burst_then_rate(clock):
+    bucket = TokenBucket(2, burst=3, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == .5
+
+    bucket.acquire()
+    assert clock.sleeps == [.5]
+    clock.now += 10
+    # The bucket never holds more than burst tokens.
+    for _ in range(3):
+        assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() > 0
+
+
+def test_endpoint_buckets_use_longest_prefix(clock):
+    rate_limiter = TokenBucketRateLimiter(
+        100, burst=100, endpoint_limits={'profile': (1, 1),
+                                         'profile/special': (1, 2)},
+        clock=clock, sleep=clock.sleep
+    )
+    rate_limiter.wait('profile/someone')
+    rate_limiter.wait('messages')
+    assert clock.sleeps == []
+    rate_limiter.wait('/profile/someone_else')
+    assert clock.sleeps == [1.0]
+
+    rate_limiter.wait('profile/special/1')
+    rate_limiter.wait('profile/special/2')
+    assert clock.sleeps == [1.0]
+
+    # Prefixes only match whole path segments.
+    rate_limiter.wait('profile_foo')
+    rate_limiter.wait('profile?username=a')
+    assert clock.sleeps == [1.0, 1.0]
+
+
+def test_token_bucket_rejects_more_tokens_than_its_burst(tmpdir, clock):
+    bucket = TokenBucket(1, burst=2, clock=clock, sleep=clock.sleep)
+    with pytest.raises(ValueError):
+        bucket.acquire(3)
+    filename = os.path.join(str(tmpdir), 'rate_limit.db')
+    with pytest.raises(ValueError):
+        SQLiteTokenBucket(filename, 'key', 1, burst=2).acquire(3)
+
+
+def test_sqlite_rate_limiter_shares_state(tmpdir, clock):
+    filename = os.path.join(str(tmpdir), 'rate_limit.db')
+    first = SQLiteRateLimiter(filename, 1, burst=2, clock=clock,
+                              sleep=clock.sleep)
+    second = SQLiteRateLimiter(filename, 1, burst=2, clock=clock,
+                               sleep=clock.sleep)
+    first.wait()
+    second.wait()
+    assert clock.sleeps == []
+    first.wait()
+    assert clock.sleeps == [1.0]
+
+
+def test_session_passes_path_to_rate_limiter():
+    rate_limiter = mock.Mock()
+    session = Session(mock.Mock(), rate_limit=rate_limiter)
+    session.okc_get('profile/a', secure=True)
+    rate_limiter.wait.assert_called_once_with('profile/a')
@@ -0,0 +1,95 @@
+import os
+
+import mock
+import pytest
+import requests
+
+from okcupyd.response_cache import SQLiteResponseCache
+from okcupyd.session import Session
+from .util import FakeClock
+
+
+def build_response(content, status_code=200, headers=None, url='url'):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response.url = url
+    response._content = content
+    return response
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmpdir, clock):
+    return SQLiteResponseCache(os.path.join(str(tmpdir), 'responses.db'),
+                               ttl=10, endpoint_ttls={'messages': 1},
+                               clock=clock)
+
+
+def test_key_depends_on_method_path_params_and_namespace():
+    key = SQLiteResponseCache.key
+    assert key('get', '/profile/a', {'b': 1, 'a': 2}) == \
+        key('GET', 'profile/a', {'a': 2, 'b': 1})
+    assert key('get', 'profile/a') != key('get', 'profile/b')
+    assert key('get', 'profile/a', {'a': 1}) != key('get', 'profile/a')
+    assert key('get', 'profile/a', namespace='me') != key('get', 'profile/a')
+
+
+def test_endpoint_ttls(cache, clock):
+    cache.set('profile', 'profile/a', build_response(b'profile'))
+    cache.set('messages', 'messages?readmsg=true',
+              build_response(b'messages'))
+    clock.now = 5
+    assert cache.is_fresh(cache.get('profile'))
+    assert not cache.is_fresh(cache.get('messages'))
+    assert cache.get('profile').to_response().content == b'profile'
+
+
+def test_least_recently_used_responses_are_evicted(cache, clock):
+    cache.max_size = 10
+    for key in 'abc':
+        clock.now += 1
+        cache.set(key, key, build_response(b'1234'))
+        if key == 'b':
+            clock.now += 1
+            cache.get('a')
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+    assert cache.size == 8
+
+
+def test_session_serves_fresh_responses_from_cache(cache):
+    requests_session = mock.Mock(cookies={})
+    requests_session.get.return_value = build_response(
+        b'profile', headers={'ETag': '"abc"'}
+    )
+    session = Session(requests_session, response_cache=cache)
+    assert session.okc_get('profile/a').content == b'profile'
+    assert session.okc_get('profile/a').content == b'profile'
+    assert requests_session.get.call_count == 1
+
+
+def test_session_revalidates_stale_responses(cache, clock):
+    requests_session = mock.Mock(cookies={})
+    requests_session.get.return_value = build_response(
+        b'profile', headers={'ETag': '"abc"',
+                             'Content-Type': 'text/html; charset=utf-8'}
+    )
+    session = Session(requests_session, response_cache=cache)
+    session.okc_get('profile/a')
+
+    clock.now = 20
+    requests_session.get.return_value = build_response(b'', status_code=304)
+    response = session.okc_get('profile/a')
+    assert response.content == b'profile'
+    assert response.encoding == 'utf-8'
+    assert requests_session.get.call_args[1]['headers'] == \
+        {'If-None-Match': '"abc"'}
+
+    session.okc_get('profile/a')
+    assert requests_session.get.call_count == 2
@@ -0,0 +1,88 @@
+import itertools
+import os
+
+import mock
+
+from okcupyd import search_crawler
+from okcupyd.json_search import SearchJSONFetcher
+from okcupyd.search_checkpoint import FileCheckpointStore
+from .util import build_session, search_response
+
+
+PAGES = {
+    (18, 29): {None: search_response(['a', 'b'], 'young-2'),
+               'young-2': search_response(['c', 'Shared'], 'young-2')},
+    (30, 41): {None: search_response(['shared', 'd'], 'old-2'),
+               'old-2': search_response(['e'], 'old-2')},
+    (42, 53): {None: search_response(['f', 'g'], 'older-2'),
+               'older-2': search_response(['h', 'i'], 'older-3'),
+               'older-3': search_response(['j'], 'older-3')},
+}
+
+
+def fake_fetch(fetcher, after=None, count=18):
+    parameters = fetcher._parameters
+    return PAGES[parameters['minimum_age'], parameters['maximum_age']][after]
+
+
+def test_age_bands():
+    assert search_crawler.age_bands(18, 30, 6) == [
+        {'minimum_age': 18, 'maximum_age': 23},
+        {'minimum_age': 24, 'maximum_age': 29},
+        {'minimum_age': 30, 'maximum_age': 30},
+    ]
+    assert search_crawler.combine_partitions(
+        search_crawler.age_bands(18, 23, 6),
+        search_crawler.gentation_partitions(['women who like men',
+                                             'men who like women'])
+    ) == [{'minimum_age': 18, 'maximum_age': 23,
+           'gentation': 'women who like men'},
+          {'minimum_age': 18, 'maximum_age': 23,
+           'gentation': 'men who like women'}]
+
+
+def test_crawler_merges_partitions_without_duplicates():
+    with mock.patch.object(SearchJSONFetcher, 'fetch', autospec=True,
+                           side_effect=fake_fetch):
+        crawler = search_crawler.SearchCrawler(
+            build_session(), search_crawler.age_bands(18, 41, 12),
+            max_workers=2, radius=25
+        )
+        usernames = [profile.username for profile in crawler]
+    assert sorted(username.lower() for username in usernames) == \
+        ['a', 'b', 'c', 'd', 'e', 'shared']
+    assert crawler.duplicates == 1
+    assert crawler.errors == {}
+
+
+def test_crawler_records_failed_partitions():
+    with mock.patch.object(SearchJSONFetcher, 'fetch', autospec=True,
+                           side_effect=fake_fetch):
+        crawler = search_crawler.SearchCrawler(
+            build_session(), [{'minimum_age': 18, 'maximum_age': 29},
+                              {'minimum_age': 50, 'maximum_age': 60}]
+        )
+        usernames = [profile.username for profile in crawler]
+    assert usernames == ['a', 'b', 'c', 'Shared']
+    assert isinstance(crawler.errors[1], KeyError)
+
+
+def test_crawler_resumes_from_the_profiles_that_were_received(tmpdir):
+    store = FileCheckpointStore(os.path.join(str(tmpdir), 'checkpoints'))
+    partitions = [{'minimum_age': 42, 'maximum_age': 53}]
+    with mock.patch.object(SearchJSONFetcher, 'fetch', autospec=True,
+                           side_effect=fake_fetch):
+        crawl = search_crawler.SearchCrawler(
+            build_session(), partitions, checkpoint_store=store,
+            max_buffered=1
+        ).crawl()
+        assert [profile.username
+                for profile in itertools.islice(crawl, 3)] == ['f', 'g', 'h']
+        crawl.close()
+
+        crawler = search_crawler.SearchCrawler(
+            build_session(), partitions, checkpoint_store=store, resume=True
+        )
+        # The profiles of the page that was only partly received are
+        # delivered again.
+        assert [profile.username for profile in crawler] == ['h', 'i', 'j']
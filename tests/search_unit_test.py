@@ -1,7 +1,18 @@
+import datetime
+import os
+
 import mock
+import pytest
 import simplejson
 
-from okcupyd.json_search import SearchFetchable, SearchJSONFetcher
+from requests import exceptions
+
+from okcupyd.json_search import (AdaptivePageSize, ProfileBuilder,
+                                  SearchFetchable, SearchJSONFetcher,
+                                  SearchManager)
+from okcupyd.search_checkpoint import (FileCheckpointStore,
+                                       SQLiteCheckpointStore)
+from .util import FakeClock, build_session, search_response
 
 
 def test_search_manager():
@@ -11,9 +22,144 @@ def test_search_manager():
         response = simplejson.loads(file.read())
     with mock.patch.object(SearchJSONFetcher, 'fetch',
                            side_effect=[response, second_response, {}]):
-        fetchable = SearchFetchable(mock.Mock())
+        fetchable = SearchFetchable(build_session())
         expected_usernames = [response_item['username']
                               for response_item in response['data']]
         expected_usernames += [response_item['username']
                                for response_item in second_response['data']]
         assert expected_usernames == [p.username for p in fetchable]
+
+
+def test_profile_builder_populates_cached_properties():
+    with open('search_response.json', 'r') as file:
+        response = simplejson.loads(file.read())
+    requests_session = mock.Mock()
+    profiles = list(ProfileBuilder(build_session(requests_session))(response))
+    profile = profiles[0]
+    assert profile.username == 'silveeuhh'
+    assert profile.age == 26
+    assert profile.id == 9102691634927604177
+    assert profile.location == 'Ellicott City, MD'
+    assert profile.match_percentage == 78
+    assert profile.enemy_percentage == 0
+    assert profile.liked is False
+    assert len(profiles) == len(response['data'])
+    assert not requests_session.get.called
+
+
+@pytest.mark.parametrize('store_class', [FileCheckpointStore,
+                                         SQLiteCheckpointStore])
+def test_search_resumes_from_checkpoint(tmpdir, store_class):
+    with open('search_response.json', 'r') as file:
+        response = simplejson.loads(file.read())
+    with open('second_search_response.json', 'r') as file:
+        second_response = simplejson.loads(file.read())
+    store = store_class(os.path.join(str(tmpdir), 'checkpoints'))
+    session = build_session()
+    with mock.patch.object(SearchJSONFetcher, 'fetch',
+                           side_effect=[response, second_response]):
+        fetchable = SearchFetchable(session, checkpoint_store=store,
+                                    gentation='everybody')
+        # Consuming part of a page does not move the checkpoint past it.
+        fetchable[:10]
+        assert store.load(fetchable._fetcher.parameters_hash) is None
+        fetchable[17]
+
+    checkpoint = store.load(fetchable._fetcher.parameters_hash)
+    assert checkpoint.after == response['paging']['cursors']['after']
+    assert checkpoint.delivered == 17
+
+    with mock.patch.object(SearchJSONFetcher, 'fetch',
+                           side_effect=[second_response, {}]) as fetch:
+        resumed = SearchFetchable(session, checkpoint_store=store,
+                                  resume_from=True, gentation='everybody')
+        assert resumed[0].username == second_response['data'][0]['username']
+        assert fetch.call_args[1]['after'] == checkpoint.after
+
+    with pytest.raises(ValueError):
+        SearchFetchable(session, resume_from=checkpoint, gentation='men')
+
+
+def test_search_cannot_resume_without_a_checkpoint_store():
+    with pytest.raises(ValueError):
+        SearchFetchable(build_session(), resume_from=True)
+
+
+def test_search_manager_drops_profiles_repeated_across_pages():
+    first = {'data': [{'username': 'a'}, {'username': 'b'}],
+             'paging': {'cursors': {'after': 'second'}}}
+    second = {'data': [{'username': 'B'}, {'username': 'c'}],
+              'paging': {'cursors': {'after': 'second'}}}
+    with mock.patch.object(SearchJSONFetcher, 'fetch',
+                           side_effect=[first, second]):
+        fetchable = SearchFetchable(build_session())
+        assert [profile.username for profile in fetchable] == ['a', 'b', 'c']
+    assert fetchable._fetcher.deduplicator.dropped == 1
+    assert fetchable._fetcher.delivered == 3
+
+
+def page_of(size, after):
+    return search_response(['{0}-{1}'.format(after, index)
+                            for index in range(size)], after)
+
+
+def test_search_page_size_follows_what_the_consumer_wants():
+    with mock.patch.object(SearchJSONFetcher, 'fetch',
+                           side_effect=[page_of(1, 'a')]) as fetch:
+        assert len(SearchFetchable(build_session())[:1]) == 1
+    assert fetch.call_args[1]['count'] == 1
+
+    with mock.patch.object(SearchJSONFetcher, 'fetch',
+                           side_effect=[page_of(60, 'a')]) as fetch:
+        assert len(SearchFetchable(build_session())[:60]) == 60
+    assert fetch.call_args[1]['count'] == 60
+
+
+def test_adaptive_page_size():
+    page_size = AdaptivePageSize(initial=18, maximum=100, target_latency=2)
+    assert page_size.limit(0) == 18
+    page_size.record(18, 18, elapsed=0.5)
+    assert page_size.limit(18) == 36
+    assert page_size.items_per_second == 36
+    page_size.record(36, 36, elapsed=3)
+    assert page_size.ceiling == 18
+    assert page_size.limit(54) == 18
+    page_size.expect(None)
+    assert page_size.limit(54) == 18
+    page_size.record(18, 18, elapsed=0.5)
+    assert page_size.limit(72) == 36
+
+
+def test_search_retries_failed_requests_with_smaller_pages():
+    with mock.patch.object(SearchJSONFetcher, 'fetch', side_effect=[
+        exceptions.Timeout(), page_of(9, 'a'), page_of(0, 'a')
+    ]) as fetch:
+        fetchable = SearchFetchable(build_session())
+        assert len([profile for profile in fetchable]) == 9
+    # The fast full page of 9 lets the page size grow back.
+    assert [call[1]['count'] for call in fetch.call_args_list] == [18, 9, 18]
+
+
+def test_search_page_size_ignores_rate_limiter_waits():
+    clock = FakeClock()
+    rate_limiter = mock.Mock()
+    rate_limiter.wait.side_effect = lambda path: clock.sleep(4)
+    requests_session = mock.MagicMock()
+
+    def post(url, **kwargs):
+        limit = simplejson.loads(kwargs['data'])['limit']
+        clock.now += .2
+        return mock.Mock(elapsed=datetime.timedelta(seconds=.2),
+                         json=lambda: page_of(limit, 'next'))
+    requests_session.post.side_effect = post
+    session = build_session(requests_session)
+    session.rate_limiter = rate_limiter
+    search_manager = SearchManager(
+        SearchJSONFetcher(session), ProfileBuilder(session),
+        page_size=AdaptivePageSize(clock=clock)
+    )
+    search_manager.expect(None)
+    for _ in range(3):
+        list(search_manager.fetch_once())
+    assert [simplejson.loads(call[1]['data'])['limit']
+            for call in requests_session.post.call_args_list] == [100] * 3
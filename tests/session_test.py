@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
+import time
+
+import mock
+import requests
 import pytest
 
 from okcupyd import settings
-from okcupyd.session import Session
+from okcupyd import util as util_module
+from okcupyd.session import RateLimiter, Session
 from okcupyd.errors import AuthenticationError
 from . import util
 
@@ -22,3 +27,103 @@ def test_session_auth_failure():
 @util.use_cassette
 def test_session_unicode():
     Session.login(username='éÅunicodeË', password='unicode')
+
+
+def test_map_get_preserves_order():
+    requests_session = mock.Mock()
+    requests_session.get.side_effect = lambda url, **kwargs: mock.Mock(url=url)
+    session = Session(requests_session, max_workers=3)
+    paths = ['profile/{0}'.format(i) for i in range(10)]
+    responses = list(session.map_get(paths, secure=True))
+    assert [response.url for response in responses] == \
+        [session.build_path(path, secure=True) for path in paths]
+    assert requests_session.mount.call_count == 2
+    session.close()
+
+
+def test_okc_get_future():
+    requests_session = mock.Mock()
+    session = Session(requests_session)
+    future = session.okc_get_future('profile/a', secure=True)
+    assert future.result() is requests_session.get.return_value
+    requests_session.get.assert_called_once_with(
+        'https://www.okcupid.com/profile/a'
+    )
+    assert not requests_session.mount.called
+
+
+def test_rate_limiter_is_shared_across_threads():
+    rate_limiter = RateLimiter(.05, wait_std_dev=0)
+    session = Session(mock.Mock(), rate_limit=rate_limiter, max_workers=4)
+    start = time.time()
+    list(session.map_get(['a', 'b', 'c', 'd'], secure=True))
+    assert time.time() - start >= .15
+
+
+def test_get_profiles_hydrates_fields_and_collects_errors():
+    pages = {
+        'alice': b'<html><body><span class="ajax_gender">Woman</span>'
+                 b'<dd id="ajax_orientation"> Straight </dd></body></html>',
+        'bob': b'<html><body><span class="ajax_gender">Man</span>'
+               b'<dd id="ajax_orientation"> Gay </dd></body></html>',
+        'carol': b'<html><body><span class="ajax_gender">Woman</span>'
+                 b'</body></html>',
+    }
+    def get(url, **kwargs):
+        username = url.rsplit('/', 1)[-1]
+        if username not in pages:
+            raise requests.exceptions.HTTPError(username)
+        return mock.Mock(content=pages[username])
+    requests_session = mock.Mock(cookies={})
+    requests_session.get.side_effect = get
+    session = Session(requests_session, max_workers=2)
+    session.log_in_name = 'me'
+
+    profiles, errors, field_errors = session.get_profiles(
+        ['alice', 'missing', 'bob', 'carol'], fields=('gender', 'orientation')
+    )
+
+    assert [profile.username for profile in profiles] == \
+        ['alice', 'bob', 'carol']
+    assert list(errors) == ['missing']
+    assert isinstance(errors['missing'], requests.exceptions.HTTPError)
+    # A field that is missing from a page doesn't discard the profile.
+    assert list(field_errors) == ['carol']
+    assert list(field_errors['carol']) == ['orientation']
+    assert requests_session.get.call_count == 4
+    assert [(profile.gender, profile.orientation)
+            for profile in profiles[:2]] == \
+        [('Woman', 'Straight'), ('Man', 'Gay')]
+    assert profiles[2].gender == 'Woman'
+    assert requests_session.get.call_count == 4
+    session.close()
+
+
+def test_profile_cache_returns_the_same_profile():
+    now = [0]
+    profile_cache = util_module.LRUCache(ttl=60, clock=lambda: now[0])
+    session = Session(mock.Mock(cookies={}), profile_cache=profile_cache)
+    session.log_in_name = 'me'
+    profile = session.get_profile('Alice', age=30)
+    assert session.get_profile('alice') is profile
+    assert profile.age == 30
+
+    now[0] = 60
+    with mock.patch.object(type(profile), 'refresh') as refresh:
+        assert session.get_profile('alice', age=31) is profile
+    assert refresh.called
+    assert profile.age == 31
+
+    profile.refresh()
+    assert profile_cache.lookup(('me', 'alice')) == (profile, False)
+    assert 'age' not in profile.__dict__
+
+
+def test_user_profile_comes_from_the_profile_cache():
+    from okcupyd.user import User
+    session = Session(mock.Mock(cookies={}),
+                      profile_cache=util_module.LRUCache())
+    session.log_in_name = 'Me'
+    user = User(session)
+    assert user.profile is session.get_current_user_profile()
+    assert user.profile is session.get_profile('me')
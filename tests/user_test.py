@@ -144,9 +144,8 @@ def test_user_get_user_question():
 def test_log_path_for_user_question_not_found(mock_time):
     mock_time.time.return_value = 2
     user = User(mock.Mock())
-    with mock.patch('okcupyd.profile.Profile.find_question',
-                    return_value=None):
-        user.get_user_question(mock.Mock())
+    user.profile.find_question.return_value = None
+    user.get_user_question(mock.Mock())
     assert mock_time.sleep.call_count
 
 
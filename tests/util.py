@@ -1,4 +1,66 @@
+from concurrent import futures
+
+import mock
+
+from okcupyd.session import Session
 from okcupyd_testing.util import *
 okcupyd_vcr.cassette_library_dir = os.path.join(
     os.path.dirname(__file__), 'vcr_cassettes'
 )
+
+
+class FakeClock(object):
+    """A clock for the `clock` and `sleep` arguments of rate limiters and
+    caches whose time only moves when it is slept on or set."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class SynchronousExecutor(object):
+    """An executor that runs what is submitted to it immediately, recording
+    the `start_at` argument of each submission."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, function, *args, **kwargs):
+        self.submitted.append(kwargs.get('start_at'))
+        future = futures.Future()
+        future.set_result(function(*args, **kwargs))
+        return future
+
+
+def build_session(requests_session=None):
+    session = Session(requests_session or mock.Mock())
+    session.log_in_name = 'me'
+    return session
+
+
+def search_response(usernames, after):
+    """A json search response holding profiles with `usernames`, whose next
+    page is at the cursor `after`."""
+    return {'data': [{'username': username} for username in usernames],
+            'paging': {'cursors': {'after': after}}}
+
+
+def question_page(current, total, qids):
+    """A page of questions with `qids` that is page `current` of `total`."""
+    questions = u''.join(
+        u'<div class="question" data-qid="{0}"></div>'.format(qid)
+        for qid in qids
+    )
+    return (
+        u'<html><body>{0}<div class="pages_data">'
+        u'<input id="questions_pages_page" value="{1}"/>'
+        u'<input id="questions_pages_total" value="{2}"/>'
+        u'</div></body></html>'
+    ).format(questions, current, total)
@@ -1,3 +1,5 @@
+import collections
+from concurrent import futures
 import itertools
 import operator
 
@@ -6,6 +8,7 @@ import pytest
 import six
 
 from okcupyd import util
+from .util import SynchronousExecutor
 
 
 @util.curry
@@ -256,3 +259,353 @@ def test_classmethods_still_classmethods_with_staticmethod_decorate_all():
 
     assert Test.test() == 1
     assert Test.a_classmethod() == 2
+
+
+class PageFetcher(object):
+    """Serves pages of `page_size` consecutive integers starting at
+    `start_at`."""
+
+    def __init__(self, total, page_size):
+        self.total = total
+        self.page_size = page_size
+        self.requested = []
+        self._session = mock.Mock()
+
+    def fetch(self, start_at):
+        self.requested.append(start_at)
+        return list(range(start_at,
+                          min(start_at + self.page_size, self.total + 1)))
+
+
+class ListProcessor(object):
+
+    def process(self, page, page_parsed=None):
+        if page_parsed is not None:
+            page_parsed(page, len(page))
+        for item in page:
+            yield item
+
+
+def test_fetch_marshall_read_ahead():
+    fetcher = PageFetcher(total=18, page_size=5)
+    executor = SynchronousExecutor()
+    marshall = util.FetchMarshall(fetcher, ListProcessor(), read_ahead=2,
+                                  executor=executor)
+    iterator = marshall.fetch()
+    assert [next(iterator) for _ in range(5)] == list(range(1, 6))
+    assert executor.submitted == []
+    # Starting the second page requests it and the two pages after it.
+    assert next(iterator) == 6
+    assert executor.submitted == [6, 11, 16]
+
+    assert list(iterator) == list(range(7, 19))
+    # Nothing is read ahead after a page that came back empty, or after the
+    # short final page.
+    assert executor.submitted == [6, 11, 16, 21]
+    assert fetcher.requested == [1, 6, 11, 16, 21, 19]
+
+
+def test_fetch_marshall_fans_out_remaining_pages():
+    fetcher = PageFetcher(total=23, page_size=5)
+    executor = SynchronousExecutor()
+    marshall = util.FetchMarshall(
+        fetcher, ListProcessor(), executor=executor,
+        pages_remaining=lambda page: (fetcher.total - page[-1] + 4) // 5
+    )
+    iterator = marshall.fetch()
+    # The remaining pages are requested as soon as the first one is parsed.
+    assert next(iterator) == 1
+    assert executor.submitted == [6, 11, 16, 21]
+    assert [next(iterator) for _ in range(5)] == list(range(2, 7))
+    assert list(iterator) == list(range(7, 24))
+    # Nothing is requested after the last page.
+    assert fetcher.requested == [1, 6, 11, 16, 21]
+
+
+def test_fetch_marshall_fans_out_only_to_the_expected_pages():
+    fetcher = PageFetcher(total=23, page_size=5)
+    executor = SynchronousExecutor()
+    marshall = util.FetchMarshall(
+        fetcher, ListProcessor(), executor=executor,
+        pages_remaining=lambda page: (fetcher.total - page[-1] + 4) // 5
+    )
+    marshall.expect(7)
+    iterator = marshall.fetch()
+    assert next(iterator) == 1
+    assert executor.submitted == [6]
+
+    marshall.expect(None)
+    assert list(iterator) == list(range(2, 24))
+    assert executor.submitted == [6, 11, 16, 21]
+
+    fetcher = PageFetcher(total=23, page_size=5)
+    fetcher._session.executor = SynchronousExecutor()
+    fetchable = util.Fetchable.fetch_marshall(
+        fetcher, ListProcessor(), random_access=False,
+        pages_remaining=lambda page: (fetcher.total - page[-1] + 4) // 5
+    )
+    assert fetchable[0] == 1
+    assert fetcher.requested == [1]
+
+
+def test_fetch_marshall_reads_ahead_until_the_last_page():
+    fetcher = PageFetcher(total=18, page_size=5)
+    executor = SynchronousExecutor()
+    marshall = util.FetchMarshall(
+        fetcher, ListProcessor(), read_ahead=3, executor=executor,
+        pages_remaining=lambda page: (fetcher.total - page[-1] + 4) // 5
+    )
+    assert list(marshall.fetch()) == list(range(1, 19))
+    assert executor.submitted == [6, 11, 16]
+    assert fetcher.requested == [1, 6, 11, 16]
+
+
+def test_fetch_marshall_uses_session_executor():
+    fetcher = PageFetcher(total=8, page_size=3)
+    fetcher._session.executor = futures.ThreadPoolExecutor(1)
+    fetchable = util.Fetchable.fetch_marshall(fetcher, ListProcessor(),
+                                              read_ahead=1)
+    assert fetchable[:] == list(range(1, 9))
+    fetcher._session.executor.shutdown(wait=True)
+    assert sorted(fetcher.requested) == [1, 4, 7, 9, 10]
+
+
+def test_fetchable_buffers_items_and_indexes_pages():
+    fetcher = PageFetcher(total=12, page_size=5)
+    fetchable = util.Fetchable.fetch_marshall(fetcher, ListProcessor())
+    assert fetchable[:7][6] == 7
+    assert fetchable.page_index == [(0, 1), (5, 6)]
+    assert fetchable.page_of(6) == (5, 6)
+    assert fetchable.page_of(4) == (0, 1)
+    assert fetchable.page_of(10) is None
+    assert fetchable[2:7] == [3, 4, 5, 6, 7]
+    assert next(iter(fetchable)) == 1
+    assert fetcher.requested == [1, 6]
+
+    assert len(fetchable) == 12
+    assert fetchable.page_index == [(0, 1), (5, 6), (10, 11)]
+    assert fetcher.requested == [1, 6, 11, 13]
+
+
+def test_fetchable_jumps_to_the_page_that_holds_an_index():
+    fetcher = PageFetcher(total=2000, page_size=10)
+    fetchable = util.Fetchable.fetch_marshall(fetcher, ListProcessor())
+    assert fetchable[1900] == 1901
+    # The first page is requested to learn the page size.
+    assert fetcher.requested == [1, 1901]
+    assert repr(fetchable) == '<Fetchable[int][...]>'
+    assert fetchable[1905:1912] == list(range(1906, 1913))
+    assert fetcher.requested == [1, 1901, 1911]
+    assert fetchable[3] == 4
+    with pytest.raises(IndexError):
+        fetchable[2000]
+
+    # Pages that were already requested are not requested again when the
+    # items are fetched in order.
+    del fetcher.requested[:]
+    assert fetchable[:30] == list(range(1, 31))
+    assert fetcher.requested == [11, 21]
+    assert fetchable[1900] is fetchable[1900]
+
+
+def test_fetchable_jumps_to_an_index_after_iteration():
+    fetcher = PageFetcher(total=2000, page_size=10)
+    fetchable = util.Fetchable.fetch_marshall(fetcher, ListProcessor())
+    assert fetchable
+    assert next(iter(fetchable)) == 1
+    assert fetchable[1900] == 1901
+    assert fetcher.requested == [1, 1901]
+
+    class HTMLPageFetcher(PageFetcher):
+        def fetch(self, start_at):
+            return u'<ul>{0}</ul>'.format(u''.join(
+                u'<li class="item">{0}</li>'.format(number)
+                for number in super(HTMLPageFetcher, self).fetch(start_at)
+            ))
+
+    # The rest of a first page that is parsed in several chunks is read
+    # without requesting another page.
+    fetcher = HTMLPageFetcher(total=2000, page_size=10)
+    fetchable = util.Fetchable.fetch_marshall(
+        fetcher, util.StreamingProcessor(
+            lambda element: int(element.text), 'li', ('item',), chunk_size=16
+        )
+    )
+    assert fetchable[:2] == [1, 2]
+    assert fetchable[1900] == 1901
+    assert fetcher.requested == [1, 1901]
+
+
+def test_fetchable_does_not_request_the_last_page_again():
+    fetcher = PageFetcher(total=25, page_size=10)
+    fetchable = util.Fetchable.fetch_marshall(fetcher, ListProcessor())
+    assert fetchable[22:30] == [23, 24, 25]
+    assert fetcher.requested == [1, 21]
+    with pytest.raises(IndexError):
+        fetchable[27]
+    assert fetcher.requested == [1, 21]
+
+    fetcher = PageFetcher(total=25, page_size=10)
+    fetchable = util.Fetchable.fetch_marshall(fetcher, ListProcessor())
+    assert fetchable[10:100] == list(range(11, 26))
+    assert fetcher.requested == [1, 11, 21]
+
+
+def test_fetchable_random_access_can_be_disabled():
+    fetcher = PageFetcher(total=30, page_size=10)
+    fetchable = util.Fetchable.fetch_marshall(fetcher, ListProcessor(),
+                                              random_access=False)
+    assert fetchable[25] == 26
+    assert fetcher.requested == [1, 11, 21]
+
+
+class ListFetcher(object):
+    """Serves pages of `page_size` items of `items`, by offset."""
+
+    def __init__(self, items, page_size):
+        self.items = items
+        self.page_size = page_size
+        self.requested = []
+
+    def fetch(self, start_at):
+        self.requested.append(start_at)
+        return self.items[start_at - 1:start_at - 1 + self.page_size]
+
+
+def test_fetchable_incremental_refresh():
+    Item = collections.namedtuple('Item', ('id',))
+    fetcher = ListFetcher([Item(i) for i in range(10, 0, -1)], page_size=3)
+    fetchable = util.Fetchable.fetch_marshall(fetcher, ListProcessor(),
+                                              random_access=False)
+    assert [item.id for item in fetchable[:4]] == [10, 9, 8, 7]
+    kept = fetchable[1]
+
+    fetcher.items[:1] = [Item(12), Item(11)]
+    del fetcher.requested[:]
+    fetchable.refresh(incremental=True)
+    assert fetcher.requested == [1]
+    assert fetchable.changes == util.RefreshChanges(added=[12, 11],
+                                                    removed=[10])
+    assert [item.id for item in fetchable[:5]] == [12, 11, 9, 8, 7]
+    assert fetchable[2] is kept
+    assert fetcher.requested == [1]
+    assert [item.id for item in fetchable] == [12, 11] + list(range(9, 0, -1))
+    assert fetcher.requested == [1, 6, 9, 12]
+
+    fetchable.refresh()
+    assert fetchable.changes is None
+    assert [item.id for item in fetchable] == [12, 11] + list(range(9, 0, -1))
+
+
+class Profile(object):
+    """Stands in for a profile, whose id can only be read by loading its
+    page."""
+
+    loaded = []
+
+    def __init__(self, username):
+        self.username = username
+
+    @property
+    def id(self):
+        self.loaded.append(self.username)
+        return self.username
+
+
+def test_fetchable_incremental_refresh_keeps_random_access():
+    fetcher = ListFetcher([Profile('user{0}'.format(number))
+                           for number in range(100)], page_size=10)
+    fetchable = util.Fetchable.fetch_marshall(fetcher, ListProcessor())
+    assert len(fetchable[:13]) == 13
+
+    fetcher.items.insert(0, Profile('New'))
+    del fetcher.requested[:]
+    fetchable.refresh(incremental=True)
+    assert fetchable.changes == util.RefreshChanges(added=['new'],
+                                                    removed=[])
+    assert Profile.loaded == []
+    assert fetchable.page_of(12) == (10, 11)
+    # The page size is still known, so only the page of the index is
+    # requested.
+    assert fetchable[85].username == 'user84'
+    assert fetcher.requested == [1, 81]
+
+
+def test_lru_cache_eviction_and_expiry():
+    now = [0]
+    cache = util.LRUCache(max_size=2, ttl=10, clock=lambda: now[0])
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert 'b' not in cache
+    assert len(cache) == 2
+
+    now[0] = 10
+    assert cache.get('a') is None
+    assert cache.lookup('a') == (1, True)
+    cache.touch('a')
+    assert cache.lookup('a') == (1, False)
+    cache.discard('a')
+    with pytest.raises(KeyError):
+        cache.lookup('a')
+
+
+def test_detach_evaluates_properties_and_releases_attributes():
+    class Detachable(object):
+
+        def __init__(self):
+            self._element = {'text': 'value'}
+
+        @util.cached_property
+        def text(self):
+            return self._element['text']
+
+        @util.cached_property
+        def broken(self):
+            raise ValueError()
+
+        @util.cached_property
+        def unevaluated(self):
+            return self._element['text']
+
+    detachable = util.detach(Detachable(), ('text', 'broken'), ('_element',))
+    assert not hasattr(detachable, '_element')
+    assert detachable.text == 'value'
+    with pytest.raises(AttributeError):
+        detachable.unevaluated
+
+
+def test_streaming_processor_yields_items_before_the_page_is_parsed():
+    fed = []
+
+    def chunks():
+        for chunk in ('<ul><li class="item a">1</li>', '<li class="b">x</li>',
+                      '<li class="item">2</li></ul>',
+                      '<input id="more" value="0">'):
+            fed.append(chunk)
+            yield chunk
+
+    processor = util.StreamingProcessor(
+        lambda element: (element.text_content(), len(fed),
+                         element.getparent()),
+        'li', ('item',), pages_left=lambda tree: bool(int(
+            tree.xpath('//input[@id="more"]/@value')[0]
+        ))
+    )
+    assert list(processor.process(chunks())) == [
+        ('1', 1, None), ('2', 3, None), StopIteration
+    ]
+
+
+def test_streaming_processor_stops_on_blank_pages():
+    processor = util.StreamingProcessor(lambda element: element, 'li')
+    assert list(processor.process(b'  ')) == [StopIteration]
+
+
+def test_deduplicator_is_bounded_and_counts():
+    deduplicator = util.Deduplicator(max_size=2, key=str.lower)
+    assert list(deduplicator(['a', 'A', 'b', 'c', 'a', 'c'])) == \
+        ['a', 'b', 'c', 'a']
+    assert deduplicator.passed == 4
+    assert deduplicator.dropped == 2
@@ -1,4 +1,5 @@
 from lxml import etree
+import mock
 
 from okcupyd import xpath
 
@@ -44,3 +45,22 @@ def test_text_contains():
 
     result = xpath.xpb.elem.text_contains_("afdsafdsa").text_.apply_(tree)
     assert result == []
+
+
+def test_compiled_xpaths_are_cached():
+    builder = xpath.xpb.container.element.select_attribute_('value')
+    assert builder.compiled is xpath.compile_xpath(builder.xpath)
+    assert builder.compiled is \
+        xpath.xpb.container.element.select_attribute_('value').compiled
+
+    tree = etree.XML("<top><container><element value='1'></element>"
+                     "</container></top>")
+    with mock.patch.object(etree, 'XPath') as compile_mock:
+        assert builder.apply_(tree) == ['1']
+    assert not compile_mock.called
+
+
+def test_child_builders_are_interned():
+    assert xpath.xpb.container is xpath.xpb.container
+    assert xpath.xpb.container.element is xpath.xpb.container.element
+    assert xpath.xpb.container(id='a') is not xpath.xpb.container